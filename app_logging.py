@@ -0,0 +1,112 @@
+# app_logging.py
+"""
+Non-blocking logging for the game.
+
+Every logger under "photon" hands records to a queue; one background thread
+formats and writes them, so the receive thread and the frame loop never wait
+on stdout. Levels are per subsystem:
+
+  PHOTON_LOG="INFO,net.recv=DEBUG,db=WARNING"   (bare level = default)
+
+Packet traffic is summarized once per interval by PacketRateLogger
+("1,240 packets/s from 3 sources"); per-packet lines only appear at DEBUG.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+ROOT = "photon"
+DEFAULT_LEVEL = "INFO"
+RATE_INTERVAL = 5.0  # seconds between packet-rate summaries
+FORMAT = "%(asctime)s %(levelname)-5s %(name)s: %(message)s"
+
+_listener = None
+_lock = threading.Lock()
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for a subsystem, e.g. get_logger("net.recv") -> "photon.net.recv"."""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+def _parse_levels(spec: str):
+    default, levels = DEFAULT_LEVEL, {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, level = part.partition("=")
+        if sep:
+            levels[name.strip()] = level.strip().upper()
+        else:
+            default = name.upper()
+    return default, levels
+
+
+def setup_logging(spec: str = None, stream=None):
+    """Install the queue handler + background writer once; later calls only re-apply levels."""
+    global _listener
+    default, levels = _parse_levels(spec if spec is not None else os.getenv("PHOTON_LOG", ""))
+    root = logging.getLogger(ROOT)
+    root.setLevel(default)
+    for name, level in levels.items():
+        logging.getLogger(f"{ROOT}.{name}").setLevel(level)
+    with _lock:
+        if _listener is not None:
+            return
+        q = queue.SimpleQueue()
+        out = logging.StreamHandler(stream or sys.stdout)
+        out.setFormatter(logging.Formatter(FORMAT, "%H:%M:%S"))
+        root.addHandler(logging.handlers.QueueHandler(q))
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(q, out, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush and stop the writer thread (safe to call twice)."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+class PacketRateLogger:
+    """
+    Aggregates per-packet events into one INFO line per interval, e.g.
+    "1,240 packets/s from 3 sources". record() is a counter bump and a set
+    add; the summary is only built once the interval has elapsed.
+    """
+    def __init__(self, log: logging.Logger, label: str = "from", peer: str = "source",
+                 interval: float = RATE_INTERVAL):
+        self.log = log
+        self.label = label
+        self.peer = peer
+        self.interval = interval
+        self._count = 0
+        self._peers = set()
+        self._since = time.monotonic()
+
+    def record(self, peer):
+        self._count += 1
+        self._peers.add(peer)
+        now = time.monotonic()
+        if now - self._since >= self.interval:
+            self._emit(now)
+
+    def _emit(self, now):
+        span = now - self._since
+        n = len(self._peers)
+        self.log.info("%s packets/s %s %d %s%s", f"{self._count / span:,.0f}", self.label,
+                      n, self.peer, "" if n == 1 else "s")
+        self._count = 0
+        self._peers.clear()
+        self._since = now
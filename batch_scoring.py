@@ -0,0 +1,351 @@
+# batch_scoring.py
+"""
+Batch scoring: apply a block of events at once instead of one handle_packet
+call per packet.
+
+Events come in as three parallel arrays (udp_receiver.EVENT's layout):
+
+  kind   0 = single id "a" (someone reported a hit), 1 = "a:b"
+  a      attacker equipment id (or the reported id for kind 0)
+  b      target equipment id or base code (ignored for kind 0)
+
+Equipment ids resolve to roster rows through a lookup array, boolean masks
+sort events into the game mode's cases (src/game_modes), and score deltas
+are read from the rule table's columns by case and land in a per-player
+array with np.add.at (repeated attackers accumulate).
+Only the rows that log or reply are walked in Python, in packet order, so
+scores, has_base flags, event-log entries, replies and metrics come out
+exactly as if each event had gone through handle_packet in turn.
+
+NumPy is optional: without it handle_batch() falls back to handle_packet.
+"""
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - scoring still works, one packet at a time
+    np = None
+
+from metrics import REGISTRY
+from packet_handler import COUNTERS, handle_packet
+from src.event_log import BASE as LOG_BASE, FRIENDLY as LOG_FRIENDLY
+from src.game_modes import (BASE_ENEMY, BASE_LIMIT, BASE_OWN, HIT, OUT, REPLY_A, RULES, TAG_FRIENDLY,
+                             TAG_OPPOSING, RuleTable)
+from src.teams import BY_BASE, team_index, team_side
+
+KIND_ID, KIND_PAIR = 0, 1
+LUT_LIMIT = 1 << 20   # equip ids below this resolve through a direct lookup array, larger ones by bisection
+_I64_MIN, _I64_MAX = -(1 << 63), (1 << 63) - 1
+_NOWHERE = _I64_MIN   # stands in for ids that don't fit int64 (no player can have it)
+
+Event = Tuple[int, int, int]  # (kind, a, b), as decoded from the binary protocol
+
+_m_batches = REGISTRY.counter("photon_score_batches_total", "Event blocks applied by batch_scoring")
+
+
+class Roster:
+    """
+    state.players as arrays: row i is the i-th player in dict order, with
+    its team index, its side for tags (src.teams.team_side) and whether
+    its pid is truthy (handle_packet treats a pid of 0 as "not found" for
+    tags). Equip lookups return the first row
+    with that equip, like packet_handler._find_pid_by_equip.
+    """
+    def __init__(self, players: dict):
+        self.pids = list(players)
+        n = len(self.pids)
+        self.team = np.full(n, -1, dtype=np.int64)
+        self.side = np.full(n, -1, dtype=np.int64)
+        self.truthy = np.zeros(n, dtype=bool)
+        first, sides = {}, {}
+        for i, (pid, pdata) in enumerate(players.items()):
+            self.team[i] = team_index(pdata.get("team"))
+            self.side[i] = team_side(pdata.get("team"), sides)
+            self.truthy[i] = bool(pid)
+            try:
+                equip = int(pdata.get("equip"))
+            except Exception:
+                continue
+            if _I64_MIN < equip <= _I64_MAX:
+                first.setdefault(equip, i)
+        keys = np.array(sorted(first), dtype=np.int64)
+        rows = np.array([first[k] for k in keys.tolist()], dtype=np.int64)
+        self._lut = None
+        if len(keys) and 0 <= keys[0] and keys[-1] < LUT_LIMIT:
+            self._lut = np.full(int(keys[-1]) + 1, -1, dtype=np.int64)
+            self._lut[keys] = rows
+        self._keys, self._rows = keys, rows
+
+    def lookup(self, equip: "np.ndarray") -> "np.ndarray":
+        """Roster row per equip id, -1 where no player has it."""
+        if self._lut is not None:
+            inside = (equip >= 0) & (equip < len(self._lut))
+            out = np.full(len(equip), -1, dtype=np.int64)
+            out[inside] = self._lut[equip[inside]]
+            return out
+        if not len(self._keys):
+            return np.full(len(equip), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._keys, equip), len(self._keys) - 1)
+        return np.where(self._keys[pos] == equip, self._rows[pos], -1)
+
+
+def _base_table():
+    codes = np.array(sorted(BY_BASE), dtype=np.int64)
+    teams = np.array([BY_BASE[c].index for c in codes.tolist()], dtype=np.int64)
+    return codes, teams
+
+
+def _counter(players: dict, pids: list, key: str) -> "np.ndarray":
+    return np.array([int(players[pid].get(key, 0) or 0) for pid in pids], dtype=np.int64)
+
+
+def _clamp(values: Sequence[int]) -> "np.ndarray":
+    return np.array([v if _I64_MIN < v <= _I64_MAX else _NOWHERE for v in values], dtype=np.int64)
+
+
+def parse_messages(msgs: Iterable[Union[str, Event]]):
+    """
+    Text packets -> (kind, a, b) lists using handle_packet's own parsing
+    rules; returns (kind, a, b, malformed). Empty messages are skipped
+    silently, as handle_packet does. Already-decoded (kind, a, b) events
+    (binary protocol) pass straight through.
+    """
+    kinds, avals, bvals = [], [], []
+    malformed = 0
+    for msg in msgs:
+        if not msg:
+            continue
+        if type(msg) is tuple:
+            kinds.append(msg[0])
+            avals.append(msg[1])
+            bvals.append(msg[2])
+            continue
+        parts = msg.strip().split(":")
+        try:
+            if len(parts) == 1:
+                a, b, kind = int(parts[0]), 0, KIND_ID
+            elif len(parts) == 2:
+                a, b, kind = int(parts[0].strip()), int(parts[1].strip()), KIND_PAIR
+            else:
+                raise ValueError(msg)
+        except ValueError:
+            malformed += 1
+            continue
+        kinds.append(kind)
+        avals.append(a)
+        bvals.append(b)
+    return kinds, avals, bvals, malformed
+
+
+class Outcome(NamedTuple):
+    """Per-event resolution of a block of events (all arrays are parallel to the events)."""
+    att: "np.ndarray"          # attacker roster row, -1 if unknown
+    tgt: "np.ndarray"          # target roster row (tags only), -1 otherwise
+    base_team: "np.ndarray"    # team index of the base hit, -1 if not a base code
+    pair: "np.ndarray"         # "a:b" events
+    is_base: "np.ndarray"
+    is_tag: "np.ndarray"
+    is_hit: "np.ndarray"       # single-id reports
+    base_known: "np.ndarray"   # base event from a known attacker
+    base_scores: "np.ndarray"  # enemy base within the capture limit
+    tag_known: "np.ndarray"    # both players known
+    opposing: "np.ndarray"     # opposing tag that counts
+    friendly: "np.ndarray"     # friendly fire that counts
+    case: "np.ndarray"         # src.game_modes case per event, -1 for malformed / unknown players
+    eliminates: "np.ndarray"   # the tag that took the target's last life
+
+
+def classify(k: "np.ndarray", av: "np.ndarray", bv: "np.ndarray", roster: Roster,
+             rules: Optional[RuleTable] = None, tagged: Optional["np.ndarray"] = None,
+             captures: Optional["np.ndarray"] = None) -> Outcome:
+    """
+    Resolve events to game-mode cases without touching any state. tagged /
+    captures are the players' counters going in (zeros when omitted);
+    elimination depends on event order, so it alone is a pass over the
+    pair events in Python.
+    """
+    rules = rules or RULES
+    pair = k == KIND_PAIR
+    codes, code_team = _base_table()
+    pos = np.minimum(np.searchsorted(codes, bv), len(codes) - 1)
+    base_team = np.where(pair & (codes[pos] == bv), code_team[pos], -1)
+    is_base = base_team >= 0
+    is_tag = pair & ~is_base
+    is_hit = ~pair
+
+    att = roster.lookup(av)
+    tgt = np.where(is_tag, roster.lookup(bv), -1)
+    team = np.append(roster.team, -1)       # row -1 -> no team
+    side = np.append(roster.side, -1)
+    truthy = np.append(roster.truthy, False)
+    att_team = team[att]
+    att_side, tgt_side = side[att], side[tgt]
+
+    base_known = is_base & (att >= 0)
+    tag_known = is_tag & truthy[att] & truthy[tgt]
+    enemy = base_known & (att_team >= 0) & (att_team != base_team)
+    opposing = tag_known & (att_side >= 0) & (tgt_side >= 0) & (att_side != tgt_side)
+
+    case = np.full(len(k), -1, dtype=np.int64)
+    case[is_hit] = HIT
+    case[base_known] = np.where(enemy[base_known], BASE_ENEMY, BASE_OWN)
+    case[tag_known] = np.where(opposing[tag_known], TAG_OPPOSING, TAG_FRIENDLY)
+    eliminates = np.zeros(len(k), dtype=bool)
+    n = len(roster.pids)
+
+    if rules.lives:
+        lives = rules.lives
+        count = (np.zeros(n, dtype=np.int64) if tagged is None else tagged).tolist()
+        att_l, tgt_l, case_l = att.tolist(), tgt.tolist(), case.tolist()
+        for i in np.flatnonzero(base_known | tag_known).tolist():
+            r, t = att_l[i], tgt_l[i]
+            if count[r] >= lives or (t >= 0 and count[t] >= lives):
+                case[i] = OUT
+            elif case_l[i] == TAG_OPPOSING:
+                count[t] += 1
+                eliminates[i] = count[t] == lives
+
+    if rules.capture_limit:
+        rows = np.flatnonzero(case == BASE_ENEMY)
+        if len(rows):
+            # rank of each capture among the same attacker's, in event order
+            who = att[rows]
+            order = np.argsort(who, kind="stable")
+            idx = np.arange(len(rows))
+            start = np.ones(len(rows), dtype=bool)
+            start[1:] = who[order][1:] != who[order][:-1]
+            rank = np.empty(len(rows), dtype=np.int64)
+            rank[order] = idx - np.maximum.accumulate(np.where(start, idx, 0))
+            prior = np.zeros(n, dtype=np.int64) if captures is None else captures
+            case[rows[prior[who] + rank >= rules.capture_limit]] = BASE_LIMIT
+
+    return Outcome(att, tgt, base_team, pair, is_base, is_tag, is_hit, base_known, case == BASE_ENEMY,
+                   tag_known, case == TAG_OPPOSING, case == TAG_FRIENDLY, case, eliminates)
+
+
+def score_batch(kind: Sequence[int], a: Sequence[int], b: Sequence[int], state,
+                udp_send: Optional[Callable[[int], None]] = None, roster: Optional[Roster] = None,
+                metrics: bool = True) -> List[int]:
+    """
+    Apply a block of parsed events to state (scores, has_base, mode
+    counters, event log) under the game mode's rule table; returns the
+    equipment ids to reply with, in order (also sent through udp_send
+    when given). Ids may be Python ints of any size; values that don't
+    fit int64 simply match no player. metrics=False leaves the counters
+    alone (events already counted when they arrived).
+    """
+    n = len(kind)
+    if n == 0:
+        return []
+    if metrics:
+        _m_batches.inc()
+    table = getattr(state, "rules", None) or RULES
+    roster = roster or Roster(state.players or {})
+    # game-mode counters are only read (and kept) by the modes that use them
+    players = state.players
+    tagged = _counter(players, roster.pids, "tagged") if table.lives else None
+    captures = _counter(players, roster.pids, "captures") if table.capture_limit else None
+    o = classify(np.asarray(kind, dtype=np.int64), _clamp(a), _clamp(b), roster, table,
+                 tagged=tagged, captures=captures)
+    att, tgt, case = o.att, o.tgt, o.case
+    base_known, base_scores, tag_known = o.base_known, o.base_scores, o.tag_known
+    is_base, is_tag = o.is_base, o.is_tag
+
+    # score deltas straight from the rule table's columns
+    valid = case >= 0
+    att_d = np.where(valid, table.att_delta[case], 0)
+    tgt_d = np.where(valid & (tgt >= 0), table.tgt_delta[case], 0)
+    delta = np.zeros(len(roster.pids), dtype=np.int64)
+    np.add.at(delta, att[att_d != 0], att_d[att_d != 0])
+    np.add.at(delta, tgt[tgt_d != 0], tgt_d[tgt_d != 0])
+
+    # every player a nonzero rule touched gets written back (even at a net 0, like handle_packet's int())
+    pids = roster.pids
+    scored = np.zeros(len(pids), dtype=bool)
+    scored[att[att_d != 0]] = True
+    scored[tgt[tgt_d != 0]] = True
+    took_base = np.zeros(len(pids), dtype=bool)
+    took_base[att[base_scores]] = True
+    touched = scored | took_base
+    hits = np.bincount(tgt[o.opposing], minlength=len(pids)) if table.lives else None
+    captured = np.bincount(att[base_scores], minlength=len(pids)) if table.capture_limit else None
+    if hits is not None:
+        touched |= hits > 0
+    if captured is not None:
+        touched |= captured > 0
+    history = getattr(state, "score_history", None)
+    t = history.clock() if history is not None else None  # one timestamp for the whole batch
+    team_of = roster.team.tolist() if history is not None else None
+    for i in np.flatnonzero(touched).tolist():
+        pdata = players[pids[i]]
+        d = int(delta[i])
+        if scored[i]:
+            pdata["score"] = score = int(pdata.get("score", 0)) + d
+            if history is not None:
+                history.record(pids[i], team_of[i], score, d, t)
+        if took_base[i]:
+            pdata["has_base"] = True
+        if hits is not None and hits[i]:
+            pdata["tagged"] = int(pdata.get("tagged", 0)) + int(hits[i])
+        if captured is not None and captured[i]:
+            pdata["captures"] = int(pdata.get("captures", 0)) + int(captured[i])
+
+    # event log + replies, in packet order, as each case's rule says
+    replies = []
+    rules = table.rules
+    base_names = {t.index: t.name for t in BY_BASE.values()}
+    rows = np.flatnonzero(case >= 0).tolist()
+    case_l, out_l = case.tolist(), o.eliminates.tolist()
+    att_l, tgt_l, team_l = att.tolist(), tgt.tolist(), o.base_team.tolist()
+    for i in rows:
+        rule = rules[case_l[i]]
+        if rule.log == LOG_BASE:
+            state.log_base(pids[att_l[i]], base_names[team_l[i]])
+        elif rule.log is not None:
+            state.log_tag(pids[att_l[i]], pids[tgt_l[i]], friendly=rule.log == LOG_FRIENDLY)
+            if out_l[i]:
+                state.log_out(pids[att_l[i]], pids[tgt_l[i]])
+        for which in rule.replies:
+            replies.append(a[i] if which == REPLY_A else b[i])
+
+    if metrics:
+        for c, count in enumerate(np.bincount(case[case >= 0], minlength=len(rules)).tolist()):
+            if count:
+                COUNTERS[rules[c].metric].inc(count)
+        COUNTERS["unknown_equip"].inc(int((is_base & (att < 0)).sum() + (is_tag & ~tag_known).sum()))
+
+    if udp_send:
+        for equip in replies:
+            try:
+                udp_send(equip)
+            except Exception:
+                pass
+    return replies
+
+
+def event_text(event: Event) -> str:
+    """The text packet a decoded event stands for."""
+    kind, a, b = event
+    return f"{a}:{b}" if kind == KIND_PAIR else str(a)
+
+
+def handle_batch(msgs: Sequence[Union[str, Event]], state, udp_send: Optional[Callable[[int], None]] = None,
+                 metrics: bool = True) -> List[int]:
+    """
+    handle_packet for a block of packets (text or decoded events); same effects, one vectorized pass.
+    metrics=False re-applies packets without counting them again (journal recovery).
+    """
+    if np is None:
+        replies = []
+
+        def collect(equip):
+            replies.append(equip)
+            if udp_send:
+                udp_send(equip)
+        for msg in msgs:
+            handle_packet(event_text(msg) if type(msg) is tuple else msg, state, udp_send=collect, metrics=metrics)
+        return replies
+    kind, a, b, malformed = parse_messages(msgs)
+    if metrics:
+        COUNTERS["malformed"].inc(malformed)
+    return score_batch(kind, a, b, state, udp_send=udp_send, metrics=metrics)
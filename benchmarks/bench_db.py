@@ -0,0 +1,72 @@
+# benchmarks/bench_db.py
+"""
+db_players against a local Postgres stand-in (throwaway container or test DB).
+libpq reads PGHOST/PGPORT/PGUSER/PGPASSWORD/PGDATABASE, so point those at it;
+the module is skipped when no server answers.
+"""
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extras import execute_values
+
+import db_players
+
+BENCH_IDS = range(900000, 900200)
+
+
+@pytest.fixture(scope="module")
+def db():
+    try:
+        conn = psycopg2.connect(connect_timeout=2, **db_players.connection_params)
+    except psycopg2.Error as e:
+        pytest.skip(f"no Postgres stand-in: {e}")
+    with conn, conn.cursor() as cur:
+        cur.execute("CREATE TABLE IF NOT EXISTS players (id INT PRIMARY KEY, codename VARCHAR(30));")
+        cur.execute("DELETE FROM players WHERE id >= %s AND id < %s;", (BENCH_IDS.start, BENCH_IDS.stop))
+    yield conn
+    with conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM players WHERE id >= %s AND id < %s;", (BENCH_IDS.start, BENCH_IDS.stop))
+    conn.close()
+
+
+def test_add_player(benchmark, db):
+    ids = iter(BENCH_IDS)
+    benchmark.pedantic(lambda: db_players.add_player(next(ids), "Bench"), rounds=100, iterations=1)
+
+
+def test_get_codename(benchmark, db):
+    db_players.add_player(BENCH_IDS[-1], "Bench")
+    benchmark(db_players.get_codename, BENCH_IDS[-1])
+
+
+def test_get_all_players_info(benchmark, db):
+    benchmark(db_players.get_all_players_info)
+
+
+@pytest.fixture(scope="module")
+def leaderboard(db):
+    """10,000 lifetime rows spread over the rating range, bucket counts to match."""
+    import db_matches
+    with db, db.cursor() as cur:
+        cur.execute(db_matches.SCHEMA)
+        cur.execute("DELETE FROM player_totals WHERE player_id >= %s AND player_id < %s;",
+                    (BENCH_IDS.start, BENCH_IDS.start + 10000))
+        rows = [(BENCH_IDS.start + i, f"Bench{i}", 800.0 + (i * 37) % 500) for i in range(10000)]
+        execute_values(cur, "INSERT INTO player_totals (player_id, codename, matches, rating, rating_bucket) VALUES %s",
+                       [(pid, name, 1, r, db_matches.rating_bucket(r)) for pid, name, r in rows])
+        cur.execute("DELETE FROM rating_buckets;")
+        cur.execute("INSERT INTO rating_buckets SELECT rating_bucket, count(*) FROM player_totals GROUP BY 1;")
+    yield
+    with db, db.cursor() as cur:
+        cur.execute("DELETE FROM player_totals WHERE player_id >= %s AND player_id < %s;",
+                    (BENCH_IDS.start, BENCH_IDS.start + 10000))
+        cur.execute("DELETE FROM rating_buckets;")
+        cur.execute("INSERT INTO rating_buckets SELECT rating_bucket, count(*) FROM player_totals GROUP BY 1;")
+
+
+def test_top_players(benchmark, leaderboard):
+    benchmark(db_players.top_players, 10)
+
+
+def test_player_rank(benchmark, leaderboard):
+    benchmark(db_players.player_rank, BENCH_IDS.start + 4321)
@@ -0,0 +1,92 @@
+# benchmarks/bench_ingest.py
+import wire
+from batch_scoring import handle_batch
+from packet_filter import DedupeWindow
+from packet_handler import handle_packet
+from src.game_modes import compile_mode, parse_mode
+from src.match_replay import EVENT
+from src.match_stats import from_recording_events
+from udp_receiver import Receiver, _binary_events
+
+
+def test_validate_micro(benchmark, packets):
+    validate = Receiver._validate
+    sample = packets[:1000]
+
+    def run():
+        for msg in sample:
+            validate(msg)
+    benchmark(run)
+
+
+def test_handle_packet_micro(benchmark, app_state):
+    # one opposing tag between the last-entered players (worst case for the equip lookup)
+    red = [p["equip"] for p in app_state.players.values() if p["team"] == "Red"][-1]
+    green = [p["equip"] for p in app_state.players.values() if p["team"] == "Green"][-1]
+    msg = f"{red}:{green}"
+    benchmark(handle_packet, msg, app_state)
+
+
+def test_handle_packet_macro(benchmark, app_state, packets):
+    # the full seeded mix: tags, friendly fire, bases, single-id hits
+    def run():
+        for msg in packets:
+            handle_packet(msg, app_state)
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def test_handle_batch_macro(benchmark, app_state, packets):
+    # same mix as test_handle_packet_macro, applied in 256-packet blocks like Arena.pump
+    def run():
+        for i in range(0, len(packets), 256):
+            handle_batch(packets[i:i + 256], app_state)
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def test_handle_batch_elimination_macro(benchmark, app_state, packets):
+    # elimination + capture limit: the only modes with an order-dependent pass
+    app_state.rules = compile_mode(parse_mode("elimination,lives=5,capture_limit=3"))
+
+    def run():
+        for pdata in app_state.players.values():
+            pdata.pop("tagged", None)
+            pdata.pop("captures", None)
+        for i in range(0, len(packets), 256):
+            handle_batch(packets[i:i + 256], app_state)
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def test_decode_text_macro(benchmark, packets):
+    # receive-side work for the seeded mix as text: one datagram per event
+    datagrams = [msg.encode() for msg in packets]
+    validate = Receiver._validate
+
+    def run():
+        dedupe = DedupeWindow(0)
+        for data in datagrams:
+            msg = data.decode(errors="ignore").strip()
+            if validate(msg):
+                dedupe.seen((("127.0.0.1", 1), msg))
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def test_decode_binary_macro(benchmark, packets):
+    # same events in the binary protocol, wire.MAX_RECORDS per datagram
+    records = []
+    for seq, msg in enumerate(packets):
+        a, sep, b = msg.partition(":")
+        records.append((wire.KIND_PAIR if sep else wire.KIND_ID, seq, int(a), int(b or 0), 0))
+    datagrams = wire.encode_all(records)
+
+    def run():
+        dedupe = DedupeWindow(0)
+        for data in datagrams:
+            _binary_events(wire.decode(data), ("127.0.0.1", 1), dedupe)
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def test_match_stats_macro(benchmark, app_state, packets):
+    # post-game analytics over the seeded mix's tags and bases (what the recording keeps)
+    events = b"".join(EVENT.pack(i * 0.01, *map(int, msg.split(":"))) for i, msg in enumerate(packets) if ":" in msg)
+    benchmark.pedantic(from_recording_events, args=(app_state.players, events), rounds=5, iterations=1,
+                       warmup_rounds=1)
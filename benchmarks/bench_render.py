@@ -0,0 +1,34 @@
+# benchmarks/bench_render.py
+import pygame
+
+from packet_handler import handle_packet
+from src.graphs.charts import draw_bar_chart, draw_momentum, draw_team_table
+from src.score_history import ScoreHistory
+from src.ui.screens.play_display import PlayDisplay
+
+
+def test_play_display_draw(benchmark, screen, app_state, packets):
+    for msg in packets[:500]:  # realistic scores + a full ticker
+        handle_packet(msg, app_state)
+    view = PlayDisplay(app_state)
+    benchmark(view.draw, screen)
+
+
+def test_draw_team_table(benchmark, screen, roster):
+    rect = pygame.Rect(520, 40, 340, 420)
+    benchmark(draw_team_table, screen, rect, roster, "Teams")
+
+
+def test_draw_bar_chart(benchmark, screen):
+    rect = pygame.Rect(520, 480, 340, 100)
+    benchmark(draw_bar_chart, screen, rect, {"Red": 15, "Green": 14}, "Team Counts")
+
+
+def test_draw_momentum(benchmark, screen):
+    # a minute at ~2,000 score changes a second: the frame cost doesn't depend on the rate
+    history = ScoreHistory(2, clock=lambda: 60.0)
+    history.reset({}, t=0.0)
+    for i in range(120_000):
+        history.record(i % 40, i % 2, i, 10, t=i / 2000)
+    rect = pygame.Rect(520, 480, 360, 120)
+    benchmark(lambda: draw_momentum(screen, rect, history.momentum(), [(220, 60, 60), (60, 200, 90)]))
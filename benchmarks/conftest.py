@@ -0,0 +1,45 @@
+# benchmarks/conftest.py
+import os
+import sys
+
+# headless rendering; must be set before pygame creates a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from udp_loadtest import TrafficMix, make_roster
+
+ROSTER_SIZES = [15, 50, 200]
+
+
+@pytest.fixture(params=ROSTER_SIZES, ids=lambda n: f"{n}p")
+def roster(request):
+    return make_roster(request.param)
+
+
+@pytest.fixture
+def packets(roster):
+    """A fixed, seeded 5,000-packet mix for the roster (no latency probes)."""
+    return [msg for _t, msg in TrafficMix(probe=0.0).generate(roster, rate=5000, duration=1.0, seed=1)]
+
+
+@pytest.fixture
+def app_state(roster):
+    from main import AppState
+    state = AppState()
+    state.players.update({pid: dict(p) for pid, p in roster.items()})
+    return state
+
+
+@pytest.fixture(scope="session")
+def screen():
+    import pygame
+    pygame.init()
+    surf = pygame.display.set_mode((900, 600))
+    yield surf
+    pygame.quit()
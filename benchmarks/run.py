@@ -0,0 +1,87 @@
+# benchmarks/run.py
+"""
+Run the benchmark suite and compare it with the saved baseline.
+
+  python benchmarks/run.py              # run, write benchmarks/results.json, diff vs baseline if saved
+  python benchmarks/run.py --compare    # same, but a missing baseline is an error (CI)
+  python benchmarks/run.py --baseline   # run and (re)write benchmarks/baseline.json
+  python benchmarks/run.py -k render    # extra args go straight to pytest
+
+The committed baseline.json is from one reference machine; numbers from
+another box only compare meaningfully against a baseline taken there.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "baseline.json")
+RESULTS = os.path.join(HERE, "results.json")
+REGRESSION_PCT = 10.0  # flag anything this much slower than baseline
+
+
+def _means(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {b["fullname"]: b["stats"]["mean"] for b in data.get("benchmarks", [])}
+
+
+def _strip_samples(path):
+    """Drop the raw per-round timings from a saved run; the summary stats are what gets compared."""
+    with open(path) as f:
+        data = json.load(f)
+    for b in data.get("benchmarks", []):
+        b["stats"].pop("data", None)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def compare(baseline: str, results: str) -> int:
+    """Print per-benchmark change vs baseline; returns how many regressed."""
+    base, cur = _means(baseline), _means(results)
+    regressed = 0
+    width = max((len(n) for n in cur), default=10)
+    for name in sorted(cur):
+        if name not in base:
+            print(f"{name:<{width}}  {cur[name] * 1e6:12.2f}us  (new)")
+            continue
+        pct = (cur[name] - base[name]) / base[name] * 100.0
+        flag = "  REGRESSION" if pct > REGRESSION_PCT else ""
+        regressed += bool(flag)
+        print(f"{name:<{width}}  {cur[name] * 1e6:12.2f}us  {pct:+7.1f}%{flag}")
+    return regressed
+
+
+def main(argv):
+    write_baseline = "--baseline" in argv
+    require_baseline = "--compare" in argv
+    if write_baseline and require_baseline:
+        print("--baseline and --compare don't mix")
+        return 2
+    if require_baseline and not os.path.exists(BASELINE):
+        print(f"No baseline at {BASELINE}; run with --baseline to save one.")
+        return 2
+    extra = [a for a in argv if a not in ("--baseline", "--compare")]
+    out = BASELINE if write_baseline else RESULTS
+    os.chdir(os.path.dirname(HERE))  # repo root, so assets/ paths resolve
+    code = pytest.main([
+        HERE, "-q",
+        "--benchmark-sort=fullname",
+        f"--benchmark-json={out}",
+        *extra,
+    ])
+    if write_baseline and code == 0:
+        _strip_samples(BASELINE)  # it's committed; keep it small
+    if code not in (0, pytest.ExitCode.NO_TESTS_COLLECTED) or write_baseline:
+        return int(code)
+    if os.path.exists(BASELINE):
+        return 1 if compare(BASELINE, RESULTS) else 0
+    print("No baseline yet; run with --baseline to save one.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
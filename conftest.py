@@ -0,0 +1,12 @@
+# conftest.py
+import os
+
+# headless pygame, no metrics port, no database: set before any test imports the app
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("PHOTON_METRICS_PORT", "0")
+os.environ.setdefault("PHOTON_USE_STUBS", "1")
+
+# manual scripts (they open a window / talk to a live database), not tests
+collect_ignore = ["test_db_players.py", "src/test_player_entry.py"]
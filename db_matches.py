@@ -0,0 +1,381 @@
+# db_matches.py
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from db_players import RATING_BUCKET, RATING_START, connection_params
+from app_logging import get_logger
+from metrics import REGISTRY
+
+log = get_logger("db")
+_m_write = REGISTRY.histogram("photon_db_call_seconds", call="match_history_write")
+
+BATCH_SIZE = 500        # rows per multi-row INSERT
+FLUSH_INTERVAL = 1.0    # seconds; flush at least this often while events trickle in
+MAX_PENDING = 20000     # bounded buffer; events past this are dropped, never blocked on
+RETRY_SECONDS = 10.0    # back-off after the DB is unreachable
+RATING_K = 32.0         # Elo step per match
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id SERIAL PRIMARY KEY,
+    started_at TIMESTAMPTZ NOT NULL,
+    ended_at TIMESTAMPTZ
+);
+CREATE TABLE IF NOT EXISTS match_events (
+    match_id INT NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    ts TIMESTAMPTZ NOT NULL,
+    kind TEXT NOT NULL,
+    shooter_id INT NOT NULL,
+    target_id INT,
+    base_color TEXT
+);
+CREATE INDEX IF NOT EXISTS match_events_match_idx ON match_events (match_id);
+CREATE TABLE IF NOT EXISTS match_scores (
+    match_id INT NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    player_id INT NOT NULL,
+    codename TEXT,
+    team TEXT,
+    score INT NOT NULL,
+    has_base BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (match_id, player_id)
+);
+-- lifetime leaderboard, updated once per finished match (see MatchRecorder._end)
+CREATE TABLE IF NOT EXISTS player_totals (
+    player_id INT PRIMARY KEY,
+    codename TEXT,
+    matches INT NOT NULL DEFAULT 0,
+    wins INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    best_score INT NOT NULL DEFAULT 0,
+    tags INT NOT NULL DEFAULT 0,
+    tagged INT NOT NULL DEFAULT 0,
+    friendly INT NOT NULL DEFAULT 0,
+    bases INT NOT NULL DEFAULT 0,
+    rating DOUBLE PRECISION NOT NULL,
+    rating_bucket INT NOT NULL,
+    updated_at TIMESTAMPTZ
+);
+-- top-N walks this index; a rank only counts rows inside the player's own bucket
+CREATE INDEX IF NOT EXISTS player_totals_rank_idx ON player_totals (rating DESC, player_id);
+CREATE INDEX IF NOT EXISTS player_totals_bucket_idx ON player_totals (rating_bucket, rating DESC, player_id);
+-- players per rating bucket, so "how many are ahead of me" is a sum over a few hundred rows
+CREATE TABLE IF NOT EXISTS rating_buckets (
+    bucket INT PRIMARY KEY,
+    players INT NOT NULL
+);
+"""
+
+_UPSERT_TOTALS = """
+INSERT INTO player_totals (player_id, codename, matches, wins, total_score, best_score,
+                           tags, tagged, friendly, bases, rating, rating_bucket, updated_at) VALUES %s
+ON CONFLICT (player_id) DO UPDATE SET
+    codename = EXCLUDED.codename,
+    matches = player_totals.matches + 1,
+    wins = player_totals.wins + EXCLUDED.wins,
+    total_score = player_totals.total_score + EXCLUDED.total_score,
+    best_score = GREATEST(player_totals.best_score, EXCLUDED.best_score),
+    tags = player_totals.tags + EXCLUDED.tags,
+    tagged = player_totals.tagged + EXCLUDED.tagged,
+    friendly = player_totals.friendly + EXCLUDED.friendly,
+    bases = player_totals.bases + EXCLUDED.bases,
+    rating = EXCLUDED.rating,
+    rating_bucket = EXCLUDED.rating_bucket,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+def rating_bucket(rating: float) -> int:
+    return int(rating // RATING_BUCKET)
+
+
+def team_rating_deltas(scores: Dict[str, int], ratings: Dict[str, float], k: float = RATING_K) -> Dict[str, float]:
+    """
+    Elo over teams: each team plays every other one (win 1, draw 0.5, loss 0)
+    against its expected result from the average ratings; the mean of those
+    is scaled by k. Every player on a team moves by the team's delta.
+    """
+    deltas = {}
+    for team, score in scores.items():
+        others = [t for t in scores if t != team]
+        if not others:
+            deltas[team] = 0.0
+            continue
+        total = 0.0
+        for other in others:
+            expected = 1.0 / (1.0 + 10 ** ((ratings[other] - ratings[team]) / 400.0))
+            actual = 1.0 if score > scores[other] else 0.5 if score == scores[other] else 0.0
+            total += actual - expected
+        deltas[team] = k * total / len(others)
+    return deltas
+
+
+class MatchRecorder:
+    """
+    Write-behind buffer for match history.
+    The game loop only appends small tuples; a background thread turns them
+    into batched multi-row INSERTs so a slow or missing DB never stalls a frame.
+    """
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._items = deque()
+        self._cv = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._conn = None
+        self._retry_at = 0.0
+        self._match_id: Optional[int] = None
+        # per-player [tags, tagged, friendly, bases] of the current match, kept on the
+        # game-loop side so lifetime totals don't depend on which events made it to the DB
+        self._tally: Dict[int, List[int]] = {}
+        # counters (read from the UI thread; dropped is bumped by both threads, under _cv)
+        self.written = 0
+        self.dropped = 0
+
+    # Start the writer in a background thread
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    # Stop the writer after draining whatever is still buffered
+    def stop(self, timeout: float = 5.0):
+        with self._cv:
+            self._running = False
+            self._cv.notify()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._conn:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
+
+    # ---- game-loop side (never blocks on the DB) ----
+    def begin_match(self):
+        self._tally = {}
+        self._offer(("begin", time.time()), force=True)
+
+    def record_tag(self, shooter_pid, target_pid, friendly=False):
+        kind = "friendly" if friendly else "tag"
+        self._count(shooter_pid, 2 if friendly else 0)
+        if not friendly:
+            self._count(target_pid, 1)
+        self._offer(("event", (time.time(), kind, shooter_pid, target_pid, None)))
+
+    def record_base(self, shooter_pid, base_color):
+        self._count(shooter_pid, 3)
+        self._offer(("event", (time.time(), "base", shooter_pid, None, base_color)))
+
+    def _count(self, pid, i):
+        counts = self._tally.get(pid)
+        if counts is None:
+            counts = self._tally[pid] = [0, 0, 0, 0]
+        counts[i] += 1
+
+    def end_match(self, players: dict):
+        """Queue final scores and this match's per-player counts; the writer flushes them immediately."""
+        rows = [
+            (pid, p.get("codename"), p.get("team"), int(p.get("score", 0) or 0), bool(p.get("has_base")),
+             *self._tally.get(pid, (0, 0, 0, 0)))
+            for pid, p in (players or {}).items()
+        ]
+        self._tally = {}
+        self._offer(("end", time.time(), rows), force=True)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is written (tests/shutdown only)."""
+        done = threading.Event()
+        self._offer(("flush", done), force=True)
+        return done.wait(timeout)
+
+    def _offer(self, item, force=False):
+        with self._cv:
+            if not force and len(self._items) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._items.append(item)
+            if force or len(self._items) >= self.batch_size:
+                self._cv.notify()
+
+    # ---- writer thread ----
+    def _loop(self):
+        while True:
+            with self._cv:
+                if self._running and len(self._items) < self.batch_size:
+                    self._cv.wait(self.flush_interval)
+                items, self._items = self._items, deque()
+                running = self._running
+            if items:
+                self._write(items)
+            if not running:
+                with self._cv:
+                    if not self._items:
+                        break
+
+    def _write(self, items):
+        events = []
+        for item in items:
+            kind = item[0]
+            if kind == "event":
+                events.append(item[1])
+                if len(events) >= self.batch_size:
+                    self._insert_events(events)
+                    events = []
+                continue
+            # control items keep their order relative to events
+            if events:
+                self._insert_events(events)
+                events = []
+            if kind == "begin":
+                self._begin(item[1])
+            elif kind == "end":
+                self._end(item[1], item[2])
+            elif kind == "flush":
+                item[1].set()
+        if events:
+            self._insert_events(events)
+
+    def _cursor(self):
+        if self._conn is not None:
+            return self._conn.cursor()
+        if time.monotonic() < self._retry_at:
+            return None
+        try:
+            self._conn = psycopg2.connect(connect_timeout=3, **connection_params)
+            with self._conn.cursor() as cur:
+                cur.execute(SCHEMA)
+            self._conn.commit()
+            return self._conn.cursor()
+        except psycopg2.Error as e:
+            log.warning("Match history: DB unavailable (%s); retrying in %.0fs", str(e).strip(), RETRY_SECONDS)
+            self._reset()
+            return None
+
+    def _reset(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+        self._conn = None
+        self._retry_at = time.monotonic() + RETRY_SECONDS
+
+    def _drop(self, n: int):
+        # the game loop counts its drops under _cv too
+        with self._cv:
+            self.dropped += n
+
+    def _run(self, fn, n_rows: int) -> bool:
+        cur = self._cursor()
+        if cur is None:
+            self._drop(n_rows)
+            return False
+        t0 = time.perf_counter()
+        try:
+            with cur:
+                fn(cur)
+            self._conn.commit()
+            _m_write.observe(time.perf_counter() - t0)
+            self.written += n_rows
+            return True
+        except psycopg2.Error as e:
+            log.warning("Match history: write failed (%s)", str(e).strip())
+            self._drop(n_rows)
+            self._reset()
+            return False
+
+    def _begin(self, ts):
+        self._match_id = None
+
+        def fn(cur):
+            cur.execute("INSERT INTO matches (started_at) VALUES (to_timestamp(%s)) RETURNING id;", (ts,))
+            self._match_id = cur.fetchone()[0]
+        self._run(fn, 0)
+
+    def _insert_events(self, events):
+        if self._match_id is None:
+            self._drop(len(events))
+            return
+        match_id = self._match_id
+        rows = [(match_id, ts, kind, shooter, target, base) for (ts, kind, shooter, target, base) in events]
+        self._run(lambda cur: execute_values(
+            cur,
+            "INSERT INTO match_events (match_id, ts, kind, shooter_id, target_id, base_color) VALUES %s",
+            rows,
+            template="(%s, to_timestamp(%s), %s, %s, %s, %s)",
+            page_size=self.batch_size,
+        ), len(rows))
+
+    def _end(self, ts, score_rows):
+        if self._match_id is None:
+            self._drop(len(score_rows))
+            return
+        match_id = self._match_id
+
+        def fn(cur):
+            cur.execute("UPDATE matches SET ended_at = to_timestamp(%s) WHERE id = %s;", (ts, match_id))
+            if score_rows:
+                execute_values(
+                    cur,
+                    "INSERT INTO match_scores (match_id, player_id, codename, team, score, has_base) VALUES %s "
+                    "ON CONFLICT (match_id, player_id) DO UPDATE SET score = EXCLUDED.score, has_base = EXCLUDED.has_base",
+                    [(match_id,) + r[:5] for r in score_rows],
+                )
+                self._update_totals(cur, ts, score_rows)
+        self._run(fn, len(score_rows))
+        self._match_id = None
+
+    @staticmethod
+    def _update_totals(cur, ts: float, score_rows: List[Tuple]):
+        """
+        Fold one match into player_totals + rating_buckets, inside the
+        transaction that writes its scores. score_rows are end_match()'s
+        (pid, codename, team, score, has_base, tags, tagged, friendly, bases):
+        the counts come from memory, not match_events, so events dropped on
+        the way to the DB still count. Ratings move by team Elo, and each
+        bucket count is adjusted by the players that left or joined it.
+        """
+        pids = sorted({r[0] for r in score_rows})
+        # lock in id order so two arenas finishing together can't deadlock
+        cur.execute("SELECT player_id, rating FROM player_totals WHERE player_id = ANY(%s) "
+                    "ORDER BY player_id FOR UPDATE;", (pids,))
+        old = dict(cur.fetchall())
+
+        team_scores: Dict[str, int] = Counter()
+        members: Dict[str, List[float]] = {}
+        for pid, _codename, team, score, *_counts in score_rows:
+            if team:
+                team_scores[team] += score
+                members.setdefault(team, []).append(old.get(pid, RATING_START))
+        team_ratings = {t: sum(r) / len(r) for t, r in members.items()}
+        deltas = team_rating_deltas(team_scores, team_ratings)
+        best = max(team_scores.values(), default=None)
+        winners = [t for t, sc in team_scores.items() if sc == best]
+
+        rows, buckets = [], Counter()
+        for pid, codename, team, score, _has_base, tags, tagged, friendly, bases in score_rows:
+            before = old.get(pid)
+            rating = (RATING_START if before is None else before) + deltas.get(team, 0.0)
+            if before is not None:
+                buckets[rating_bucket(before)] -= 1
+            buckets[rating_bucket(rating)] += 1
+            won = int(len(winners) == 1 and team == winners[0])
+            rows.append((pid, codename, 1, won, score, score, tags, tagged, friendly, bases,
+                         rating, rating_bucket(rating), ts))
+        execute_values(cur, _UPSERT_TOTALS, rows,
+                       template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, to_timestamp(%s))")
+        moved = sorted((b, n) for b, n in buckets.items() if n)
+        if moved:
+            execute_values(cur, "INSERT INTO rating_buckets (bucket, players) VALUES %s ON CONFLICT (bucket) "
+                                "DO UPDATE SET players = rating_buckets.players + EXCLUDED.players", moved)
@@ -1,5 +1,9 @@
+import functools
+import time
 import psycopg2
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from metrics import REGISTRY
 
 connection_params = {
     "dbname": "photon",
@@ -9,6 +13,33 @@ connection_params = {
     # "port": "5432",
 }
 
+# lifetime leaderboard (tables live in db_matches.SCHEMA, filled when a match ends)
+RATING_START = 1000.0
+RATING_BUCKET = 10.0  # rating points per rating_buckets row
+
+_RANK = """
+SELECT t.rating, t.matches, t.wins,
+       1 + COALESCE((SELECT sum(players) FROM rating_buckets WHERE bucket > t.rating_bucket), 0)
+         + (SELECT count(*) FROM player_totals o
+             WHERE o.rating_bucket = t.rating_bucket
+               AND (o.rating > t.rating OR (o.rating = t.rating AND o.player_id < t.player_id)))
+  FROM player_totals t WHERE t.player_id = %s;
+"""
+
+def _timed(fn):
+    """Record call latency as photon_db_call_seconds{call=<function name>}."""
+    hist = REGISTRY.histogram("photon_db_call_seconds", "Wall time of db_players calls", call=fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            hist.observe(time.perf_counter() - t0)
+    return wrapper
+
+@_timed
 def get_codename(player_id: int) -> Optional[str]:
     conn = cur = None
     try:
@@ -21,6 +52,7 @@ def get_codename(player_id: int) -> Optional[str]:
         if cur: cur.close()
         if conn: conn.close()
 
+@_timed
 def add_player(player_id: int, codename: str) -> bool:
     conn = cur = None
     try:
@@ -37,6 +69,7 @@ def add_player(player_id: int, codename: str) -> bool:
         if cur: cur.close()
         if conn: conn.close()
 
+@_timed
 def clear_all_players():
     conn = cur = None
     try:
@@ -49,6 +82,7 @@ def clear_all_players():
         if cur: cur.close()
         if conn: conn.close()
 
+@_timed
 def get_all_players_info():
     conn = cur = None
     try:
@@ -61,3 +95,43 @@ def get_all_players_info():
     finally:
         if cur: cur.close()
         if conn: conn.close()
+
+def warm_up(timeout: int = 3):
+    """Open and close one connection (driver, DNS, auth) while the splash is up."""
+    conn = psycopg2.connect(connect_timeout=timeout, **connection_params)
+    conn.close()
+
+@_timed
+def top_players(n: int = 10) -> List[Tuple]:
+    """Lifetime leaders: (rank, id, codename, rating, matches, wins, total_score), best first."""
+    conn = cur = None
+    try:
+        conn = psycopg2.connect(**connection_params)
+        cur = conn.cursor()
+        cur.execute("SELECT player_id, codename, rating, matches, wins, total_score FROM player_totals "
+                    "ORDER BY rating DESC, player_id LIMIT %s;", (n,))
+        return [(i,) + row for i, row in enumerate(cur.fetchall(), 1)]
+    finally:
+        if cur: cur.close()
+        if conn: conn.close()
+
+@_timed
+def player_rank(player_id: int) -> Optional[Tuple[int, float, int, int]]:
+    """
+    (rank, rating, matches, wins) for one player, None if they haven't finished a match.
+    Players ahead = the per-bucket counts above theirs + a count inside their own bucket,
+    so the cost doesn't grow with the number of players.
+    """
+    conn = cur = None
+    try:
+        conn = psycopg2.connect(**connection_params)
+        cur = conn.cursor()
+        cur.execute(_RANK, (player_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        rating, matches, wins, rank = row
+        return int(rank), float(rating), matches, wins
+    finally:
+        if cur: cur.close()
+        if conn: conn.close()
@@ -1,29 +1,63 @@
 # main.py
+from startup import STARTUP  # first, so the startup clock covers the imports below
+import os
 import sys
+import threading
 import pygame
-from collections import deque
 import time
 
-# === UI Screens ===
-from src.ui.screens.player_entry import PlayerEntry  # real entry screen
-from src.ui.screens.play_display import PlayDisplay  # real play screen
+# UI screens, batch scoring, match stats / archive and the score charts are
+# imported where they are first used (or by the "modules" warm-up during the
+# splash), so NumPy and the screen modules stay out of the startup path.
 
 # === Networking / Packets ===
-from udp_receiver import start_receiver
+from udp_receiver import INGEST_WORKERS, start_receiver, start_multi_receiver
 from udp_broadcast import send_equipment_id, send_special_code
 from packet_handler import handle_packet
+from packet_trace import TRACE_ENABLED, PacketTracer
+from app_logging import get_logger, setup_logging
+from metrics import REGISTRY, start_http_server
 
 # === Timer (Sprint 4) ===
 from src.game_timer import GameTimer, GameState
+from src.match_journal import JOURNAL_DIR, MatchJournal
+from src.match_replay import REPLAY_DIR, ReplayWriter, MatchReplay, latest_recording
+from src.event_log import COALESCE_SECONDS, EventLog
+from src.game_modes import RULES
+from src.teams import TEAMS
+from src.assets import ASSETS, BASE_ICON, LOGO
 
 # -----------------------------
 # Config
 # -----------------------------
 WIDTH, HEIGHT = 900, 600
 FPS = 60
-SPLASH_DURATION_MS = 3000  # 3 seconds
+SPLASH_MIN_MS = 800        # logo stays up at least this long...
+SPLASH_DURATION_MS = 3000  # ...and leaves once warm-up is done, or after 3 seconds at most
 APP_TITLE = "Laser Tag - Sprint 4"
-LOGO_PATH = "assets/logo.jpg"  # path to your logo
+LOGO_PATH = LOGO  # path to your logo
+LOGO_SIZE = (400, 300)
+RECV_PORT, SEND_PORT = 7501, 7500
+# several games in one process: name:recv_port:send_port per arena (Ctrl+1..9 switches the window)
+#   PHOTON_ARENAS="A:7501:7500,B:7511:7510,C:7521:7520"
+ARENAS = os.getenv("PHOTON_ARENAS", "")
+PUMP_BATCH = 256  # packets applied per arena per frame (one batch_scoring pass)
+
+log = get_logger("app")
+_m_frame = REGISTRY.histogram("photon_frame_seconds", "Time between frames (clock.tick)")
+_m_frame_work = REGISTRY.histogram("photon_frame_work_seconds", "Events + network + update + draw + flip time per frame")
+
+
+def apply_uncounted(msg, state):
+    """Re-apply a packet that was already counted when it arrived (replays)."""
+    handle_packet(msg, state, metrics=False)
+
+
+def apply_batch_uncounted(events, state):
+    """Re-apply a block of decoded events that were already counted (journal recovery)."""
+    from batch_scoring import handle_batch
+    handle_batch(events, state, metrics=False)
+
 
 # -----------------------------
 # Shared App State for screens
@@ -31,36 +65,61 @@ LOGO_PATH = "assets/logo.jpg"  # path to your logo
 class AppState:
     def __init__(self):
         # team name -> count (used by charts)
-        self.team_counts = {"Red": 0, "Green": 0}
+        self.team_counts = {t.name: 0 for t in TEAMS}
         # pid -> {codename, team, equip, score, has_base}
         self.players = {}
-        # rolling play-by-play log
-        self.event_log = deque(maxlen=200)
+        # play-by-play log: compact records, formatted only when drawn
+        # (bursts of one event fold into a "×N" line only if PHOTON_TICKER_COALESCE is set)
+        self.event_log = EventLog(namer=self.name_, coalesce_window=COALESCE_SECONDS)
         # where UDP should broadcast by default (can be changed later)
         self.addr = "127.0.0.1"
+        self.port = SEND_PORT
 
         # --- Sprint 4 Timers (attached to shared state) ---
         # 30s pre-game countdown → 6 min gameplay timer
         self.timer = GameTimer(start_countdown=30, play_seconds=6*60)
 
+        # optional write-behind match history (db_matches.MatchRecorder)
+        self.recorder = None
+        # crash-recovery journal (src/match_journal.MatchJournal), set by App
+        self.journal = None
+        # seekable match recording for the replay viewer (src/match_replay.ReplayWriter)
+        self.replay_writer = None
+        # ingest flood guard of this game's receiver (packet_filter.FloodGuard), set by App
+        self.flood_guard = None
+        # game mode rule table (src/game_modes); replays swap in the recorded match's
+        self.rules = RULES
+        self.event_log.templates = RULES.templates
+        # team/player score series for the live charts, sampled on every score change
+        from src.score_history import ScoreHistory
+        self.score_history = ScoreHistory(len(TEAMS), clock=self.match_time)
+
+    def match_time(self) -> float:
+        """Game seconds since the start signal: negative in the countdown, past play_total once ended."""
+        timer = self.timer
+        if timer.state == GameState.COUNTDOWN:
+            return timer.elapsed() - timer.start_countdown_total
+        if timer.state == GameState.ENDED:
+            return timer.play_total + timer.elapsed()
+        return timer.elapsed()
+
     def name_(self, pid):
         player = self.players.get(pid, {})
         return player.get("codename") or str(pid)
 
     # play-by-play helpers
     def log_tag(self, shooter_pid, target_pid, friendly=False):
-        sname = self.name_(shooter_pid)
-        tname = self.name_(target_pid)
-        if friendly:
-            text = f"Friendly fire: {sname} tagged teammate {tname} (−10 each)"
-        else:
-            text = f"{sname} tagged {tname} (+10 {sname})"
-        self.event_log.append({"ts": time.time(), "text": text})
+        self.event_log.log_tag(shooter_pid, target_pid, friendly)
+        if self.recorder:
+            self.recorder.record_tag(shooter_pid, target_pid, friendly=friendly)
 
     def log_base(self, shooter_pid, base_color):
-        sname = self.name_(shooter_pid)
-        text = f"{sname} scored the {base_color} base! (+100)"
-        self.event_log.append({"ts": time.time(), "text": text})
+        self.event_log.log_base(shooter_pid, base_color)
+        if self.recorder:
+            self.recorder.record_base(shooter_pid, base_color)
+
+    def log_out(self, shooter_pid, target_pid):
+        self.event_log.log_out(shooter_pid, target_pid)
 
 
 # -----------------------------
@@ -91,20 +150,19 @@ class BaseScreen:
 # -----------------------------
 class SplashScreen(BaseScreen):
     def on_enter(self):
-        self.start_time = pygame.time.get_ticks()
-        try:
-            self.logo = pygame.image.load(LOGO_PATH).convert_alpha()
-            self.logo = pygame.transform.smoothscale(self.logo, (400, 300))
-        except Exception:
-            # fallback if logo not found
-            self.logo = pygame.Surface((400, 300), pygame.SRCALPHA)
-            self.logo.fill((30, 30, 40))
+        self.start_time = time.monotonic()
+        # placeholder until the asset thread has decoded the logo (or if it's missing)
+        self.placeholder = pygame.Surface(LOGO_SIZE, pygame.SRCALPHA)
+        self.placeholder.fill((30, 30, 40))
 
     def update(self, dt):
-        elapsed = pygame.time.get_ticks() - self.start_time
-        if elapsed >= SPLASH_DURATION_MS:
+        elapsed = (time.monotonic() - self.start_time) * 1000
+        if elapsed >= SPLASH_DURATION_MS or (elapsed >= SPLASH_MIN_MS and STARTUP.done()):
             self.manager.switch_to("player_entry")
 
+    def on_exit(self):
+        STARTUP.interactive()
+
     def handle_event(self, event):
         # allow any key or click to skip splash
         if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
@@ -112,7 +170,8 @@ class SplashScreen(BaseScreen):
 
     def draw(self, surface):
         surface.fill((10, 12, 20))
-        surface.blit(self.logo, self.logo.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+        logo = ASSETS.image(LOGO_PATH, LOGO_SIZE) or self.placeholder
+        surface.blit(logo, logo.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
 
 
 # -----------------------------
@@ -124,23 +183,29 @@ class PlayerEntryScreen(BaseScreen):
         self.state = state
 
         def _on_start():
-            app = getattr(manager, "_app", None)
-            if app:
-                app.reset_scores_bases() # reset scores and base icon for a new game
+            arena = getattr(manager, "_arena", None)
+            if arena:
+                arena.reset_scores_bases() # reset scores and base icon for a new game
             manager.switch_to("play")
 
         # create the actual PlayerEntry view and tell it how to start the game
+        from src.ui.screens.player_entry import PlayerEntry  # real entry screen
         self.view = PlayerEntry(
             state=state,
-            on_start=_on_start
+            on_start=_on_start,
+            on_replay=lambda: manager.switch_to("replay"),
         )
 
     # delegate lifecycle + io to the real view so all buttons/inputs work
     def on_enter(self):
         # reset any end-of-game one-shot flags when coming back to lobby
-        app = getattr(self.manager, "_app", None)
-        if app:
-            app._end_broadcasted = False
+        arena = getattr(self.manager, "_arena", None)
+        if arena:
+            arena._end_broadcasted = False
+        # an abandoned or finished match goes back to LOBBY; its pending deadlines are dropped
+        self.state.timer.reset()
+        if self.state.journal:
+            self.state.journal.discard()
         if hasattr(self.view, "on_enter"):
             self.view.on_enter()
 
@@ -165,12 +230,35 @@ class PlayDisplayScreen(BaseScreen):
     def __init__(self, manager, state: AppState):
         super().__init__(manager)
         self.state = state
+        from src.ui.screens.play_display import PlayDisplay  # real play screen
         self.view = PlayDisplay(state)
+        # set by App when a crashed match was restored from the journal
+        self.resume = False
 
     def on_enter(self):
+        if self.resume:
+            # timer + scores already rebuilt; just line the view up with them
+            self.resume = False
+            if self.state.recorder:
+                self.state.recorder.begin_match()
+            if self.state.replay_writer:
+                # records from the recovered scoreboard on, so the match still gets stats and an archive entry
+                position = self.state.match_time() + self.state.timer.start_countdown_total
+                self.state.replay_writer.begin(self.state, position=position)
+            if hasattr(self.view, "resume"):
+                self.view.resume(self.state.timer)
+            return
         # restart the 30s pre-game countdown each time the play screen opens
         if self.state.timer.state != GameState.COUNTDOWN:
             self.state.timer.start_countdown()
+            self.state.event_log.clear()  # new match, fresh ticker + stream
+            self.state.score_history.reset(self.state.players)
+            if self.state.recorder:
+                self.state.recorder.begin_match()
+            if self.state.journal:
+                self.state.journal.begin(self.state)
+            if self.state.replay_writer:
+                self.state.replay_writer.begin(self.state)
         if hasattr(self.view, "enter"):
             self.view.enter()
 
@@ -180,14 +268,124 @@ class PlayDisplayScreen(BaseScreen):
             self.view.handle_event(event, manager=self.manager)
 
     def update(self, dt):
-        # advance timer each frame (handles transition COUNTDOWN -> PLAYING -> ENDED)
-        self.state.timer.tick()
         self.view.update(dt)
 
     def draw(self, surface):
         self.view.draw(surface)
 
 
+# -----------------------------
+# Results Screen (post-game stats of the match that just ended)
+# -----------------------------
+class ResultsScreen(BaseScreen):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.view = None  # built on the first match that has stats
+
+    def show(self, stats):
+        if self.view is None:
+            from src.ui.screens.results import Results  # post-game stats
+            self.view = Results(on_back=lambda: self.manager.switch_to("player_entry"))
+        self.view.show(stats)
+
+    def handle_event(self, event):
+        if self.view:
+            self.view.handle_event(event)
+
+    def draw(self, surface):
+        if self.view:
+            self.view.draw(surface)
+        else:
+            super().draw(surface)
+
+
+# -----------------------------
+# Replay Screen (PlayDisplay fed by a recorded match)
+# -----------------------------
+REPLAY_SPEEDS = [0.5, 1, 2, 5, 10, 20, 50]
+REPLAY_SEEK_STEP = 10.0  # seconds per LEFT/RIGHT press
+
+
+class ReplayScreen(BaseScreen):
+    """
+    Scrub through the latest recording with the normal play rendering.
+    SPACE pause, LEFT/RIGHT seek, UP/DOWN speed, HOME restart, BACKSPACE lobby.
+    """
+    def __init__(self, manager, directory: str = REPLAY_DIR):
+        super().__init__(manager)
+        self.directory = directory
+        self.replay = None
+        self.view = None
+        self.speed_idx = REPLAY_SPEEDS.index(1)
+        self.paused = False
+        self.message = ""
+        self.font = None
+
+    def on_enter(self):
+        self.replay = self.view = None
+        self.paused = False
+        self.speed_idx = REPLAY_SPEEDS.index(1)
+        path = latest_recording(self.directory)
+        if path is None:
+            self.message = "No recorded matches yet - press BACKSPACE"
+            return
+        state = AppState()
+        try:
+            self.replay = MatchReplay(path, state, apply_uncounted)
+        except (OSError, ValueError) as e:
+            self.message = f"Could not open {path}: {e}"
+            return
+        from src.ui.screens.play_display import PlayDisplay
+        self.view = PlayDisplay(state)
+        self.message = os.path.basename(path)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.view \
+                and self.view._back_button_rect and self.view._back_button_rect.collidepoint(event.pos):
+            self.manager.switch_to("player_entry")
+            return
+        if self.view and (event.type == pygame.MOUSEWHEEL or
+                          (event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN))):
+            self.view.handle_event(event)  # scroll rosters / ticker
+            return
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_BACKSPACE:
+            self.manager.switch_to("player_entry")
+        elif self.replay is None:
+            return
+        elif event.key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif event.key == pygame.K_RIGHT:
+            self.replay.seek(self.replay.position + REPLAY_SEEK_STEP)
+        elif event.key == pygame.K_LEFT:
+            self.replay.seek(self.replay.position - REPLAY_SEEK_STEP)
+        elif event.key == pygame.K_UP:
+            self.speed_idx = min(len(REPLAY_SPEEDS) - 1, self.speed_idx + 1)
+        elif event.key == pygame.K_DOWN:
+            self.speed_idx = max(0, self.speed_idx - 1)
+        elif event.key == pygame.K_HOME:
+            self.replay.seek(0.0)
+
+    def update(self, dt):
+        if self.replay and not self.paused and not self.replay.finished:
+            self.replay.advance(dt * REPLAY_SPEEDS[self.speed_idx])
+
+    def draw(self, surface):
+        if self.font is None:
+            self.font = pygame.font.SysFont("Arial", 18, bold=True)
+        if self.view is None:
+            surface.fill((20, 20, 25))
+            surface.blit(self.font.render(self.message, True, (235, 235, 245)), (40, 40))
+            return
+        self.view.draw(surface)
+        pos, total = int(self.replay.position), int(self.replay.duration)
+        status = "PAUSED" if self.paused else f"{REPLAY_SPEEDS[self.speed_idx]:g}x"
+        text = f"REPLAY {status}  {pos // 60}:{pos % 60:02d} / {total // 60}:{total % 60:02d}  ({self.message})"
+        label = self.font.render(text, True, (255, 235, 59))
+        surface.blit(label, ((WIDTH - label.get_width()) // 2, 20))
+
+
 # -----------------------------
 # Screen Manager
 # -----------------------------
@@ -195,7 +393,7 @@ class ScreenManager:
     def __init__(self):
         self.registry = {}
         self.active = None
-        self._app = None  # back reference to App for small resets
+        self._arena = None  # back reference to the owning Arena for small resets
 
     def register(self, name, screen):
         self.registry[name] = screen
@@ -208,45 +406,349 @@ class ScreenManager:
 
 
 # -----------------------------
-# App / Main loop
+# Arenas
 # -----------------------------
-class App:
-    def __init__(self):
-        pygame.init()
-        pygame.font.init()
-        pygame.display.set_caption(APP_TITLE)
-
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        self.clock = pygame.time.Clock()
+def parse_arenas(spec: str):
+    """Parse "A:7501:7500,B:7511:7510" into (name, recv_port, send_port) tuples; empty -> the single default arena."""
+    arenas = []
+    for part in (p.strip() for p in (spec or "").split(",")):
+        if part:
+            name, recv, send = part.split(":")
+            arenas.append((name.strip(), int(recv), int(send)))
+    return arenas or [("", RECV_PORT, SEND_PORT)]
+
+
+class Arena:
+    """
+    One game: its own AppState (players, timer, event log), journal, recording,
+    match history, screens and port pair. Every arena's engine runs each frame;
+    only the one on screen is drawn.
+    """
+    def __init__(self, name: str, recv_port: int, send_port: int):
+        self.name = name
+        self.recv_port, self.send_port = recv_port, send_port
+        self.channel = None  # set by App once the receiver is up
+        self._end_broadcasted = False  # one-shot end-code guard
 
-        # shared state for DB/UDP/UI (includes Sprint 4 timer)
         self.state = AppState()
-
-        # start UDP receiver
-        self.receiver = start_receiver(bind_addr="0.0.0.0", port=7501)
+        self.state.port = send_port
+
+        # every finished match is kept for the replay viewer, and in columns for season stats
+        self.state.replay_writer = ReplayWriter(os.path.join(REPLAY_DIR, name))
+        self.archive = None  # src/match_archive.MatchArchive, opened with the first finished match
+
+        # rebuild a match that was in progress when the last run crashed
+        self.state.journal = MatchJournal(os.path.join(JOURNAL_DIR, name))
+        # full play-by-play stream for the current match lives next to the journal
+        self.state.event_log.open_spill(os.path.join(self.state.journal.directory, "event_stream.bin"))
+        self.resumed = self.state.journal.recover(self.state, apply_batch_uncounted)
+        # end-of-match hooks run when the timer's ENDED deadline fires
+        self.state.timer.subscribe(self._on_phase)
+        if self.resumed:
+            log.info("Recovered in-progress match%s (%d players)", self.label(" in arena "), len(self.state.players))
+
+        # match history: a resumed match needs it now, otherwise App starts it during the splash
+        if self.resumed:
+            self.start_recorder()
 
         # screens
         self.manager = ScreenManager()
-        self.manager._app = self  # allow small resets from screens
+        self.manager._arena = self  # allow small resets from screens
         self.manager.register("splash", SplashScreen(self.manager))
         self.manager.register("player_entry", PlayerEntryScreen(self.manager, self.state))
         self.manager.register("play", PlayDisplayScreen(self.manager, self.state))
-        self.manager.switch_to("splash")
+        self.manager.register("replay", ReplayScreen(self.manager, self.state.replay_writer.directory))
+        self.manager.register("results", ResultsScreen(self.manager))
 
-        self.running = True
+    def start_recorder(self):
+        """Match history is best-effort: no DB (or stub mode) just disables it."""
+        if os.getenv("PHOTON_USE_STUBS", "0") == "1" or self.state.recorder is not None:
+            return
+        try:
+            from db_matches import MatchRecorder  # imports psycopg2
+            recorder = MatchRecorder()
+            recorder.start()
+            self.state.recorder = recorder
+        except Exception as e:
+            log.warning("Match history disabled: %s", e)
+
+    def label(self, prefix: str = "") -> str:
+        return f"{prefix}{self.name}" if self.name else ""
+
+    def start(self, splash: bool):
+        if self.resumed:
+            self.manager.registry["play"].resume = True
+            self.manager.switch_to("play")
+        else:
+            self.manager.switch_to("splash" if splash else "player_entry")
+
+    def set_shown(self, shown: bool):
+        """Hand the music channel to the arena on screen."""
+        view = self.manager.registry["play"].view
+        if not shown:
+            view._music_stop()
+        view.audible = shown
+        if shown and self.state.timer.state == GameState.PLAYING and self.manager.active is self.manager.registry["play"]:
+            try:
+                view._music_start()
+            except Exception:
+                log.warning("Could not start background music")
 
-        # one-shot end-code guard
-        self._end_broadcasted = False
-    
     def reset_scores_bases(self):
         players = getattr(self.state, "players", {}) or {}
         for pdata in players.values():
             pdata["score"] = 0
             pdata["has_base"] = False
+            pdata.pop("tagged", None)     # game-mode counters
+            pdata.pop("captures", None)
+
+    def pump(self, tracer=None):
+        """Apply this frame's packet(s) from the arena's channel."""
+        if self.channel is None:
+            return
+        if self.state.timer.state == GameState.ENDED:
+            # drain any leftovers quickly to keep UI stable, but do not update state
+            while self.channel.get_message_nowait():
+                pass
+            return
+        # apply everything queued (up to PUMP_BATCH) in one vectorized scoring pass
+        # an entry is one text packet or a list of decoded (kind, a, b) events (binary datagram / ingest workers)
+        get = self.channel.get_message_nowait
+        msgs, events = [], []
+        while len(events) < PUMP_BATCH:
+            msg = get()
+            if not msg:
+                break
+            msgs.append(msg)
+            if type(msg[0]) is list:
+                events.extend(msg[0])
+            else:
+                events.append(msg[0])
+        if not msgs:
+            return
+        t_dequeued = time.perf_counter()
+
+        # mini wrapper so UI can reply with equipment id to sender
+        def _udp_send(equip_id: int):
+            try:
+                send_equipment_id(int(equip_id), addr=self.state.addr, port=self.state.port)
+            except Exception:
+                pass
+
+        from batch_scoring import handle_batch  # loaded by the "modules" warm-up; a dict lookup from here on
+        handle_batch(events, self.state, udp_send=_udp_send)
+        if tracer:
+            t_applied = time.perf_counter()
+            for msg in msgs:
+                if len(msg) > 2:
+                    tracer.packet_applied(msg[2], t_dequeued, t_applied)
+        journal, replay = self.state.journal, self.state.replay_writer
+        if journal or replay:
+            for event in events:
+                if type(event) is tuple:
+                    if journal:
+                        journal.append_event(*event)
+                    if replay:
+                        replay.append_event(*event, self.state)
+                else:
+                    if journal:
+                        journal.append(event)
+                    if replay:
+                        replay.append(event, self.state)
+
+    def update(self, dt, surface=None):
+        """Fire due phase deadlines, advance the active screen (drawing it when on screen), flush the journal."""
+        # COUNTDOWN -> PLAYING -> ENDED happen here, at their deadlines (a no-op compare otherwise)
+        self.state.timer.tick()
+
+        if self.manager.active:
+            self.manager.active.update(dt)
+            if surface is not None:
+                self.manager.active.draw(surface)
+
+        # crash recovery: hand this frame's packets to the OS, snapshot now and then
+        if self.state.journal and self.state.timer.state in (GameState.COUNTDOWN, GameState.PLAYING):
+            self.state.journal.flush()
+            self.state.journal.maybe_snapshot(self.state)
+
+    def _on_phase(self, phase):
+        if phase != GameState.ENDED:
+            return
+        # final flush of match history (scores are frozen from here on)
+        if self.state.recorder:
+            self.state.recorder.end_match(self.state.players)
+        if self.state.journal:
+            self.state.journal.end(self.state)
+        if self.state.replay_writer:
+            try:
+                self.state.replay_writer.finish(self.state)
+            except OSError as e:
+                log.warning("Failed to save match recording: %s", e)
+            self._finish_stats()
+        # tell traffic generator to stop (exactly once)
+        if not self._end_broadcasted:
+            try:
+                send_special_code(221, repeat=3, addr=self.state.addr, port=self.state.port)
+            except Exception:
+                log.warning("Failed to send end code 221")
+            self._end_broadcasted = True
+
+    def _finish_stats(self):
+        """Post-game stats (needs NumPy and a recorded match): archive them, swap Game Over for Results."""
+        writer = self.state.replay_writer
+        events = writer.events
+        if not events:
+            return
+        from src.match_stats import from_recording_events
+        t0 = time.perf_counter()
+        stats = from_recording_events(self.state.players, events, offset=writer.countdown,
+                                      rules=self.state.rules)
+        if stats is None:
+            return
+        log.info("Match stats%s: %d events, %d players in %.1f ms", self.label(" for arena "),
+                 stats.n_events, len(stats.pids), (time.perf_counter() - t0) * 1000)
+        players = {pid: dict(p) for pid, p in self.state.players.items()}
+        threading.Thread(target=self._archive, args=(stats, players, writer.started), name="archive",
+                         daemon=True).start()
+        if self.manager.active is self.manager.registry["play"]:
+            self.manager.registry["results"].show(stats)
+            self.manager.switch_to("results")
+
+    def _archive(self, stats, players, started):
+        from src.match_archive import ARCHIVE_DIR, MatchArchive
+        try:
+            if self.archive is None:
+                self.archive = MatchArchive(os.path.join(ARCHIVE_DIR, self.name))
+            self.archive.add(stats, players, started)
+        except OSError as e:
+            log.warning("Failed to archive match: %s", e)
+
+    def close(self):
+        if self.state.recorder:
+            self.state.recorder.stop()
+        if self.state.journal:
+            self.state.journal.close()
+        self.state.event_log.close_spill()
+
+
+# -----------------------------
+# App / Main loop
+# -----------------------------
+class App:
+    def __init__(self):
+        # queue-backed logging first so nothing below writes to stdout synchronously
+        setup_logging()
+        STARTUP.mark("imports")
+        # only the subsystems the first frame needs
+        pygame.display.init()
+        pygame.font.init()
+        pygame.display.set_caption(APP_TITLE)
+
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.clock = pygame.time.Clock()
+        STARTUP.mark("display")
+
+        # SDL audio has to come up on the main thread; only the track files are read in the background
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            log.warning("No audio: %s", e)
+        STARTUP.mark("mixer")
+
+        # decode images off the main thread while the splash is up
+        ASSETS.start()
+        ASSETS.preload_image(LOGO_PATH, LOGO_SIZE)
+        ASSETS.preload_image(BASE_ICON)
+
+        # one Arena per game (just one unless PHOTON_ARENAS lists several)
+        self.arenas = [Arena(name, recv, send) for name, recv, send in parse_arenas(ARENAS)]
+        self.shown = 0
+
+        # Prometheus text endpoint for ops (PHOTON_METRICS_PORT, 0 disables)
+        self.metrics_server = start_http_server()
+        if self.metrics_server:
+            log.info("Metrics on http://127.0.0.1:%d/metrics", self.metrics_server.server_address[1])
+
+        # optional socket-to-pixels latency tracing (PHOTON_TRACE=1, F8 dumps)
+        self.tracer = PacketTracer() if TRACE_ENABLED else None
+        self.receiver = None
+
+        # everything slow and independent runs while the splash is up
+        STARTUP.warm_up("network", self._start_receiver)
+        STARTUP.warm_up("modules", self._warm_modules)
+        self.arenas[self.shown].manager.registry["play"].view.preload_music()  # waited on by "assets"
+        STARTUP.warm_up("fonts", lambda: pygame.font.SysFont("Arial", 16))  # first SysFont scans system fonts
+        STARTUP.warm_up("assets", ASSETS.wait_idle)
+        if os.getenv("PHOTON_USE_STUBS", "0") != "1":
+            STARTUP.warm_up("db", self._warm_db)
+
+        for i, arena in enumerate(self.arenas):
+            arena.set_shown(i == self.shown)
+            arena.start(splash=i == self.shown)
+        self._update_caption()
+        STARTUP.mark("arenas")
+        if self.manager.active is not self.manager.registry["splash"]:
+            STARTUP.interactive()  # resumed match: no splash
+
+        self.running = True
+
+    def _start_receiver(self):
+        """Bind the UDP socket(s); arenas ignore the network until their channel is attached."""
+        # a single arena keeps the dedicated socket thread, several share one selector thread that routes by port
+        trace = self.tracer is not None
+        if len(self.arenas) == 1:
+            self.receiver = start_receiver(bind_addr="0.0.0.0", port=self.arenas[0].recv_port, trace=trace)
+            self.arenas[0].state.flood_guard = self.receiver.flood_guard
+            self.arenas[0].channel = self.receiver
+        else:
+            if INGEST_WORKERS:
+                log.warning("PHOTON_INGEST_WORKERS only applies to single-arena mode; using one selector thread")
+            self.receiver = start_multi_receiver(bind_addr="0.0.0.0", ports=[a.recv_port for a in self.arenas],
+                                                 trace=trace)
+            for arena in self.arenas:
+                channel = self.receiver.channel(arena.recv_port)
+                arena.state.flood_guard = channel.flood_guard
+                arena.channel = channel
+
+    def _warm_modules(self):
+        """Modules first needed by the first packet or the end of a match (NumPy among them)."""
+        import batch_scoring  # noqa: F401
+        import src.match_stats  # noqa: F401
+        import src.match_archive  # noqa: F401
+        import src.ui.screens.results  # noqa: F401
+
+    def _warm_db(self):
+        import db_players  # psycopg2
+        for arena in self.arenas:
+            arena.start_recorder()
+        db_players.warm_up()
+
+    # the arena on screen (kept as attributes for tools that poke at App)
+    @property
+    def state(self) -> AppState:
+        return self.arenas[self.shown].state
+
+    @property
+    def manager(self) -> ScreenManager:
+        return self.arenas[self.shown].manager
+
+    def show(self, index: int):
+        if index == self.shown or not 0 <= index < len(self.arenas):
+            return
+        self.arenas[self.shown].set_shown(False)
+        self.shown = index
+        self.arenas[index].set_shown(True)
+        self._update_caption()
+
+    def _update_caption(self):
+        arena = self.arenas[self.shown]
+        pygame.display.set_caption(f"{APP_TITLE} - Arena {arena.name}" if arena.name else APP_TITLE)
 
     def run(self):
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0
+            _m_frame.observe(dt)
+            t_frame = time.perf_counter()
 
             # --- events ---
             for event in pygame.event.get():
@@ -254,63 +756,37 @@ class App:
                     self.running = False
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F8 and self.tracer:
+                    self.tracer.dump()
+                elif event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL \
+                        and pygame.K_1 <= event.key <= pygame.K_9:
+                    self.show(event.key - pygame.K_1)
                 else:
                     if self.manager.active:
                         self.manager.active.handle_event(event)
 
-            # --- network poll (non-blocking) ---
-            if hasattr(self, "receiver"):
-                if self.state.timer.state != GameState.ENDED:
-                    # process at most one packet per frame while active
-                    msg = self.receiver.get_message_nowait()
-                    if msg:
-                        text, addr = msg
-
-                        # mini wrapper so UI can reply with equipment id to sender
-                        def _udp_send(equip_id: int):
-                            try:
-                                send_equipment_id(int(equip_id), addr=self.state.addr, port=7500)
-                            except Exception:
-                                pass
-
-                        handle_packet(text, self.state, udp_send=_udp_send)
-                else:
-                    # drain any leftovers quickly to keep UI stable, but do not update state
-                    while self.receiver.get_message_nowait():
-                        pass
-
-            # --- update & draw current screen ---
-            # capture state before update to detect transitions
-            prev_state = self.state.timer.state
-
-            if self.manager.active:
-                self.manager.active.update(dt)
-                self.manager.active.draw(self.screen)
-
-            # detect transition to ENDED and broadcast end code 221 exactly once
-            if prev_state != self.state.timer.state and self.state.timer.state == GameState.ENDED:
-                # stop background music if play screen provided a helper
-                try:
-                    if getattr(self.manager.active, "view", None) and hasattr(self.manager.active.view, "_music_stop"):
-                        self.manager.active.view._music_stop()
-                except Exception:
-                    pass
-                # tell traffic generator to stop
-                if not self._end_broadcasted:
-                    try:
-                        send_special_code(221, repeat=3, addr=self.state.addr, port=7500)
-                    except Exception:
-                        print("Failed to send end code 221")
-                    self._end_broadcasted = True
+            # --- network poll (non-blocking) + update; only the shown arena draws ---
+            for i, arena in enumerate(self.arenas):
+                arena.pump(self.tracer)
+                arena.update(dt, self.screen if i == self.shown else None)
 
             pygame.display.flip()
+            _m_frame_work.observe(time.perf_counter() - t_frame)
+            if self.tracer:
+                self.tracer.frame_flipped(time.perf_counter())
 
         # clean shutdown
-        if hasattr(self, "receiver"):
-            try:
-                self.receiver.stop()
-            except Exception:
-                pass
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        if self.tracer:
+            self.tracer.dump()
+        try:
+            self.receiver.stop()
+        except Exception:
+            pass
+        for arena in self.arenas:
+            arena.close()
+        ASSETS.stop()
 
         pygame.quit()
         sys.exit()
@@ -0,0 +1,161 @@
+# metrics.py
+"""
+In-process metrics with a Prometheus text endpoint.
+
+Hot paths grab their metric objects once at import time, so recording is a
+single attribute add (no locks, no dict lookups). Each counter is written by
+one thread (receiver thread, game loop, or DB writer); the HTTP thread only
+reads, so a scrape may be a packet behind but never blocks a writer.
+Histograms are the exception: one series can be timed from several threads
+(e.g. DB calls), so observe() and scrapes share a per-histogram lock.
+
+  PHOTON_METRICS_PORT=9108   (default; 0 disables)   curl localhost:9108/metrics
+"""
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("PHOTON_METRICS_PORT", "9108") or 0)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.0167, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+
+class Gauge:
+    """Value read from a callback at scrape time (e.g. a queue depth)."""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    @property
+    def value(self):
+        try:
+            return self.fn()
+        except Exception:
+            return float("nan")
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, v):
+        i = bisect.bisect_left(self.bounds, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+            self.count += 1
+
+    def snapshot(self):
+        """(counts, sum, count) from one instant, so buckets and count agree."""
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    def __init__(self):
+        self._families = {}  # name -> (type, help, {labels_tuple: metric})
+        self._lock = threading.Lock()  # registration only, never on record()
+
+    def _get(self, kind, name, help_text, labels, factory):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            fam = self._families.setdefault(name, (kind, help_text, {}))
+            if fam[0] != kind:
+                raise ValueError(f"metric {name} already registered as {fam[0]}")
+            children = fam[2]
+            if key not in children:
+                children[key] = factory()
+            return children[key]
+
+    def counter(self, name, help_text="", **labels) -> Counter:
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name, fn, help_text="", **labels) -> Gauge:
+        g = self._get("gauge", name, help_text, labels, lambda: Gauge(fn))
+        g.fn = fn  # re-registering (e.g. a new Receiver) rebinds the callback
+        return g
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._get("histogram", name, help_text, labels, lambda: Histogram(buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines = []
+        with self._lock:
+            families = [(name, fam[0], fam[1], list(fam[2].items())) for name, fam in sorted(self._families.items())]
+        for name, kind, help_text, children in families:
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, m in children:
+                if kind == "histogram":
+                    counts, total, count = m.snapshot()
+                    cum = 0
+                    for bound, c in zip(m.bounds + (float("inf"),), counts):
+                        cum += c
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cum}")
+                    lines.append(f"{name}_sum{_labels(key)} {total}")
+                    lines.append(f"{name}_count{_labels(key)} {count}")
+                else:
+                    lines.append(f"{name}{_labels(key)} {m.value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+REGISTRY = Registry()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # scrapes every few seconds; don't spam the console
+
+
+def start_http_server(port: int = METRICS_PORT, addr: str = "127.0.0.1"):
+    """Serve /metrics from a daemon thread; returns the server (or None if disabled/busy)."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((addr, port), _Handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
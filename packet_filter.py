@@ -0,0 +1,215 @@
+# packet_filter.py
+"""
+Ingest filters that run in the receive path, before a datagram is queued
+for handle_packet.
+
+DedupeWindow drops an event whose (source, payload) was already accepted
+within the last `window` seconds: equipment retransmits on a flaky link.
+Without it every copy scores again. Binary records carry the device's
+sequence number, so a retransmit is told apart from a real repeat. A text
+datagram is only "a:b", so its window is kept to retransmit scale: copies
+arrive within milliseconds, while a vest can't fire the same tag twice
+that fast, so legitimate repeat tags still count.
+
+  PHOTON_DEDUPE_WINDOW=0.1         (seconds, binary records; 0 disables)
+  PHOTON_TEXT_DEDUPE_WINDOW=0.03   (seconds, text datagrams; 0 disables)
+
+FloodGuard sheds traffic from any one source address or equipment id that
+exceeds its token bucket, so a broken vest spamming at wire speed can't
+fill the queue and starve everyone else. Rates are packets/s (0 disables):
+
+  PHOTON_FLOOD_ADDR_RATE=2000  PHOTON_FLOOD_ADDR_BURST=4000
+  PHOTON_FLOOD_EQUIP_RATE=50   PHOTON_FLOOD_EQUIP_BURST=100
+"""
+import os
+import time
+from array import array
+from typing import List, Tuple
+
+from app_logging import get_logger
+from metrics import REGISTRY
+
+log = get_logger("net.guard")
+
+DEDUPE_WINDOW = float(os.getenv("PHOTON_DEDUPE_WINDOW", "0.1") or 0)
+TEXT_DEDUPE_WINDOW = float(os.getenv("PHOTON_TEXT_DEDUPE_WINDOW", "0.03") or 0)
+DEDUPE_CAPACITY = 8192   # keys remembered at most; older ones are forgotten early
+
+FLOOD_ADDR_RATE = float(os.getenv("PHOTON_FLOOD_ADDR_RATE", "2000") or 0)
+FLOOD_ADDR_BURST = float(os.getenv("PHOTON_FLOOD_ADDR_BURST", "4000") or 0)
+FLOOD_EQUIP_RATE = float(os.getenv("PHOTON_FLOOD_EQUIP_RATE", "50") or 0)
+FLOOD_EQUIP_BURST = float(os.getenv("PHOTON_FLOOD_EQUIP_BURST", "100") or 0)
+MAX_BUCKETS = 4096        # tracked sources per kind; idle (refilled) buckets are pruned past this
+OFFENDER_WINDOW = 10.0    # seconds an offender stays listed after its last shed packet (roughly)
+
+_m_shed_addr = REGISTRY.counter("photon_packets_shed_total", "Packets dropped by the per-device flood guard",
+                                limit="addr")
+_m_shed_equip = REGISTRY.counter("photon_packets_shed_total", limit="equip")
+
+
+class DedupeWindow:
+    """
+    Time-windowed set of recently accepted keys. A fixed ring of
+    (key, arrival) pairs ages them out in arrival order and a dict maps each
+    live key to its arrival, so memory stays at `capacity` entries whatever
+    the traffic. Keys are compared whole, not by hash, so two different
+    events never shadow each other. Repeats don't extend the window: a key
+    is accepted again once `window` has passed since it was last let in.
+    """
+    def __init__(self, window: float = DEDUPE_WINDOW, capacity: int = DEDUPE_CAPACITY):
+        self.window = window
+        self.capacity = capacity
+        self._key = [None] * capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._head = 0   # slot of the next entry
+        self._len = 0
+        self._live = {}  # key -> arrival of the accepted copy
+        self.passed = 0
+        self.dropped = 0
+
+    def seen(self, key, now: float = None) -> bool:
+        """True if key repeats one accepted within the window (the caller drops it); else remember it."""
+        if self.window <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        self._expire(now - self.window)
+        if key in self._live:
+            self.dropped += 1
+            return True
+        if self._len == self.capacity:
+            self._pop()
+        i = self._head
+        self._key[i] = key
+        self._ts[i] = now
+        self._head = (i + 1) % self.capacity
+        self._len += 1
+        self._live[key] = now
+        self.passed += 1
+        return False
+
+    def _expire(self, cutoff):
+        while self._len and self._ts[(self._head - self._len) % self.capacity] < cutoff:
+            self._pop()
+
+    def _pop(self):
+        i = (self._head - self._len) % self.capacity
+        key = self._key[i]
+        self._key[i] = None
+        if self._live.get(key) == self._ts[i]:
+            del self._live[key]
+        self._len -= 1
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self):
+        self._head = self._len = 0
+        self._key = [None] * self.capacity
+        self._ts = array("d", bytes(8 * self.capacity))
+        self._live.clear()
+
+
+class TokenBuckets:
+    """One token bucket per key: `rate` tokens/s, holding at most `burst`."""
+    def __init__(self, rate: float, burst: float, max_keys: int = MAX_BUCKETS):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, last refill]
+
+    def take(self, key, now: float) -> bool:
+        """Spend one token for key; False if its bucket is empty."""
+        b = self._buckets.get(key)
+        if b is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = [self.burst - 1, now]
+            return True
+        tokens = min(self.burst, b[0] + (now - b[1]) * self.rate)
+        b[1] = now
+        if tokens >= 1:
+            b[0] = tokens - 1
+            return True
+        b[0] = tokens
+        return False
+
+    def _prune(self, now):
+        # a bucket that has refilled is indistinguishable from a new one
+        full = self.burst / self.rate if self.rate > 0 else 0.0
+        idle = [k for k, (_t, last) in self._buckets.items() if now - last >= full]
+        for k in idle:
+            del self._buckets[k]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()  # spoofed-source storm: forget rather than grow
+
+
+class FloodGuard:
+    """
+    Admission control at ingest: a packet must get a token from its source
+    address's bucket and from its equipment id's bucket (the first number
+    in the payload). Shed packets are counted per offender so the UI and
+    logs can name the device.
+    """
+    def __init__(self, addr_rate: float = FLOOD_ADDR_RATE, addr_burst: float = FLOOD_ADDR_BURST,
+                 equip_rate: float = FLOOD_EQUIP_RATE, equip_burst: float = FLOOD_EQUIP_BURST,
+                 window: float = OFFENDER_WINDOW, clock=time.monotonic):
+        self.addr = TokenBuckets(addr_rate, addr_burst) if addr_rate > 0 else None
+        self.equip = TokenBuckets(equip_rate, equip_burst) if equip_rate > 0 else None
+        self.window = window
+        self.shed = 0
+        self._cur = {}   # offender label -> packets shed this window
+        self._prev = {}
+        self._clock = clock
+        self._since = clock()
+
+    def admit(self, host: str, msg: str, now: float = None) -> bool:
+        """True if the packet may be queued; False (and counted) if its source is over the limit."""
+        if self.addr is None and self.equip is None:
+            return True
+        equip = msg.partition(":")[0].strip()
+        try:
+            equip = int(equip)  # same bucket as the binary protocol's numeric ids
+        except ValueError:
+            pass
+        return self._admit(host, equip, now)
+
+    def admit_equip(self, host: str, equip: int, now: float = None) -> bool:
+        """admit() for an already-decoded event (binary protocol / ingest workers)."""
+        if self.addr is None and self.equip is None:
+            return True
+        return self._admit(host, equip, now)
+
+    def _admit(self, host, equip, now):
+        now = self._clock() if now is None else now
+        if self.addr is not None and not self.addr.take(host, now):
+            _m_shed_addr.inc()
+            self._offend(host, now)
+            return False
+        if self.equip is not None and not self.equip.take(equip, now):
+            _m_shed_equip.inc()
+            self._offend(f"equip {equip}", now)
+            return False
+        return True
+
+    def _offend(self, label, now):
+        self.shed += 1
+        if now - self._since >= self.window:
+            self._prev, self._cur = self._cur, {}
+            self._since = now
+        n = self._cur.get(label)
+        if n is None:
+            if len(self._cur) >= MAX_BUCKETS:
+                return
+            if label not in self._prev:
+                log.warning("Flood guard shedding traffic from %s", label)
+            n = 0
+        self._cur[label] = n + 1
+
+    def offenders(self, n: int = 3) -> List[Tuple[str, int]]:
+        """Worst recent offenders as (label, packets shed), most first. Safe to call from the UI thread."""
+        if self._clock() - self._since >= 2 * self.window:
+            return []  # nothing shed for a while
+        counts = self._prev.copy()
+        for label, c in self._cur.copy().items():
+            counts[label] = counts.get(label, 0) + c
+        return sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
@@ -1,4 +1,41 @@
 # packet_handler.py
+from metrics import REGISTRY
+from src.game_modes import (BASE_ENEMY, BASE_LIMIT, BASE_OWN, HIT, OUT, REPLY_A, RULES, TAG_FRIENDLY,
+                             TAG_OPPOSING)
+from src.teams import BY_BASE, team_index, team_side
+
+_APPLIED = "photon_packets_applied_total"
+_IGNORED = "photon_packets_ignored_total"
+_m_tag = REGISTRY.counter(_APPLIED, "Packets handle_packet acted on", kind="tag")
+_m_friendly = REGISTRY.counter(_APPLIED, kind="friendly")
+_m_base = REGISTRY.counter(_APPLIED, kind="base")
+_m_hit = REGISTRY.counter(_APPLIED, kind="hit")
+_m_malformed = REGISTRY.counter(_IGNORED, "Packets handle_packet dropped without scoring", reason="malformed")
+_m_unknown = REGISTRY.counter(_IGNORED, reason="unknown_equip")
+_m_own_base = REGISTRY.counter(_IGNORED, reason="own_base")
+_m_eliminated = REGISTRY.counter(_IGNORED, reason="eliminated")
+_m_capture_limit = REGISTRY.counter(_IGNORED, reason="capture_limit")
+# Rule.metric (and the parse outcomes) -> counter; batch_scoring counts into the same series
+COUNTERS = {"tag": _m_tag, "friendly": _m_friendly, "base": _m_base, "hit": _m_hit,
+             "own_base": _m_own_base, "eliminated": _m_eliminated, "capture_limit": _m_capture_limit,
+             "malformed": _m_malformed, "unknown_equip": _m_unknown}
+
+
+# (packet kind, attacker on the other side?) -> game-mode case, before the mode's limits
+_CASES = {("base", True): BASE_ENEMY, ("base", False): BASE_OWN,
+          ("tag", True): TAG_OPPOSING, ("tag", False): TAG_FRIENDLY}
+
+
+class _Uncounted:
+    __slots__ = ()
+
+    def inc(self, n=1):
+        pass
+
+
+# journal recovery and replays re-apply packets that were already counted when they arrived
+_UNCOUNTED = dict.fromkeys(COUNTERS, _Uncounted())
+
 def _find_pid_by_equip(state, equip_id):
     """Return player PID for given equipment id, or None."""
     for pid, pdata in (state.players or {}).items():
@@ -9,51 +46,81 @@ def _find_pid_by_equip(state, equip_id):
             pass
     return None
 
-def handle_packet(msg: str, state, udp_send=None):
+def _scored(state, pid, team, delta):
+    """Sample a score change into the live score history, when state keeps one."""
+    history = getattr(state, "score_history", None)
+    if history is not None:
+        history.record(pid, team, state.players[pid]["score"], delta)
+
+def _add(state, pid, team, delta):
+    if delta:
+        pdata = state.players[pid]
+        pdata["score"] = int(pdata.get("score", 0)) + delta
+        _scored(state, pid, team, delta)
+
+def _reply(rule, a, b, udp_send):
+    if udp_send:
+        try:
+            for which in rule.replies:
+                udp_send(a if which == REPLY_A else b)
+        except Exception:
+            pass
+
+def handle_packet(msg: str, state, udp_send=None, metrics: bool = True):
     """
     Minimal packet handler for incoming UDP messages.
     msg: string like "12:34" or "123"
     udp_send(equip_id) is optional callback to send numeric replies (function(equip_id:int))
+    Scoring follows the game mode's rule table (state.rules, else src.game_modes.RULES).
+    metrics=False re-applies a packet without counting it again (journal recovery, replays).
     """
     if not msg:
         return
+    counters = COUNTERS if metrics else _UNCOUNTED
+    table = getattr(state, "rules", None) or RULES
+    rules = table.rules
 
     msg = msg.strip()
     # handle attacker:target style
     if ":" in msg:
         parts = msg.split(":")
         if len(parts) != 2:
+            counters["malformed"].inc()
             return
         a_str, b_str = parts[0].strip(), parts[1].strip()
-        # base scoring codes
-        if b_str in ("43", "53"):
+        # base scoring codes (one per team in the team table); the target is
+        # compared as a number, like every other id, so "043" is base 43 too
+        try:
+            base_team = BY_BASE.get(int(b_str))
+        except ValueError:
+            base_team = None
+        if base_team is not None:
             try:
                 attacker_equip = int(a_str)
             except ValueError:
+                counters["malformed"].inc()
                 return
             pid = _find_pid_by_equip(state, attacker_equip)
             if pid is None:
+                counters["unknown_equip"].inc()
                 return
-            # determine which base was hit
-            code = int(b_str)
-            # 53 -> red base scored => green attacker gets credit
-            if code == 53:
-                if state.players[pid].get("team", "").lower().startswith("g"):
-                    state.players[pid]["score"] = int(state.players[pid].get("score", 0)) + 100
-                    state.players[pid]["has_base"] = True
-                    state.log_base(pid, "Red")
-            # 43 -> green base scored => red attacker gets credit
-            elif code == 43:
-                if state.players[pid].get("team", "").lower().startswith("r"):
-                    state.players[pid]["score"] = int(state.players[pid].get("score", 0)) + 100
-                    state.players[pid]["has_base"] = True
-                    state.log_base(pid, "Green")
-            # reply with attacker equip id if udp_send provided
-            if udp_send:
-                try:
-                    udp_send(attacker_equip)
-                except Exception:
-                    pass
+            # any other team's base scores for the attacker; their own base doesn't
+            pdata = state.players[pid]
+            att_idx = team_index(pdata.get("team"))
+            case = _CASES["base", 0 <= att_idx != base_team.index]
+            if table.lives and int(pdata.get("tagged", 0)) >= table.lives:
+                case = OUT
+            elif case == BASE_ENEMY and table.capture_limit and int(pdata.get("captures", 0)) >= table.capture_limit:
+                case = BASE_LIMIT
+            rule = rules[case]
+            if case == BASE_ENEMY:
+                _add(state, pid, att_idx, rule.att)
+                pdata["has_base"] = True
+                if table.capture_limit:
+                    pdata["captures"] = int(pdata.get("captures", 0)) + 1
+                state.log_base(pid, base_team.name)
+            counters[rule.metric].inc()
+            _reply(rule, attacker_equip, None, udp_send)
             return
 
         # normal tag a:b
@@ -61,45 +128,43 @@ def handle_packet(msg: str, state, udp_send=None):
             attacker_equip = int(a_str)
             hit_equip = int(b_str)
         except ValueError:
+            counters["malformed"].inc()
             return
 
         attacker_pid = _find_pid_by_equip(state, attacker_equip)
         hit_pid = _find_pid_by_equip(state, hit_equip)
 
-        if attacker_pid and hit_pid:
-            att_team = (state.players[attacker_pid].get("team") or "").lower()
-            hit_team = (state.players[hit_pid].get("team") or "").lower()
-            # opposing teams => attacker gains +10
-            if (att_team and hit_team) and (att_team != hit_team):
-                state.players[attacker_pid]["score"] = int(state.players[attacker_pid].get("score", 0)) + 10
-                state.log_tag(attacker_pid, hit_pid, friendly=False)
-                # reply with hit equipment id
-                if udp_send:
-                    try:
-                        udp_send(hit_equip)
-                    except Exception:
-                        pass
-            else:
-                # friendly fire: both lose 10, send two transmissions:
-                state.players[attacker_pid]["score"] = int(state.players[attacker_pid].get("score", 0)) - 10
-                state.players[hit_pid]["score"] = int(state.players[hit_pid].get("score", 0)) - 10
-                state.log_tag(attacker_pid, hit_pid, friendly=True)
-                if udp_send:
-                    try:
-                        udp_send(hit_equip) # equipment id of player who got hit
-                        udp_send(attacker_equip) # equipment id of attacker
-                    except Exception:
-                        pass
+        if not (attacker_pid and hit_pid):
+            counters["unknown_equip"].inc()
+            return
+        att, hit = state.players[attacker_pid], state.players[hit_pid]
+        att_team = team_index(att.get("team"))
+        hit_team = team_index(hit.get("team"))
+        # sides, not table indexes: different team names oppose even when one isn't in the table
+        sides = {}
+        att_side, hit_side = team_side(att.get("team"), sides), team_side(hit.get("team"), sides)
+        case = _CASES["tag", att_side >= 0 and hit_side >= 0 and att_side != hit_side]
+        if table.lives and (int(att.get("tagged", 0)) >= table.lives or int(hit.get("tagged", 0)) >= table.lives):
+            case = OUT
+        rule = rules[case]
+        if case != OUT:
+            _add(state, attacker_pid, att_team, rule.att)
+            _add(state, hit_pid, hit_team, rule.tgt)
+            state.log_tag(attacker_pid, hit_pid, friendly=case == TAG_FRIENDLY)
+            if table.lives and case == TAG_OPPOSING:
+                hit["tagged"] = int(hit.get("tagged", 0)) + 1
+                if hit["tagged"] == table.lives:
+                    state.log_out(attacker_pid, hit_pid)
+        counters[rule.metric].inc()
+        _reply(rule, attacker_equip, hit_equip, udp_send)
         return
 
     # single integer packet (someone reported they were hit)
     try:
         val = int(msg)
     except ValueError:
+        counters["malformed"].inc()
         return
+    counters["hit"].inc()
     # when data is received, software broadcasts equipment id of the hit player
-    if udp_send:
-        try:
-            udp_send(val)
-        except Exception:
-            pass
\ No newline at end of file
+    _reply(rules[HIT], val, None, udp_send)
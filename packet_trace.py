@@ -0,0 +1,120 @@
+# packet_trace.py
+"""
+Optional per-packet latency tracing (PHOTON_TRACE=1).
+
+Each traced packet carries perf_counter stamps from the receive thread;
+App.run adds dequeue/apply stamps and the frame flip closes it out:
+
+  kernel  datagram arrival (SO_TIMESTAMPNS) -> recvfrom returns
+  queue   recvfrom returns                  -> App.run dequeues it
+  apply   dequeue                           -> handle_packet returns
+  render  handle_packet returns             -> display.flip() of that frame
+  total   recvfrom returns                  -> display.flip()
+
+Press F8 in the app to dump the rolling histograms.
+"""
+import json
+import os
+import time
+from typing import List, Optional
+
+from app_logging import get_logger
+
+log = get_logger("net.trace")
+
+TRACE_ENABLED = os.getenv("PHOTON_TRACE", "0") == "1"
+STAGES = ("kernel", "queue", "apply", "render", "total")
+WINDOW_SECONDS = 30.0   # each histogram covers the last 30-60 s
+N_BUCKETS = 26          # bucket i holds samples in [2^(i-1), 2^i) microseconds; last one ~33 s
+
+
+class Histogram:
+    """Log2-bucketed latency histogram over a rolling two-window period."""
+    def __init__(self, window: float = WINDOW_SECONDS):
+        self.window = window
+        self._cur = [0] * N_BUCKETS
+        self._prev = [0] * N_BUCKETS
+        self._rotated = time.monotonic()
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        now = time.monotonic()
+        if now - self._rotated >= self.window:
+            self._prev, self._cur = self._cur, [0] * N_BUCKETS
+            self._rotated = now
+        us = int(seconds * 1e6)
+        self._cur[min(N_BUCKETS - 1, us.bit_length() if us > 0 else 0)] += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def counts(self) -> List[int]:
+        return [a + b for a, b in zip(self._cur, self._prev)]
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bucket bound (seconds) containing the q-th percentile."""
+        counts = self.counts()
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q / 100.0 * total
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                return min((1 << i) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        counts = self.counts()
+        return {
+            "count": sum(counts),
+            "p50_ms": _ms(self.percentile(50)),
+            "p90_ms": _ms(self.percentile(90)),
+            "p99_ms": _ms(self.percentile(99)),
+            "max_ms": _ms(self.max),
+            "buckets_us": {str(1 << i): c for i, c in enumerate(counts) if c},
+        }
+
+
+def _ms(v):
+    return None if v is None else round(v * 1000, 3)
+
+
+class PacketTracer:
+    """Collects per-stage latencies for packets applied this frame until the flip."""
+    def __init__(self, window: float = WINDOW_SECONDS):
+        self.hist = {name: Histogram(window) for name in STAGES}
+        self._pending = []  # (t_recv, t_applied) for packets drawn in the coming frame
+
+    def packet_applied(self, stamp, t_dequeued: float, t_applied: float):
+        """stamp = (t_recv, kernel_delay or None) as queued by the Receiver."""
+        t_recv, kernel_delay = stamp
+        if kernel_delay is not None:
+            self.hist["kernel"].add(kernel_delay)
+        self.hist["queue"].add(t_dequeued - t_recv)
+        self.hist["apply"].add(t_applied - t_dequeued)
+        self._pending.append((t_recv, t_applied))
+
+    def frame_flipped(self, t_flip: float):
+        if not self._pending:
+            return
+        for t_recv, t_applied in self._pending:
+            self.hist["render"].add(t_flip - t_applied)
+            self.hist["total"].add(t_flip - t_recv)
+        self._pending.clear()
+
+    def summary(self) -> dict:
+        return {name: h.summary() for name, h in self.hist.items()}
+
+    def dump(self, directory: str = ".") -> str:
+        """Write the histograms to trace_<time>.json, log a one-line-per-stage table, return the path."""
+        path = os.path.join(directory, time.strftime("trace_%Y%m%d_%H%M%S.json"))
+        summary = self.summary()
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        log.info("Packet latency (%s):", path)
+        for name in STAGES:
+            s = summary[name]
+            log.info("  %-7s n=%-7d p50=%sms p90=%sms p99=%sms max=%sms",
+                     name, s["count"], s["p50_ms"], s["p90_ms"], s["p99_ms"], s["max_ms"])
+        return path
@@ -0,0 +1,163 @@
+# season_stats.py
+"""
+Season statistics over the match archive (src/match_archive.py).
+
+  python season_stats.py top-taggers --month 2026-10
+  python season_stats.py friendly-fire --days 30 -n 5
+  python season_stats.py base-time --since 2026-09-01 --until 2026-10-01
+  python season_stats.py wins
+
+Matches are picked from the archive index by start date, then split into
+chunks that a process pool scans in parallel. Each worker memory-maps only
+the columns its query needs and returns a small partial result (counts
+per player, sums); the parent merges them. --workers 0 scans inline.
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.match_archive import ARCHIVE_DIR, KIND_BASE, KIND_FRIENDLY, KIND_TAG, load_meta, open_columns, select
+
+CHUNKS_PER_WORKER = 4  # smaller chunks even out uneven match sizes
+
+
+# -----------------------------
+# Per-match scans (run in the worker processes)
+# -----------------------------
+def _count_shooters(path: str, kind: int) -> Tuple[Counter, Dict[int, str]]:
+    cols = open_columns(path, ("kind", "shooter"))
+    ids, counts = np.unique(cols["shooter"][cols["kind"] == kind], return_counts=True)
+    names = {}
+    if len(ids):
+        players = load_meta(path)["players"]
+        names = {int(pid): players.get(str(pid), [str(pid)])[0] for pid in ids.tolist()}
+    return Counter(dict(zip(ids.tolist(), counts.tolist()))), names
+
+
+def _base_times(path: str) -> Tuple[float, int, float, int]:
+    cols = open_columns(path, ("t", "kind"))
+    t = cols["t"][cols["kind"] == KIND_BASE]
+    if not len(t):
+        return 0.0, 0, 0.0, 0
+    return float(t.sum(dtype=np.float64)), len(t), float(t.min()), 1
+
+
+SCANS = {
+    "top-taggers": lambda path: _count_shooters(path, KIND_TAG),
+    "friendly-fire": lambda path: _count_shooters(path, KIND_FRIENDLY),
+    "base-time": _base_times,
+}
+
+
+def _scan_chunk(job):
+    query, paths = job
+    scan = SCANS[query]
+    return [scan(p) for p in paths]
+
+
+# -----------------------------
+# Merging
+# -----------------------------
+def _merge_counts(parts) -> Tuple[Counter, Dict[int, str]]:
+    total, names = Counter(), {}
+    for counts, seen in parts:
+        total.update(counts)
+        names.update(seen)  # matches come oldest first, so the latest codename wins
+    return total, names
+
+
+def run_query(query: str, matches: List[dict], workers: Optional[int] = None, top: int = 10) -> dict:
+    """Scan the selected matches for query; returns a JSON-friendly report."""
+    rep = {"query": query, "matches": len(matches)}
+    if query == "wins":
+        wins = Counter(m.get("winner") or "draw" for m in matches)
+        rep["wins"] = dict(wins.most_common())
+        return rep
+
+    paths = [m["path"] for m in matches]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    t0 = time.perf_counter()
+    if workers <= 0 or len(paths) < 2:
+        parts = _scan_chunk((query, paths))
+    else:
+        n_chunks = min(len(paths), workers * CHUNKS_PER_WORKER)
+        jobs = [(query, paths[i::n_chunks]) for i in range(n_chunks)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = [part for chunk in pool.map(_scan_chunk, jobs) for part in chunk]
+    rep["scan_seconds"] = round(time.perf_counter() - t0, 3)
+    rep["workers"] = workers
+
+    if query == "base-time":
+        total, n, first_total, n_first = (sum(col) for col in zip(*parts)) if parts else (0.0, 0, 0.0, 0)
+        rep["captures"] = n
+        rep["avg_capture_s"] = round(total / n, 2) if n else None
+        rep["avg_first_capture_s"] = round(first_total / n_first, 2) if n_first else None
+        return rep
+
+    counts, names = _merge_counts(parts)
+    rep["top"] = [{"player": pid, "codename": names.get(pid, str(pid)), "count": c}
+                  for pid, c in counts.most_common(top)]
+    return rep
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def _window(args) -> Tuple[Optional[float], Optional[float]]:
+    if args.month:
+        start = datetime.strptime(args.month, "%Y-%m")
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start.timestamp(), end.timestamp()
+    if args.days:
+        return time.time() - args.days * 86400, None
+    since = datetime.strptime(args.since, "%Y-%m-%d").timestamp() if args.since else None
+    until = datetime.strptime(args.until, "%Y-%m-%d").timestamp() if args.until else None
+    return since, until
+
+
+def _print(rep: dict):
+    head = f"{rep['query']}: {rep['matches']} matches"
+    if "scan_seconds" in rep:
+        head += f", scanned in {rep['scan_seconds']:.3f} s ({rep['workers']} workers)"
+    print(head)
+    if "wins" in rep:
+        for team, n in rep["wins"].items():
+            print(f"  {team:<12} {n}")
+    elif "top" in rep:
+        for i, row in enumerate(rep["top"], 1):
+            print(f"  {i:>2}. {row['codename']:<16} {row['player']:>8}  {row['count']}")
+    else:
+        print(f"  captures {rep['captures']}, average at {rep['avg_capture_s']} s, "
+              f"first per match at {rep['avg_first_capture_s']} s on average")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("query", choices=sorted(SCANS) + ["wins"])
+    ap.add_argument("--dir", default=ARCHIVE_DIR, help="archive root (every arena below it)")
+    ap.add_argument("--month", help="YYYY-MM")
+    ap.add_argument("--days", type=float, help="the last N days")
+    ap.add_argument("--since", help="YYYY-MM-DD")
+    ap.add_argument("--until", help="YYYY-MM-DD (exclusive)")
+    ap.add_argument("-n", "--top", type=int, default=10)
+    ap.add_argument("--workers", type=int, help="processes (default: CPU count, 0 = inline)")
+    ap.add_argument("--json", help="also write the report to this file")
+    args = ap.parse_args(argv)
+
+    since, until = _window(args)
+    rep = run_query(args.query, select(args.dir, since, until), workers=args.workers, top=args.top)
+    _print(rep)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rep, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# src/assets.py
+import io
+import os
+import queue
+import threading
+from typing import Optional
+
+import pygame
+
+from app_logging import get_logger
+
+log = get_logger("assets")
+
+ASSET_DIR = "assets"
+LOGO = os.path.join(ASSET_DIR, "logo.jpg")
+BASE_ICON = os.path.join(ASSET_DIR, "baseicon.jpg")
+MUSIC_DIR = os.path.join(ASSET_DIR, "music")
+MUSIC_TRACKS = 8  # assets/music/1.mp3 .. 8.mp3
+
+
+class AssetManager:
+    """
+    Loads images and music on a background thread so the frame loop never
+    waits on the disk. Images are decoded (and optionally pre-scaled) off
+    the main thread; the main thread only converts them to the display
+    format on first use and caches the result per target size. Music files
+    are read into memory so mixer.music.load() opens a buffer, not a file.
+
+    Lookups never block by default: image()/music() return None until the
+    resource is ready (callers draw a placeholder or skip), and queue it if
+    nobody asked for it yet.
+    """
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._cv = threading.Condition()
+        self._raw = {}       # path -> decoded Surface (None if it failed)
+        self._scaled = {}    # (path, size) -> scaled, not yet converted Surface
+        self._music = {}     # path -> file bytes (None if it failed)
+        self._pending = set()
+        self._surfaces = {}  # (path, size) -> display-format Surface (main thread only)
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="assets", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(1.0)
+            self._thread = None
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until every queued load has finished (startup warm-up)."""
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._pending, timeout)
+
+    # ---- requests ----
+    def preload_image(self, path: str, *sizes):
+        """Decode path (and pre-scale it to each (w, h) in sizes) in the background."""
+        self._submit("image", path, sizes)
+
+    def preload_music(self, path: str):
+        self._submit("music", path, ())
+
+    def _submit(self, kind, path, sizes):
+        with self._cv:
+            done = self._music if kind == "music" else self._raw
+            if path in done and all((path, s) in self._scaled or (path, s) in self._surfaces for s in sizes):
+                return
+            if (kind, path) in self._pending:
+                return
+            self._pending.add((kind, path))
+        self._jobs.put((kind, path, sizes))
+
+    def _loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, path, sizes = job
+            try:
+                if kind == "music":
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    with self._cv:
+                        self._music[path] = data
+                else:
+                    raw = self._raw.get(path) or pygame.image.load(path)
+                    scaled = {(path, s): pygame.transform.smoothscale(raw, s) for s in sizes}
+                    with self._cv:
+                        self._raw[path] = raw
+                        self._scaled.update(scaled)
+            except (OSError, pygame.error) as e:
+                log.warning("Could not load %s: %s", path, e)
+                with self._cv:
+                    (self._music if kind == "music" else self._raw)[path] = None
+            with self._cv:
+                self._pending.discard((kind, path))
+                self._cv.notify_all()
+
+    def _wait(self, done: dict, path: str, timeout: float):
+        with self._cv:
+            self._cv.wait_for(lambda: path in done, timeout)
+
+    # ---- lookups (main thread) ----
+    def image(self, path: str, size=None, height: int = None, wait: float = 0.0) -> Optional[pygame.Surface]:
+        """
+        Display-ready surface for path, scaled to size=(w, h) or to height
+        (keeping the aspect ratio); None while it is still loading or if it
+        failed. Sizes that weren't preloaded are scaled from the decoded
+        image in memory.
+        """
+        key = (path, size if height is None else ("h", height))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            return surf
+        if path not in self._raw:
+            self._submit("image", path, (size,) if size else ())
+            if wait <= 0:
+                return None
+            self._wait(self._raw, path, wait)
+        with self._cv:
+            raw = self._raw.get(path)
+            ready = self._scaled.pop((path, size), None) if height is None and size else None
+        if raw is None:
+            return None
+        if ready is None:
+            if height is not None:
+                size = (max(1, int(raw.get_width() * height / raw.get_height())), height)
+            ready = pygame.transform.smoothscale(raw, size) if size else raw
+        try:
+            surf = ready.convert_alpha()
+        except pygame.error:
+            surf = ready  # no display yet (tools/benchmarks)
+        self._surfaces[key] = surf
+        return surf
+
+    def music(self, path: str, wait: float = 0.0) -> Optional[io.BytesIO]:
+        """In-memory file for mixer.music.load(); None while still loading or if it failed."""
+        if path not in self._music:
+            self._submit("music", path, ())
+            if wait <= 0:
+                return None
+            self._wait(self._music, path, wait)
+        data = self._music.get(path)
+        return io.BytesIO(data) if data is not None else None
+
+
+def track_path(n: int) -> str:
+    return os.path.join(MUSIC_DIR, f"{n}.mp3")
+
+
+# one per process, like metrics.REGISTRY
+ASSETS = AssetManager()
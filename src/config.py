@@ -1,3 +1,18 @@
 #src/config.py
+import os
 
-TEAM_CAP = 15
\ No newline at end of file
+TEAM_CAP = int(os.getenv("PHOTON_TEAM_CAP", "15"))
+
+# Team table: (name, accent color, base code). Shooting another team's base
+# sends "<equip>:<that team's code>". Override the whole table with e.g.
+#   PHOTON_TEAMS="Red:53,Green:43,Blue:63,Yellow:73"
+TEAMS = [
+    ("Red", (220, 70, 70), 53),
+    ("Green", (70, 200, 120), 43),
+]
+
+# accents for teams given in PHOTON_TEAMS, in order
+TEAM_PALETTE = [
+    (220, 70, 70), (70, 200, 120), (70, 130, 230), (235, 200, 60),
+    (180, 90, 220), (240, 140, 50), (60, 200, 210), (230, 110, 180),
+]
@@ -0,0 +1,263 @@
+# src/event_log.py
+import os
+import struct
+import time
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+TAG, FRIENDLY, BASE, OUT = 0, 1, 2, 3
+
+# line per kind; src/game_modes compiles these from the loaded mode's deltas
+TEMPLATES = {
+    TAG: "{shooter} tagged {target} (+10 {shooter})",
+    FRIENDLY: "Friendly fire: {shooter} tagged teammate {target} (−10 each)",
+    BASE: "{shooter} scored the {base} base! (+100)",
+    OUT: "{shooter} eliminated {target}!",
+}
+
+CAPACITY = 4096          # records kept in memory (~150 KB); older ones only live in the spill file
+# opt-in: merge identical events within this many seconds into one "×N" ticker line (0 = off)
+COALESCE_SECONDS = float(os.getenv("PHOTON_TICKER_COALESCE", "0") or 0)
+SPILL_LIMIT = 32 << 20   # bytes per spill file (~900k records); past it the file rotates to <path>.1
+
+# spilled record: first ts, last ts, kind, shooter pid, target (pid or label id), repeat count
+SPILL = struct.Struct("<ddbqqI")
+LABELS_SUFFIX = ".labels"  # the spill's label table: one label per line, line number = label id
+
+Record = Tuple[float, int, int, int, int]  # (ts, kind, shooter, target, count)
+# a record read back from the spill: (ts, last ts, kind, shooter, target, count); BASE targets are their label
+StreamRecord = Tuple[float, float, int, int, Union[int, str], int]
+
+
+class EventLog:
+    """
+    Play-by-play log as fixed-width records in a preallocated ring.
+    Nothing is formatted on append; lines() builds text only for the rows
+    a caller is about to draw. Optional burst coalescing (off unless a
+    coalesce_window is set) folds rapid repeats of the same event into one
+    record, and an optional spill file keeps the stream on disk, in at most
+    two files of spill_limit bytes, while memory stays at `capacity` records.
+    `clock` stamps records appended without a ts (wall time by default).
+    """
+    def __init__(self, capacity: int = CAPACITY, coalesce_window: float = 0.0,
+                 namer: Optional[Callable[[int], str]] = None, clock: Optional[Callable[[], float]] = None):
+        self.capacity = capacity
+        self.coalesce_window = coalesce_window
+        self.namer = namer or str
+        self.clock = clock or time.time
+        self.templates = TEMPLATES
+        self._ts = array("d", bytes(8 * capacity))
+        self._last = array("d", bytes(8 * capacity))
+        self._kind = array("b", bytes(capacity))
+        self._shooter = array("q", bytes(8 * capacity))
+        self._target = array("q", bytes(8 * capacity))
+        self._count = array("I", bytes(4 * capacity))
+        self._labels: List[str] = []   # interned strings (base colors) referenced by BASE targets
+        self._label_ids = {}
+        self._head = 0    # slot of the next record
+        self._len = 0
+        self.total = 0    # records ever appended (coalesced repeats count once)
+        self._spill = None
+        self._spill_path = None
+        self._spill_limit = SPILL_LIMIT
+        self._spill_labels = None   # label table file next to the spill
+        self._labels_written = 0
+
+    # ---- appending ----
+    def log_tag(self, shooter: int, target: int, friendly: bool = False, ts: Optional[float] = None):
+        self._append(FRIENDLY if friendly else TAG, shooter, target, ts)
+
+    def log_out(self, shooter: int, target: int, ts: Optional[float] = None):
+        self._append(OUT, shooter, target, ts)
+
+    def log_base(self, shooter: int, base_color: str, ts: Optional[float] = None):
+        label = self._label_ids.get(base_color)
+        if label is None:
+            label = self._label_ids[base_color] = len(self._labels)
+            self._labels.append(base_color)
+        self._append(BASE, shooter, label, ts)
+
+    def _append(self, kind, shooter, target, ts):
+        ts = self.clock() if ts is None else ts
+        if self._len and self.coalesce_window > 0:
+            last = (self._head - 1) % self.capacity
+            if (self._kind[last] == kind and self._shooter[last] == shooter and self._target[last] == target
+                    and ts - self._last[last] <= self.coalesce_window):
+                self._count[last] += 1
+                self._last[last] = ts
+                return
+            self._spill_slot(last)
+        elif self._len:
+            self._spill_slot((self._head - 1) % self.capacity)
+        i = self._head
+        self._ts[i] = ts
+        self._last[i] = ts
+        self._kind[i] = kind
+        self._shooter[i] = shooter
+        self._target[i] = target
+        self._count[i] = 1
+        self._head = (i + 1) % self.capacity
+        self._len = min(self._len + 1, self.capacity)
+        self.total += 1
+
+    # ---- reading ----
+    def __len__(self) -> int:
+        return self._len
+
+    def record(self, i: int) -> Record:
+        """i-th record in memory, oldest first (negative indexes count from newest)."""
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        j = (self._head - self._len + i) % self.capacity
+        return (self._ts[j], self._kind[j], self._shooter[j], self._target[j], self._count[j])
+
+    def tail(self, n: int, offset: int = 0) -> List[Record]:
+        """Newest n records, skipping the `offset` newest ones (for scrolling back)."""
+        end = max(0, self._len - offset)
+        return [self.record(i) for i in range(max(0, end - n), end)]
+
+    def format(self, rec: Record) -> str:
+        _ts, kind, shooter, target, count = rec
+        sname = self.namer(shooter)
+        if kind == BASE:
+            color = self._labels[target] if 0 <= target < len(self._labels) else "?"
+            text = self.templates[BASE].format(shooter=sname, base=color)
+        else:
+            text = self.templates.get(kind, self.templates[TAG]).format(shooter=sname, target=self.namer(target))
+        return f"{text} ×{count}" if count > 1 else text
+
+    def lines(self, n: int, offset: int = 0) -> List[str]:
+        """Formatted text for the n records ending `offset` back from the newest (oldest first)."""
+        return [self.format(r) for r in self.tail(n, offset)]
+
+    # ---- bulk state (replay keyframes) ----
+    def clear(self):
+        self._head = self._len = 0
+        self.total = 0
+        self._labels = []
+        self._label_ids = {}
+        if self._spill is not None:
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._remove_rotated()
+            self._spill_labels.seek(0)
+            self._spill_labels.truncate()
+            self._labels_written = 0
+
+    def export(self, n: int) -> list:
+        """Newest n records as JSON-friendly lists; base targets carry their label."""
+        return [[ts, kind, s, self._labels[t] if kind == BASE else t, c] for ts, kind, s, t, c in self.tail(n)]
+
+    def load(self, rows: list):
+        """Replace the in-memory records with rows from export()."""
+        window, self.coalesce_window = self.coalesce_window, 0.0
+        spill, self._spill = self._spill, None
+        self._head = self._len = 0
+        for ts, kind, shooter, target, count in rows:
+            if kind == BASE:
+                self.log_base(shooter, target, ts)
+            else:
+                self._append(kind, shooter, target, ts)
+            self._count[(self._head - 1) % self.capacity] = count
+        self.coalesce_window, self._spill = window, spill
+
+    # ---- full stream on disk ----
+    def open_spill(self, path: str, limit: int = SPILL_LIMIT):
+        """
+        Keep finalized records in `path`, appending to what's there (clear()
+        truncates it when a new match starts). Base labels go to
+        `path`.labels, whose existing entries keep their ids. Once `path`
+        reaches `limit` bytes it becomes `path`.1, replacing the previous
+        one, so the stream on disk never exceeds two files.
+        """
+        self.close_spill()
+        self._spill_path, self._spill_limit = path, limit
+        self._spill = open(path, "a+b", buffering=64 * 1024)
+        self._labels = _read_labels(path)
+        self._label_ids = {label: i for i, label in enumerate(self._labels)}
+        self._labels_written = len(self._labels)
+        self._spill_labels = open(path + LABELS_SUFFIX, "a+", encoding="utf-8")
+
+    def close_spill(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill_labels.close()
+            self._spill = self._spill_labels = None
+
+    def spill_size(self) -> int:
+        """Flush the spill and return its size in bytes (0 without one); truncate_spill() goes back to it."""
+        if self._spill is None:
+            return 0
+        self._spill.flush()
+        return self._spill.tell()
+
+    def truncate_spill(self, size: int):
+        """Drop spilled records past `size` (records a recovered snapshot re-applies)."""
+        if self._spill is not None and self._spill.seek(0, os.SEEK_END) > size:
+            self._spill.truncate(size - size % SPILL.size)
+            self._spill.seek(0, os.SEEK_END)
+
+    def stream(self) -> Iterator[StreamRecord]:
+        """
+        The full stream, oldest first: everything spilled, then the newest
+        record (not final yet). Without a spill file, the records in memory.
+        """
+        first = 0
+        if self._spill is not None:
+            self._spill.flush()
+            yield from read_spill(self._spill_path)
+            first = max(0, self._len - 1)
+        for i in range(first, self._len):
+            j = (self._head - self._len + i) % self.capacity
+            kind, target = self._kind[j], self._target[j]
+            yield (self._ts[j], self._last[j], kind, self._shooter[j],
+                   self._labels[target] if kind == BASE else target, self._count[j])
+
+    def _spill_slot(self, j):
+        # a record is final once a different one follows it
+        if self._spill is not None:
+            if self._kind[j] == BASE and self._target[j] >= self._labels_written:
+                self._spill_labels.write("".join(f"{label}\n" for label in self._labels[self._labels_written:]))
+                self._spill_labels.flush()
+                self._labels_written = len(self._labels)
+            self._spill.write(SPILL.pack(self._ts[j], self._last[j], self._kind[j],
+                                         self._shooter[j], self._target[j], self._count[j]))
+            if self._spill.tell() >= self._spill_limit:
+                self._rotate_spill()
+
+    def _rotate_spill(self):
+        self._spill.close()
+        os.replace(self._spill_path, self._spill_path + ".1")
+        self._spill = open(self._spill_path, "a+b", buffering=64 * 1024)
+
+    def _remove_rotated(self):
+        try:
+            os.remove(self._spill_path + ".1")
+        except FileNotFoundError:
+            pass
+
+
+def _read_labels(path: str) -> List[str]:
+    try:
+        with open(path + LABELS_SUFFIX, encoding="utf-8") as f:
+            return f.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+
+def read_spill(path: str) -> Iterator[StreamRecord]:
+    """Records of a spilled stream (`path`.1, then `path`), oldest first; a torn final record is skipped."""
+    labels = _read_labels(path)
+    for part in (path + ".1", path):
+        try:
+            with open(part, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        whole = len(data) - len(data) % SPILL.size
+        for ts, last, kind, shooter, target, count in SPILL.iter_unpack(data[:whole]):
+            if kind == BASE:
+                target = labels[target] if 0 <= target < len(labels) else "?"
+            yield ts, last, kind, shooter, target, count
@@ -0,0 +1,142 @@
+# src/game_modes.py
+"""
+Game modes as data, compiled into a dispatch table for the packet handlers.
+
+Every event resolves to one case, from its kind and the team relation of
+the players involved (plus, in modes that use them, the elimination and
+capture-limit counters):
+
+  TAG_OPPOSING   "a:b", players on different teams
+  TAG_FRIENDLY   "a:b", same team (or a player without one)
+  BASE_ENEMY     "a:<base code>", another team's base
+  BASE_OWN       "a:<base code>", the attacker's own base (or no team)
+  BASE_LIMIT     an enemy base past the attacker's capture limit
+  OUT            a tag by or on an eliminated player, or a base shot by one
+  HIT            a single id (someone reported a hit)
+
+compile_mode() turns a Mode into one Rule per case: score deltas, the ids
+to reply with, the play-by-play kind and line, and the metric it counts
+under. handle_packet indexes the tuple, batch_scoring indexes the same
+rules as NumPy columns, so a mode costs the same per event as classic.
+The columns are built on first use, so importing this module (and
+handle_packet) doesn't load NumPy.
+
+Pick a mode with PHOTON_MODE: a built-in name, optionally followed by
+overrides, e.g. "elimination,lives=3" or "classic,friendly=0,friendly_tagged=0".
+"""
+import os
+from functools import cached_property
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.event_log import BASE, FRIENDLY, OUT as LOG_OUT, TAG
+
+TAG_OPPOSING, TAG_FRIENDLY, BASE_ENEMY, BASE_OWN, BASE_LIMIT, OUT, HIT = range(7)
+REPLY_A, REPLY_B = 0, 1   # which of the packet's ids a reply sends back
+
+
+class Mode(NamedTuple):
+    name: str
+    tag: int = 10               # attacker, opposing tag
+    tagged: int = 0             # tagged player, opposing tag
+    friendly: int = -10         # attacker, friendly fire
+    friendly_tagged: int = -10  # tagged teammate
+    base: int = 100             # attacker, enemy base
+    lives: int = 0              # elimination: out after this many opposing tags (0 = off)
+    capture_limit: int = 0      # enemy-base scores per player (0 = unlimited)
+
+
+MODES: Dict[str, Mode] = {
+    "classic": Mode("classic"),
+    # only plays against the other team count: friendly fire costs nothing
+    "team": Mode("team", friendly=0, friendly_tagged=0),
+    "elimination": Mode("elimination", lives=5),
+    "capture": Mode("capture", capture_limit=1),
+}
+
+
+class Rule(NamedTuple):
+    att: int                  # attacker's score delta
+    tgt: int                  # tagged player's score delta
+    replies: Tuple[int, ...]  # REPLY_A / REPLY_B, in send order
+    log: Optional[int]        # EventLog kind, None for no play-by-play line
+    metric: str               # applied kind or ignored reason it counts under
+
+
+def _signed(n: int) -> str:
+    return f"+{n}" if n > 0 else f"−{-n}"   # typographic minus, as the ticker always used
+
+
+def _templates(mode: Mode) -> Dict[int, str]:
+    """Play-by-play lines per EventLog kind; fields {shooter}, {target}, {base}."""
+    tag = "{shooter} tagged {target}"
+    if mode.tag or mode.tagged:
+        parts = [f"{_signed(mode.tag)} {{shooter}}"] if mode.tag else []
+        parts += [f"{_signed(mode.tagged)} {{target}}"] if mode.tagged else []
+        tag += f" ({', '.join(parts)})"
+    friendly = "Friendly fire: {shooter} tagged teammate {target}"
+    if mode.friendly == mode.friendly_tagged and mode.friendly:
+        friendly += f" ({_signed(mode.friendly)} each)"
+    elif mode.friendly or mode.friendly_tagged:
+        parts = [f"{_signed(mode.friendly)} {{shooter}}"] if mode.friendly else []
+        parts += [f"{_signed(mode.friendly_tagged)} {{target}}"] if mode.friendly_tagged else []
+        friendly += f" ({', '.join(parts)})"
+    base = "{shooter} scored the {base} base!" + (f" ({_signed(mode.base)})" if mode.base else "")
+    return {TAG: tag, FRIENDLY: friendly, BASE: base, LOG_OUT: "{shooter} eliminated {target}!"}
+
+
+class RuleTable:
+    """A Mode compiled for dispatch: rules[case], plus the deltas as NumPy columns for batch scoring."""
+    def __init__(self, mode: Mode):
+        self.mode = mode
+        self.lives = mode.lives
+        self.capture_limit = mode.capture_limit
+        rules = [None] * 7
+        rules[TAG_OPPOSING] = Rule(mode.tag, mode.tagged, (REPLY_B,), TAG, "tag")
+        rules[TAG_FRIENDLY] = Rule(mode.friendly, mode.friendly_tagged, (REPLY_B, REPLY_A), FRIENDLY, "friendly")
+        rules[BASE_ENEMY] = Rule(mode.base, 0, (REPLY_A,), BASE, "base")
+        rules[BASE_OWN] = Rule(0, 0, (REPLY_A,), None, "own_base")
+        rules[BASE_LIMIT] = Rule(0, 0, (REPLY_A,), None, "capture_limit")
+        rules[OUT] = Rule(0, 0, (), None, "eliminated")
+        rules[HIT] = Rule(0, 0, (REPLY_A,), None, "hit")
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.templates = _templates(mode)
+
+    @cached_property
+    def att_delta(self):
+        import numpy as np  # batch scoring / match stats only
+        return np.array([r.att for r in self.rules], dtype=np.int64)
+
+    @cached_property
+    def tgt_delta(self):
+        import numpy as np
+        return np.array([r.tgt for r in self.rules], dtype=np.int64)
+
+    @property
+    def spec(self) -> str:
+        """The mode as a PHOTON_MODE string (recordings keep it, so replays score alike)."""
+        base = MODES.get(self.mode.name, Mode(self.mode.name))
+        overrides = [f"{k}={v}" for k, v in self.mode._asdict().items() if k != "name" and v != getattr(base, k)]
+        return ",".join([self.mode.name] + overrides)
+
+
+def parse_mode(spec: str) -> Mode:
+    """Parse "elimination,lives=3" (a built-in name, then field overrides) into a Mode."""
+    name, *overrides = [p.strip() for p in (spec or "classic").split(",") if p.strip()] or ["classic"]
+    if name not in MODES:
+        raise ValueError(f"unknown game mode {name!r} (have {', '.join(MODES)})")
+    mode = MODES[name]
+    fields = {}
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        key = key.strip()
+        if not sep or key not in Mode._fields or key == "name":
+            raise ValueError(f"bad game mode override {item!r} in {spec!r}")
+        fields[key] = int(value)
+    return mode._replace(**fields)
+
+
+def compile_mode(mode: Mode) -> RuleTable:
+    return RuleTable(mode)
+
+
+RULES: RuleTable = compile_mode(parse_mode(os.getenv("PHOTON_MODE", "classic")))
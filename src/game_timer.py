@@ -1,7 +1,10 @@
 # src/game_timer.py
 from enum import Enum
+import math
 import time
 
+from src.scheduler import Scheduler
+
 class GameState(Enum):
     LOBBY = "LOBBY"
     COUNTDOWN = "COUNTDOWN"
@@ -9,45 +12,119 @@ class GameState(Enum):
     ENDED = "ENDED"
 
 class GameTimer:
-    def __init__(self, start_countdown=30, play_seconds=6*60):
+    """
+    Match phases on a deadline Scheduler: each phase schedules its own end,
+    so COUNTDOWN -> PLAYING -> ENDED happen at the exact deadline and
+    subscribers hear about it once. Cues inside a phase (music, "GO!")
+    go through at(), on the same clock, so nothing can drift from it.
+    """
+    def __init__(self, start_countdown=30, play_seconds=6*60, scheduler: Scheduler = None):
         self.state = GameState.LOBBY
         self.start_countdown_total = int(start_countdown)
         self.play_total = int(play_seconds)
-        self._t0 = None  # when current phase started
+        self.scheduler = scheduler or Scheduler()
+        self._t0 = None  # when current phase started (scheduler time)
+        self._phase_end = None
+        self._subscribers = []
+
+    # ---- subscribers / cues ----
+    def subscribe(self, fn):
+        """fn(new_state) after every phase change (no-op if already subscribed)."""
+        if fn not in self._subscribers:
+            self._subscribers.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._subscribers:
+            self._subscribers.remove(fn)
+
+    def at(self, offset: float, fn, *args):
+        """Run fn `offset` seconds into the current phase (right away if that's already past)."""
+        return self.scheduler.at((self._t0 if self._t0 is not None else self.scheduler.now()) + offset, fn, *args)
+
+    def _enter(self, state, t0=None, duration=None, then=None):
+        if self._phase_end is not None:
+            self._phase_end.cancel()
+            self._phase_end = None
+        self.state = state
+        self._t0 = t0
+        if duration is not None:
+            deadline = t0 + duration
+            self._phase_end = self.scheduler.at(deadline, then, deadline)
+        for fn in list(self._subscribers):
+            fn(state)
 
     # ---- phase control ----
-    def start_countdown(self):
-        self.state = GameState.COUNTDOWN
-        self._t0 = time.monotonic()
+    def start_countdown(self, t0: float = None):
+        t0 = self.scheduler.now() if t0 is None else t0
+        self._enter(GameState.COUNTDOWN, t0, self.start_countdown_total, self.start_gameplay)
+
+    def start_gameplay(self, t0: float = None):
+        # fired by the countdown deadline, the new phase starts at that deadline, not at the frame that ran it
+        t0 = self.scheduler.now() if t0 is None else t0
+        self._enter(GameState.PLAYING, t0, self.play_total, self.end_game)
+
+    def end_game(self, _deadline: float = None):
+        self._enter(GameState.ENDED)
+
+    def reset(self):
+        """Back to the lobby; pending phase deadlines are dropped."""
+        if self.state != GameState.LOBBY:
+            self._enter(GameState.LOBBY)
+        self.scheduler.resume()
 
-    def start_gameplay(self):
-        self.state = GameState.PLAYING
-        self._t0 = time.monotonic()
+    # ---- pause / resume (the whole scheduler stops, so phase cues stay lined up) ----
+    @property
+    def paused(self) -> bool:
+        return self.scheduler.paused
 
-    def end_game(self):
-        self.state = GameState.ENDED
-        self._t0 = None
+    def pause(self):
+        self.scheduler.pause()
+
+    def resume(self):
+        self.scheduler.resume()
 
     # ---- timing helpers ----
-    def _elapsed(self) -> int:
-        return int(time.monotonic() - self._t0) if self._t0 is not None else 0
+    def _elapsed(self) -> float:
+        return self.scheduler.now() - self._t0 if self._t0 is not None else 0.0
 
-    def remaining_seconds(self) -> int:
+    def elapsed(self) -> float:
+        """Seconds into the current phase (sub-second precision)."""
+        return self._elapsed()
+
+    def remaining(self) -> float:
         if self.state == GameState.COUNTDOWN:
-            return max(0, self.start_countdown_total - self._elapsed())
+            return max(0.0, self.start_countdown_total - self._elapsed())
         if self.state == GameState.PLAYING:
-            return max(0, self.play_total - self._elapsed())
-        return 0
+            return max(0.0, self.play_total - self._elapsed())
+        return 0.0
+
+    def remaining_seconds(self) -> int:
+        """Whole seconds left, rounded up (so 0 only once the phase is over)."""
+        return math.ceil(self.remaining())
 
     def tick(self):
-        """Call this once per frame / loop to advance state."""
-        if self.state == GameState.COUNTDOWN and self.remaining_seconds() == 0:
-            self.start_gameplay()
-        elif self.state == GameState.PLAYING and self.remaining_seconds() == 0:
-            self.end_game()
+        """Call this once per frame / loop; fires any due phase deadline."""
+        self.scheduler.run_due()
+
+    # ---- crash recovery (see src/match_journal.py) ----
+    def snapshot(self) -> dict:
+        return {"state": self.state.value, "elapsed": self._elapsed(), "wall": time.time()}
+
+    def restore(self, snap: dict):
+        """Resume a phase from snapshot(); time spent down still counts against the clock."""
+        state = GameState(snap.get("state", GameState.LOBBY.value))
+        if state in (GameState.COUNTDOWN, GameState.PLAYING):
+            elapsed = float(snap.get("elapsed", 0.0)) + max(0.0, time.time() - float(snap.get("wall", time.time())))
+            # an overdue deadline just fires on the next tick()
+            start = self.start_countdown if state == GameState.COUNTDOWN else self.start_gameplay
+            start(self.scheduler.now() - elapsed)
+        else:
+            self._enter(state)
 
     # ---- label for UI ----
     def label(self) -> str:
+        if self.paused and self.state in (GameState.COUNTDOWN, GameState.PLAYING):
+            return "Paused"
         if self.state == GameState.COUNTDOWN:
             return f"Game starts in: {self.remaining_seconds():02d}s"
         if self.state == GameState.PLAYING:
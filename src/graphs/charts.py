@@ -1,4 +1,11 @@
 import pygame as pg
+from src.teams import TEAMS, team_color
+
+# heatmap ramp: empty cell -> dark, busiest cell -> yellow
+HEAT_STOPS = [(0.0, (40, 40, 52)), (0.35, (90, 40, 140)), (0.7, (220, 60, 60)), (1.0, (255, 235, 59))]
+
+# draw_momentum runs every frame on the play screen: its fonts are opened once
+_momentum_fonts = None
 
 def draw_bar_chart(surf, rect, data: dict, title="Chart"):
 
@@ -14,13 +21,14 @@ def draw_bar_chart(surf, rect, data: dict, title="Chart"):
     
     total = max(data.values()) or 1
     bar_w = rect.width - 20
-    bar_h = 22
+    gap = 10 if len(data) <= 2 else 4
+    bar_h = max(12, min(22, (rect.height - 34) // len(data) - gap))
     y = rect.y + 30
 
     for team, count in data.items():
         w = int((count/total) * bar_w)
 
-        color = (200,60,60) if team=="Red" else (60,180,90)
+        color = team_color(team)
 
         pg.draw.rect(surf, color, (rect.x+10, y, w, bar_h), border_radius=6)
 
@@ -28,12 +36,12 @@ def draw_bar_chart(surf, rect, data: dict, title="Chart"):
 
         surf.blit(
             label,
-            (rect.x+15, y+5)
+            (rect.x+15, y + (bar_h - label.get_height()) // 2)
         )
 
-        y += bar_h + 10
+        y += bar_h + gap
 
-def draw_team_table(surf, rect, players: dict, title="Teams", headers=("RED TEAM", "GREEN TEAM")):
+def draw_team_table(surf, rect, players: dict, title="Teams", teams=TEAMS, ranks=None):
     
     # Panel
     pg.draw.rect(surf, (40, 40, 50), rect, border_radius=12)
@@ -46,9 +54,15 @@ def draw_team_table(surf, rect, players: dict, title="Teams", headers=("RED TEAM
         (rect.x + (rect.width - title_surf.get_width()) // 2, rect.y + 8)
     )
 
-    # Gather names by team 
-    red   = [p.get("codename") or f"PID {pid}" for pid, p in players.items() if p.get("team") == "Red"]
-    green = [p.get("codename") or f"PID {pid}" for pid, p in players.items() if p.get("team") == "Green"]
+    # Gather names by team in one pass (column i = teams[i])
+    index = {t.name: i for i, t in enumerate(teams)}
+    columns = [[] for _ in teams]
+    for pid, p in players.items():
+        i = index.get(p.get("team"))
+        if i is not None:
+            name = p.get("codename") or f"PID {pid}"
+            rank = ranks.get(pid) if ranks else None
+            columns[i].append(f"{name}  #{rank[0]}" if rank else name)
 
     # Table
     top_after_title = rect.y + 8 + title_surf.get_height() + 8
@@ -60,12 +74,16 @@ def draw_team_table(surf, rect, players: dict, title="Teams", headers=("RED TEAM
     head_bg   = pg.Rect(table_rect.x, table_rect.y, table_rect.width, header_h)
     pg.draw.rect(surf, (55, 55, 70), head_bg, border_radius=6)
 
-    col_w = table_rect.width // 2
-    surf.blit(font_head.render(headers[0], True, (235, 205, 205)), (table_rect.x + 8, table_rect.y + 6))
-    surf.blit(font_head.render(headers[1], True, (205, 235, 205)), (table_rect.x + col_w + 8, table_rect.y + 6))
+    col_w = table_rect.width // max(1, len(teams))
+    for i, team in enumerate(teams):
+        tint = tuple(min(255, 180 + c // 4) for c in team.color)
+        header = team.name.upper() + (" TEAM" if len(teams) <= 2 else "")
+        surf.blit(font_head.render(header, True, tint), (table_rect.x + i * col_w + 8, table_rect.y + 6))
 
-    # Column separator + outer border
-    pg.draw.line(surf, (80, 80, 95), (table_rect.x + col_w, table_rect.y), (table_rect.x + col_w, table_rect.bottom), 1)
+    # Column separators + outer border
+    for i in range(1, len(teams)):
+        x = table_rect.x + i * col_w
+        pg.draw.line(surf, (80, 80, 95), (x, table_rect.y), (x, table_rect.bottom), 1)
     pg.draw.rect(surf, (80, 80, 95), table_rect, width=1, border_radius=6)
 
     # Dynamically size rows so up to 15 fit
@@ -76,7 +94,7 @@ def draw_team_table(surf, rect, players: dict, title="Teams", headers=("RED TEAM
     font_cell    = pg.font.Font(None, font_cell_sz)
 
     y            = table_rect.y + header_h + 1
-    max_rows     = max(len(red), len(green))
+    max_rows     = max((len(c) for c in columns), default=0)
     visible_rows = min(rows, available_h // row_h)
 
 
@@ -86,18 +104,111 @@ def draw_team_table(surf, rect, players: dict, title="Teams", headers=("RED TEAM
         if i % 2 == 0:
             pg.draw.rect(surf, (47, 47, 60), (table_rect.x, row_y, table_rect.width, row_h))
 
-        # column - RED
-        if i < len(red):
-            left_text = f"{i + 1}. {red[i]}"
-            surf.blit(
-                font_cell.render(left_text, True, (245, 245, 245)),
-                (table_rect.x + 8, row_y + 4)
-            )
-
-        # column - GREEN
-        if i < len(green):
-            right_text = f"{i + 1}. {green[i]}"
-            surf.blit(
-                font_cell.render(right_text, True, (245, 245, 245)), 
-                (table_rect.x + col_w + 8, row_y + 4)
-            )
+        for c, names in enumerate(columns):
+            if i < len(names):
+                surf.blit(
+                    font_cell.render(f"{i + 1}. {names[i]}", True, (245, 245, 245)),
+                    (table_rect.x + c * col_w + 8, row_y + 4)
+                )
+
+
+def draw_leaderboard(surf, rect, leaders, title="Leaderboard"):
+    """leaders: (rank, id, codename, rating, matches, wins, total_score) rows, as db_players.top_players returns."""
+    pg.draw.rect(surf, (40, 40, 50), rect, border_radius=8)
+    font = pg.font.Font(None, 20)
+    surf.blit(font.render(title, True, (230, 230, 235)), (rect.x + 10, rect.y + 6))
+    if not leaders:
+        surf.blit(font.render("No finished matches yet", True, (150, 150, 160)), (rect.x + 10, rect.y + 28))
+        return
+    row_h = 18
+    for i, (rank, _pid, codename, rating, matches, wins, _total) in enumerate(leaders):
+        y = rect.y + 26 + i * row_h
+        surf.blit(font.render(f"{rank}. {codename}", True, (245, 245, 245)), (rect.x + 10, y))
+        stats = font.render(f"{rating:.0f}   {wins}/{matches} won", True, (170, 180, 195))
+        surf.blit(stats, (rect.right - 10 - stats.get_width(), y))
+
+
+def heatmap_surface(matrix):
+    """One pixel per cell (row = y, column = x), colored on a sqrt scale; scale it up with pg.transform.scale."""
+    import numpy as np  # only the results screen draws heatmaps; the lobby and play charts don't need it
+    m = np.asarray(matrix, dtype=np.float64)
+    peak = m.max() if m.size else 0
+    v = np.sqrt(m / peak) if peak > 0 else np.zeros_like(m)
+    stops = np.array([s for s, _c in HEAT_STOPS])
+    rgb = np.stack([np.interp(v, stops, [c[i] for _s, c in HEAT_STOPS]) for i in range(3)], axis=-1)
+    return pg.surfarray.make_surface(rgb.astype(np.uint8).transpose(1, 0, 2))
+
+
+def draw_heatmap(surf, rect, cells, row_colors, title="Heatmap"):
+    """
+    Blit a heatmap_surface() into rect with a team-colored band along the
+    left (rows) and top (columns). Returns the rect the cells occupy, for
+    mapping the mouse back to a cell.
+    """
+    pg.draw.rect(surf, (40, 40, 50), rect, border_radius=8)
+    font = pg.font.Font(None, 20)
+    title_surf = font.render(title, True, (230, 230, 235))
+    surf.blit(title_surf, (rect.x + (rect.width - title_surf.get_width()) // 2, rect.y + 6))
+
+    n = len(row_colors)
+    band = 6
+    side = min(rect.width - 20 - band, rect.height - 36 - band)
+    if n == 0 or side <= 0:
+        return pg.Rect(rect.x, rect.y, 0, 0)
+    if side >= n:
+        side -= side % n  # whole pixels per cell
+    grid = pg.Rect(rect.x + 10 + band + (rect.width - 20 - band - side) // 2, rect.y + 30 + band, side, side)
+    surf.blit(pg.transform.scale(cells, grid.size), grid.topleft)
+
+    for i, color in enumerate(row_colors):
+        lo, hi = grid.x + i * side // n, grid.x + (i + 1) * side // n
+        pg.draw.rect(surf, color, (lo, grid.y - band, max(1, hi - lo), band - 1))
+        lo, hi = grid.y + i * side // n, grid.y + (i + 1) * side // n
+        pg.draw.rect(surf, color, (grid.x - band, lo, band - 1, max(1, hi - lo)))
+    pg.draw.rect(surf, (80, 80, 95), grid, width=1)
+    return grid
+
+
+def draw_momentum(surf, rect, series, colors, title="Momentum"):
+    """
+    Live score lines from ScoreHistory.momentum(): per team, a list of
+    (min, max) columns, oldest first (None before the first sample). Each
+    column is drawn as a min-to-max stroke, so a burst inside one pixel
+    column still shows; the cost depends on the column count only.
+    """
+    global _momentum_fonts
+    if _momentum_fonts is None:
+        _momentum_fonts = (pg.font.Font(None, 20), pg.font.Font(None, 16))
+    font, small = _momentum_fonts
+    pg.draw.rect(surf, (40, 40, 50), rect, border_radius=8)
+    surf.blit(font.render(title, True, (230, 230, 235)), (rect.x + 10, rect.y + 6))
+    plot = pg.Rect(rect.x + 10, rect.y + 26, rect.width - 20, rect.height - 34)
+    spans = [c for cols in series for c in cols if c is not None]
+    if plot.width < 2 or plot.height < 2 or not spans:
+        return
+    lo = min(c[0] for c in spans)
+    hi = max(c[1] for c in spans)
+    if hi - lo < 10:
+        lo, hi = lo - 5, hi + 5
+    scale = (plot.height - 1) / (hi - lo)
+    if lo < 0 < hi:
+        zero = plot.bottom - 1 - int(-lo * scale)
+        pg.draw.line(surf, (70, 70, 85), (plot.x, zero), (plot.right - 1, zero))
+    surf.blit(small.render(f"{hi:,.0f}", True, (150, 150, 160)), (plot.x + 2, plot.y))
+    low = small.render(f"{lo:,.0f}", True, (150, 150, 160))
+    surf.blit(low, (plot.x + 2, plot.bottom - low.get_height()))
+
+    for cols, color in zip(series, colors):
+        n = len(cols)
+        points = []
+        for i, c in enumerate(cols):
+            if c is None:
+                continue
+            x = plot.x + i * (plot.width - 1) // max(1, n - 1)
+            y_lo = plot.bottom - 1 - int((c[0] - lo) * scale)
+            y_hi = plot.bottom - 1 - int((c[1] - lo) * scale)
+            points.append((x, y_lo))
+            if y_hi != y_lo:
+                points.append((x, y_hi))
+        if len(points) > 1:
+            pg.draw.lines(surf, color, False, points, 2)
@@ -0,0 +1,126 @@
+# src/match_archive.py
+"""
+Columnar archive of finished matches, for season statistics.
+
+Each match is a directory of one .npy file per column plus a small JSON
+header; the archive keeps a line per match in index.jsonl so queries can
+pick matches by date without opening them:
+
+  archive/<arena>/index.jsonl
+  archive/<arena>/match_20261019_201500/
+      t.npy        float32  game seconds (0 = start signal)
+      kind.npy     uint8    0 tag, 1 friendly fire, 2 base capture
+      shooter.npy  int32    player id (players.id is a Postgres INT)
+      target.npy   int32    tagged player id, or the captured base's team index
+      meta.json    start/end, team names, players {id: [codename, team, score]}
+
+Columns open with np.load(mmap_mode="r"): a query touches only the
+columns it needs and only the pages it reads, so scanning a season never
+loads whole matches. Writes go to a temp directory that is renamed into
+place, then the index line is appended; a crash leaves no half match.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - archiving is skipped without it
+    np = None
+
+from src.teams import TEAMS
+
+ARCHIVE_DIR = "archive"
+INDEX = "index.jsonl"
+META = "meta.json"
+COLUMNS = {"t": "<f4", "kind": "u1", "shooter": "<i4", "target": "<i4"}
+KIND_TAG, KIND_FRIENDLY, KIND_BASE = 0, 1, 2
+
+
+def _pid(pid) -> int:
+    """Player id as stored in the columns; -1 for ids that aren't an int32."""
+    try:
+        pid = int(pid)
+    except (TypeError, ValueError):
+        return -1
+    return pid if -(1 << 31) <= pid < (1 << 31) else -1
+
+
+class MatchArchive:
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+
+    def add(self, stats, players: dict, started: float, ended: Optional[float] = None) -> Optional[str]:
+        """Archive a finished match from its src.match_stats.MatchStats; returns the match directory."""
+        if np is None:
+            return None
+        ended = time.time() if ended is None else ended
+        times, kind, shooter_row, target = stats.events()
+        pids = np.array([_pid(p) for p in stats.pids] + [-1], dtype=np.int64)  # row -1 -> -1
+        target_ids = np.where(kind == KIND_BASE, target, pids[target])
+        columns = {"t": times, "kind": kind, "shooter": pids[shooter_row], "target": target_ids}
+
+        name = time.strftime("match_%Y%m%d_%H%M%S", time.localtime(started))
+        final = os.path.join(self.directory, name)
+        n = 1
+        while os.path.exists(final):
+            n += 1
+            final = os.path.join(self.directory, f"{name}_{n}")
+        tmp = final + ".tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for col, dtype in COLUMNS.items():
+            np.save(os.path.join(tmp, col + ".npy"), np.ascontiguousarray(columns[col], dtype=dtype))
+        meta = {
+            "started": started,
+            "ended": ended,
+            "teams": [t.name for t in TEAMS],
+            "team_scores": stats.team_scores,
+            "players": {str(pid): [p.get("codename") or str(pid), p.get("team"), int(p.get("score", 0) or 0)]
+                        for pid, p in players.items()},
+        }
+        with open(os.path.join(tmp, META), "w") as f:
+            json.dump(meta, f, separators=(",", ":"))
+        os.replace(tmp, final)
+        entry = {"dir": os.path.basename(final), "started": started, "ended": ended,
+                 "events": int(len(kind)), "players": len(players), "winner": stats.winner()}
+        with open(os.path.join(self.directory, INDEX), "a") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return final
+
+
+def iter_index(root: str = ARCHIVE_DIR) -> Iterator[dict]:
+    """Index entries under root (every arena's archive), each with its match directory as "path"."""
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith("match_")]  # arenas only, never into a match
+        if INDEX not in files:
+            continue
+        with open(os.path.join(dirpath, INDEX)) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed write
+                entry["path"] = os.path.join(dirpath, entry["dir"])
+                yield entry
+
+
+def select(root: str = ARCHIVE_DIR, since: Optional[float] = None, until: Optional[float] = None) -> List[dict]:
+    """Index entries of matches that started in [since, until), oldest first."""
+    out = [e for e in iter_index(root)
+           if (since is None or e["started"] >= since) and (until is None or e["started"] < until)]
+    out.sort(key=lambda e: e["started"])
+    return out
+
+
+def open_columns(path: str, names=tuple(COLUMNS)) -> Dict[str, "np.ndarray"]:
+    """The named columns of one archived match, memory-mapped read-only."""
+    return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in names}
+
+
+def load_meta(path: str) -> dict:
+    with open(os.path.join(path, META)) as f:
+        return json.load(f)
@@ -0,0 +1,190 @@
+# src/match_journal.py
+import json
+import os
+import struct
+import time
+
+from src.game_timer import GameState
+from src.teams import warn_unknown_teams
+
+JOURNAL_DIR = "journal"
+JOURNAL_FILE = "events.bin"
+SNAPSHOT_FILE = "snapshot.json"
+MAGIC = b"LTJ1"
+WRITE_BUFFER = 64 * 1024
+SNAPSHOT_INTERVAL = 5.0  # seconds between compact snapshots while a match runs
+REPLAY_GROUP = 0.05      # journaled records this close in time are re-applied as one batch
+
+# one applied "attacker:target" packet: wall time, attacker equip, target equip
+RECORD = struct.Struct("<dii")
+
+
+class MatchJournal:
+    """
+    Append-only journal of applied game packets plus periodic snapshots.
+    A snapshot holds the scoreboard (scores and mode counters), the
+    in-memory play-by-play and the timer, with the journal's byte offset at
+    that moment. After a crash, recover() restores the last snapshot and
+    re-applies only the records after its offset, in batches.
+    """
+    def __init__(self, directory: str = JOURNAL_DIR, snapshot_interval: float = SNAPSHOT_INTERVAL):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self._fh = None
+        self._last_snapshot = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    # ---- writing ----
+    def begin(self, state):
+        """Start a fresh journal for a new match (roster is captured in the snapshot)."""
+        self.close()
+        self._fh = open(self.path, "wb", buffering=WRITE_BUFFER)
+        self._fh.write(MAGIC)
+        self.snapshot(state)
+
+    def append(self, msg: str):
+        """Record one applied packet; only attacker:target packets change state."""
+        if self._fh is None:
+            return
+        a, sep, b = msg.partition(":")
+        if not sep:
+            return
+        try:
+            self.append_event(1, int(a), int(b))
+        except ValueError:
+            pass
+
+    def append_event(self, kind: int, a: int, b: int):
+        """append() for a decoded (binary protocol) event; kind 1 is attacker:target."""
+        if self._fh is None or kind != 1:
+            return
+        try:
+            self._fh.write(RECORD.pack(time.time(), a, b))
+        except struct.error:
+            pass  # id outside the journal's int32 range
+
+    def flush(self):
+        """Hand buffered records to the OS (once per frame) so a process crash loses nothing."""
+        if self._fh is not None:
+            self._fh.flush()
+
+    def maybe_snapshot(self, state):
+        if self._fh is not None and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot(state)
+
+    def snapshot(self, state):
+        self.flush()
+        log = state.event_log
+        snap = {
+            "players": {str(pid): dict(p) for pid, p in (state.players or {}).items()},
+            "team_counts": dict(state.team_counts),
+            "timer": state.timer.snapshot(),
+            # records up to here are already in the scoreboard above
+            "offset": self._fh.tell() if self._fh is not None else len(MAGIC),
+            "log": log.export(len(log)),
+            "log_total": log.total,
+            "spill": log.spill_size(),
+        }
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snap, f, separators=(",", ":"))
+        os.replace(tmp, self.snapshot_path)
+        self._last_snapshot = time.monotonic()
+
+    def end(self, state):
+        """Match finished: write a final snapshot so recover() won't resume it."""
+        if self._fh is None:
+            return
+        self.snapshot(state)
+        self.close()
+
+    def discard(self):
+        """Abandon the current match (back to lobby); nothing left to recover."""
+        self.close()
+        try:
+            os.remove(self.snapshot_path)
+        except OSError:
+            pass
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ---- recovery ----
+    def recover(self, state, apply) -> bool:
+        """
+        Rebuild an in-progress match into `state`.
+        apply(events, state) re-applies a block of (kind, a, b) events
+        without counting them in the metrics (batch_scoring.handle_batch
+        with metrics=False). The scoreboard and play-by-play come from the
+        last snapshot; the records journaled after it are re-applied on top,
+        with the event log stamped at their original times.
+        Returns True if a COUNTDOWN/PLAYING match was restored.
+        """
+        try:
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if snap.get("timer", {}).get("state") not in (GameState.COUNTDOWN.value, GameState.PLAYING.value):
+            return False
+
+        state.players.clear()
+        state.players.update({int(pid): dict(p) for pid, p in snap.get("players", {}).items()})
+        warn_unknown_teams(state.players, "Recovered match")
+        state.team_counts.clear()
+        state.team_counts.update(snap.get("team_counts", {}))
+        state.timer.restore(snap["timer"])
+        log = state.event_log
+        if "spill" in snap:
+            log.truncate_spill(snap["spill"])  # the tail below spills its records again
+        log.load(snap.get("log", []))
+        log.total = max(len(log), int(snap.get("log_total", 0)))
+        history = getattr(state, "score_history", None)
+        if history is not None:
+            history.reset(state.players)
+
+        offset = max(len(MAGIC), int(snap.get("offset", len(MAGIC))))
+        data, intact, size = b"", False, 0
+        try:
+            with open(self.path, "rb") as f:
+                intact = f.read(len(MAGIC)) == MAGIC
+                if intact:
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(min(offset, size))
+                    data = f.read()
+        except OSError:
+            pass
+
+        whole = len(data) - len(data) % RECORD.size  # drop a torn final record
+        records = list(RECORD.iter_unpack(data[:whole]))
+        clock, ts = log.clock, 0.0
+        log.clock = lambda: ts
+        try:
+            i = 0
+            while i < len(records):
+                j, first = i, records[i][0]
+                while j < len(records) and records[j][0] - first <= REPLAY_GROUP:
+                    j += 1
+                ts = records[j - 1][0]
+                apply([(1, a, b) for _t, a, b in records[i:j]], state)
+                i = j
+        finally:
+            log.clock = clock
+
+        # keep appending to the same journal, minus any torn bytes
+        if intact:
+            end = min(offset, size) + whole
+            if offset > size:  # the snapshot outlived journal bytes (lost in an OS crash)
+                end = size - (size - len(MAGIC)) % RECORD.size
+            self._fh = open(self.path, "r+b", buffering=WRITE_BUFFER)
+            self._fh.truncate(end)
+            self._fh.seek(0, os.SEEK_END)
+        else:
+            self._fh = open(self.path, "wb", buffering=WRITE_BUFFER)
+            self._fh.write(MAGIC)
+        self.snapshot(state)
+        return True
@@ -0,0 +1,250 @@
+# src/match_replay.py
+import bisect
+import json
+import os
+import struct
+import time
+
+from src.game_modes import RULES, compile_mode, parse_mode
+from src.game_timer import GameTimer, GameState
+from src.teams import warn_unknown_teams
+
+REPLAY_DIR = "replays"
+MAGIC = b"LTR1"
+KEYFRAME_INTERVAL = 5.0  # seconds of match time between full scoreboard keyframes
+KEYFRAME_LOG = 20        # ticker records carried in each keyframe
+
+# file layout:
+#   MAGIC | u32 header_len | header json | events | keyframe blobs | index | FOOTER
+EVENT = struct.Struct("<fii")        # match time (s), attacker equip, target equip
+INDEX = struct.Struct("<fIII")       # keyframe time, event index, blob offset, blob length
+FOOTER = struct.Struct("<QQI4s")     # events offset, index offset, keyframe count, MAGIC
+U32 = struct.Struct("<I")
+
+
+class ReplayWriter:
+    """
+    Records one match (countdown start → ENDED) as events + periodic keyframes.
+    Times are on the match timer's scheduler clock, which stops while the
+    game is paused, so they stay in step with the countdown/play phases.
+    """
+    def __init__(self, directory: str = REPLAY_DIR, keyframe_interval: float = KEYFRAME_INTERVAL):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self._t0 = None
+        self._clock = time.monotonic
+
+    def begin(self, state, position: float = 0.0):
+        """
+        Start recording. position is how far past the countdown start the
+        match already is (a match resumed after a crash): the recording's
+        clock is lined up with it and the first keyframe holds the current
+        scoreboard.
+        """
+        self._clock = state.timer.scheduler.now
+        self._t0 = self._clock() - position
+        self._started = time.time() - position
+        self._header = {
+            "started": self._started,
+            "countdown": state.timer.start_countdown_total,
+            "play_seconds": state.timer.play_total,
+            "players": {str(pid): dict(p, score=0, has_base=False, tagged=0, captures=0)
+                        for pid, p in state.players.items()},
+            "mode": (getattr(state, "rules", None) or RULES).spec,
+            "team_counts": dict(state.team_counts),
+        }
+        self._events = bytearray()
+        self._n_events = 0
+        self._keyframes = []
+        self._keyframe(position, state)
+
+    def append(self, msg: str, state):
+        """Call after handle_packet applied msg; only attacker:target packets are kept."""
+        if self._t0 is None:
+            return
+        a, sep, b = msg.partition(":")
+        if not sep:
+            return
+        try:
+            a, b = int(a), int(b)
+        except ValueError:
+            return
+        self.append_event(1, a, b, state)
+
+    def append_event(self, kind: int, a: int, b: int, state):
+        """append() for a decoded (binary protocol) event; kind 1 is attacker:target."""
+        if self._t0 is None or kind != 1:
+            return
+        t = self._clock() - self._t0
+        try:
+            self._events += EVENT.pack(t, a, b)
+        except struct.error:
+            return  # id outside the recording's int32 range
+        self._n_events += 1
+        if t - self._keyframes[-1][0] >= self.keyframe_interval:
+            self._keyframe(t, state)
+
+    @property
+    def events(self) -> bytes:
+        """The current (or just finished) match's packed EVENT records."""
+        return bytes(getattr(self, "_events", b""))
+
+    @property
+    def started(self) -> float:
+        """Wall-clock start (time.time()) of the current or last match."""
+        return getattr(self, "_started", 0.0)
+
+    @property
+    def countdown(self) -> float:
+        return float(getattr(self, "_header", {}).get("countdown", 0))
+
+    def _keyframe(self, t, state):
+        log = state.event_log.export(KEYFRAME_LOG)
+        # [score, has_base, tagged, captures]: the last two are the game-mode counters
+        scores = {str(pid): [int(p.get("score", 0) or 0), bool(p.get("has_base")),
+                             int(p.get("tagged", 0) or 0), int(p.get("captures", 0) or 0)]
+                  for pid, p in state.players.items()}
+        blob = json.dumps({"scores": scores, "log": log}, separators=(",", ":")).encode()
+        self._keyframes.append((t, self._n_events, blob))
+
+    def finish(self, state):
+        """Write the recording to disk and return its path (None if nothing was recorded)."""
+        if self._t0 is None:
+            return None
+        self._keyframe(self._clock() - self._t0, state)
+        self._t0 = None
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime("match_%Y%m%d_%H%M%S.ltr", time.localtime(self._started))
+        path = os.path.join(self.directory, name)
+        header = json.dumps(self._header, separators=(",", ":")).encode()
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(U32.pack(len(header)))
+            f.write(header)
+            events_off = f.tell()
+            f.write(self._events)
+            index = bytearray()
+            for t, ev_idx, blob in self._keyframes:
+                index += INDEX.pack(t, ev_idx, f.tell(), len(blob))
+                f.write(blob)
+            index_off = f.tell()
+            f.write(index)
+            f.write(FOOTER.pack(events_off, index_off, len(self._keyframes), MAGIC))
+        return path
+
+
+class _ReplayTimer(GameTimer):
+    """GameTimer whose clock is the replay position instead of time.monotonic()."""
+    def __init__(self, start_countdown, play_seconds):
+        super().__init__(start_countdown=start_countdown, play_seconds=play_seconds)
+        self._phase_elapsed = 0.0
+
+    def set_position(self, t: float):
+        if t < self.start_countdown_total:
+            self.state, self._phase_elapsed = GameState.COUNTDOWN, t
+        elif t < self.start_countdown_total + self.play_total:
+            self.state, self._phase_elapsed = GameState.PLAYING, t - self.start_countdown_total
+        else:
+            self.state, self._phase_elapsed = GameState.ENDED, 0.0
+
+    def _elapsed(self) -> float:
+        return self._phase_elapsed
+
+    def tick(self):
+        pass
+
+
+class MatchReplay:
+    """
+    Seekable playback of a recorded match into an AppState-like `state`.
+    seek() bisects the keyframe index, restores that scoreboard and applies
+    only the events between the keyframe and the target time.
+    """
+    def __init__(self, path: str, state, apply):
+        self.path = path
+        self.state = state
+        self._apply = apply
+        with open(path, "rb") as f:
+            data = f.read()
+        events_off, index_off, n_kf, magic = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+        if data[:4] != MAGIC or magic != MAGIC:
+            raise ValueError(f"{path} is not a match recording")
+        header_len = U32.unpack_from(data, 4)[0]
+        self.header = json.loads(data[8:8 + header_len])
+        self._data = data
+        self._index = list(INDEX.iter_unpack(memoryview(data)[index_off:index_off + n_kf * INDEX.size]))
+        self._kf_times = [k[0] for k in self._index]
+        # events run from events_off up to the first keyframe blob
+        events_end = self._index[0][2] if self._index else index_off
+        events = list(EVENT.iter_unpack(memoryview(data)[events_off:events_end]))
+        self._times = [e[0] for e in events]
+        self._events = [f"{a}:{b}" for _t, a, b in events]
+
+        self.duration = max(self._kf_times[-1] if self._kf_times else 0.0,
+                            float(self.header.get("countdown", 0)) + float(self.header.get("play_seconds", 0)))
+        state.timer = _ReplayTimer(self.header.get("countdown", 30), self.header.get("play_seconds", 6 * 60))
+        # score with the mode the match was played in (recordings from before modes are classic)
+        warn_unknown_teams(self.header.get("players", {}), f"Replay {os.path.basename(path)}")
+        state.rules = compile_mode(parse_mode(self.header.get("mode", "classic")))
+        state.event_log.templates = state.rules.templates
+        self.position = 0.0
+        self._cursor = 0
+        self.seek(0.0)
+
+    def seek(self, t: float):
+        """Jump to match time t (seconds since countdown start)."""
+        t = max(0.0, min(float(t), self.duration))
+        k = max(0, bisect.bisect_right(self._kf_times, t) - 1)
+        kf_t, ev_idx, off, length = self._index[k]
+        kf = json.loads(self._data[off:off + length])
+
+        players = {int(pid): dict(p) for pid, p in self.header.get("players", {}).items()}
+        for pid, (score, has_base, *counters) in kf.get("scores", {}).items():
+            if int(pid) in players:
+                players[int(pid)]["score"] = score
+                players[int(pid)]["has_base"] = has_base
+                if counters:
+                    players[int(pid)]["tagged"], players[int(pid)]["captures"] = counters
+        self.state.players.clear()
+        self.state.players.update(players)
+        self.state.team_counts.clear()
+        self.state.team_counts.update(self.header.get("team_counts", {}))
+        self.state.event_log.load(kf.get("log", []))
+
+        self._cursor = ev_idx
+        self.position = kf_t
+        self.state.timer.set_position(kf_t)
+        history = getattr(self.state, "score_history", None)
+        if history is not None:
+            history.reset(self.state.players)
+        self._advance(t)
+
+    def advance(self, dt: float):
+        """Play forward dt seconds of match time (negative dt seeks back)."""
+        if dt < 0:
+            self.seek(self.position + dt)
+        else:
+            self._advance(min(self.duration, self.position + dt))
+
+    def _advance(self, t: float):
+        end = bisect.bisect_right(self._times, t)
+        timer = self.state.timer
+        for i in range(self._cursor, end):
+            timer.set_position(self._times[i])  # score history stamps the event at its own time
+            self._apply(self._events[i], self.state)
+        self._cursor = max(self._cursor, end)
+        self.position = t
+        self.state.timer.set_position(t)
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= self.duration
+
+
+def latest_recording(directory: str = REPLAY_DIR):
+    """Path of the newest recording in directory, or None."""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".ltr"))
+    except OSError:
+        return None
+    return os.path.join(directory, names[-1]) if names else None
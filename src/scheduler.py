@@ -0,0 +1,86 @@
+# src/scheduler.py
+import heapq
+import itertools
+import time
+from typing import Callable, List, Optional
+
+
+class Timer:
+    """Handle for a scheduled callback; cancel() is O(1) (the heap entry is skipped when it comes up)."""
+    __slots__ = ("deadline", "fn", "args", "cancelled")
+
+    def __init__(self, deadline: float, fn: Callable, args: tuple):
+        self.deadline, self.fn, self.args = deadline, fn, args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    One-shot callbacks ordered by deadline in a heap, on a monotonic clock
+    that stops while paused. run_due() is called once per frame; when nothing
+    is due it's a single comparison against the earliest deadline, so phase
+    changes cost nothing until the frame they happen in, and they fire at
+    the deadline itself rather than at the next whole second.
+
+    Deadlines are in scheduler time (now()), which is the monotonic clock
+    minus time spent paused, so pause()/resume() never re-sort the heap.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()  # FIFO among equal deadlines
+        self._offset = 0.0             # total time spent paused
+        self._paused_at: Optional[float] = None
+
+    def now(self) -> float:
+        if self._paused_at is not None:
+            return self._paused_at - self._offset
+        return self._clock() - self._offset
+
+    def at(self, deadline: float, fn: Callable, *args) -> Timer:
+        timer = Timer(deadline, fn, args)
+        heapq.heappush(self._heap, (deadline, next(self._seq), timer))
+        return timer
+
+    def after(self, delay: float, fn: Callable, *args) -> Timer:
+        return self.at(self.now() + delay, fn, *args)
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self) -> int:
+        """Run every callback whose deadline has passed (in deadline order); returns how many ran."""
+        if not self._heap or self._paused_at is not None:
+            return 0
+        now = self.now()
+        ran = 0
+        # callbacks may schedule more work (e.g. the next phase); anything already due runs this call too
+        while self._heap and self._heap[0][0] <= now:
+            _deadline, _seq, timer = heapq.heappop(self._heap)
+            if not timer.cancelled:
+                timer.cancelled = True
+                timer.fn(*timer.args)
+                ran += 1
+        return ran
+
+    def clear(self):
+        self._heap.clear()
+
+    # ---- pause / resume ----
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self._clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._offset += self._clock() - self._paused_at
+            self._paused_at = None
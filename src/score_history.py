@@ -0,0 +1,223 @@
+# src/score_history.py
+"""
+Score time series for the live charts.
+
+Every score change appends a (game time, score) sample to a fixed-size
+ring: one ring per team (the team total) and one per player. Rings are
+pairs of array("d") allocated up front, so a long or busy match
+overwrites its oldest samples instead of growing.
+
+Charts don't walk raw samples each frame. Each team also feeds a
+ColumnLOD: min/max buckets one pixel column wide over a sliding window,
+updated in O(1) per sample, so drawing the momentum chart costs the same
+at ten events a second as at ten thousand. Any other range of a ring
+goes through minmax_columns(), which reduces it to the same
+per-column (min, max) form.
+"""
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.teams import team_index
+
+TEAM_CAPACITY = 4096     # samples kept per team (64 KB each)
+PLAYER_CAPACITY = 512    # samples kept per player (8 KB each)
+MOMENTUM_WINDOW = 60.0   # seconds the live chart spans
+MOMENTUM_COLUMNS = 240   # LOD buckets over that window, about one per pixel column
+
+Column = Optional[Tuple[float, float]]  # (min, max) of one column; None before the first sample
+
+
+class SeriesRing:
+    """(t, value) samples in a preallocated ring; once full, each append overwrites the oldest."""
+    __slots__ = ("capacity", "_t", "_v", "_head", "_len")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._t = array("d", bytes(8 * capacity))
+        self._v = array("d", bytes(8 * capacity))
+        self._head = 0   # slot of the next sample
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, t: float, value: float):
+        h = self._head
+        self._t[h] = t
+        self._v[h] = value
+        self._head = (h + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+
+    def clear(self):
+        self._head = self._len = 0
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        if not self._len:
+            return None
+        h = (self._head - 1) % self.capacity
+        return self._t[h], self._v[h]
+
+    def samples(self) -> Tuple[array, array]:
+        """(times, values), oldest first, as copies."""
+        start = (self._head - self._len) % self.capacity
+        if start + self._len <= self.capacity:
+            end = start + self._len
+            return self._t[start:end], self._v[start:end]
+        return self._t[start:] + self._t[:self._head], self._v[start:] + self._v[:self._head]
+
+
+class ColumnLOD:
+    """
+    Min/max of a step series per time bucket of window/columns seconds,
+    for the last `columns` buckets. A bucket's range includes the value it
+    opened at, so the line stays connected across quiet stretches.
+    """
+    __slots__ = ("columns", "width", "_stamp", "_open", "_lo", "_hi", "_close", "_value")
+
+    def __init__(self, window: float = MOMENTUM_WINDOW, columns: int = MOMENTUM_COLUMNS):
+        self.columns = columns
+        self.width = window / columns
+        self._stamp = array("q", [-1 << 62]) * columns   # bucket number held by each slot
+        self._open = array("d", bytes(8 * columns))
+        self._lo = array("d", bytes(8 * columns))
+        self._hi = array("d", bytes(8 * columns))
+        self._close = array("d", bytes(8 * columns))
+        self._value = None   # latest value
+
+    def clear(self):
+        self._stamp = array("q", [-1 << 62]) * self.columns
+        self._value = None
+
+    def add(self, t: float, value: float):
+        b = math.floor(t / self.width)
+        s = b % self.columns
+        if self._stamp[s] != b:
+            prev = value if self._value is None else self._value
+            self._stamp[s] = b
+            self._open[s] = prev
+            self._lo[s] = min(prev, value)
+            self._hi[s] = max(prev, value)
+        elif value < self._lo[s]:
+            self._lo[s] = value
+        elif value > self._hi[s]:
+            self._hi[s] = value
+        self._close[s] = value
+        self._value = value
+
+    def read(self, t_now: float) -> List[Column]:
+        """The `columns` buckets ending at t_now, oldest first; quiet buckets repeat the last value."""
+        last = math.floor(t_now / self.width)
+        out: List[Column] = []
+        carry = None
+        for b in range(last - self.columns + 1, last + 1):
+            s = b % self.columns
+            if self._stamp[s] == b:
+                if carry is None and out:
+                    opened = (self._open[s], self._open[s])
+                    out = [opened] * len(out)   # the value going into the window
+                out.append((self._lo[s], self._hi[s]))
+                carry = self._close[s]
+            else:
+                out.append(None if carry is None else (carry, carry))
+        if carry is None and self._value is not None:
+            out = [(self._value, self._value)] * self.columns   # nothing changed inside the window
+        return out
+
+
+def minmax_columns(times: Sequence[float], values: Sequence[float], t0: float, t1: float,
+                   columns: int) -> List[Column]:
+    """
+    Reduce a step series (times ascending) over [t0, t1] to `columns`
+    (min, max) pairs; columns before the first sample are None, quiet
+    columns repeat the last value.
+    """
+    out: List[Column] = [None] * max(0, columns)
+    if columns <= 0 or t1 <= t0:
+        return out
+    lo_i, hi_i = bisect_left(times, t0), bisect_right(times, t1)
+    scale = columns / (t1 - t0)
+    close: List[Optional[float]] = [None] * columns
+    for i in range(lo_i, hi_i):
+        c = min(columns - 1, int((times[i] - t0) * scale))
+        v = values[i]
+        span = out[c]
+        out[c] = (v, v) if span is None else (min(span[0], v), max(span[1], v))
+        close[c] = v
+    prev = values[lo_i - 1] if lo_i else None
+    for c in range(columns):
+        span = out[c]
+        if span is None:
+            if prev is not None:
+                out[c] = (prev, prev)
+            continue
+        if prev is not None:
+            out[c] = (min(span[0], prev), max(span[1], prev))
+        prev = close[c]
+    return out
+
+
+class ScoreHistory:
+    """
+    Team and player score series of the current match. `clock` gives the
+    game time samples are stamped with (AppState.match_time). Player rings
+    are created on a player's first score change. `version` goes up on
+    every change, so views can cache anything derived from the scores.
+    """
+    def __init__(self, n_teams: int, clock: Optional[Callable[[], float]] = None,
+                 team_capacity: int = TEAM_CAPACITY, player_capacity: int = PLAYER_CAPACITY,
+                 window: float = MOMENTUM_WINDOW, columns: int = MOMENTUM_COLUMNS):
+        self.clock = clock or time.monotonic
+        self.window = window
+        self.player_capacity = player_capacity
+        self.teams = [SeriesRing(team_capacity) for _ in range(n_teams)]
+        self.lods = [ColumnLOD(window, columns) for _ in range(n_teams)]
+        self.totals = [0] * n_teams
+        self.players: Dict[object, SeriesRing] = {}
+        self.version = 0
+
+    def reset(self, players: Optional[dict] = None, t: Optional[float] = None):
+        """Start over from the current scoreboard (new match, journal recovery, replay seek)."""
+        t = self.clock() if t is None else t
+        totals = [0] * len(self.teams)
+        for p in (players or {}).values():
+            idx = team_index(p.get("team"))
+            if 0 <= idx < len(totals):
+                totals[idx] += int(p.get("score", 0) or 0)
+        self.totals = totals
+        for ring, lod, total in zip(self.teams, self.lods, totals):
+            ring.clear()
+            lod.clear()
+            ring.append(t, total)
+            lod.add(t, total)
+        self.players.clear()
+        self.version += 1
+
+    def record(self, pid, team: int, score: int, delta: int, t: Optional[float] = None):
+        """One player's score changed by delta to score; team is the team index (-1 for none)."""
+        t = self.clock() if t is None else t
+        self.version += 1
+        ring = self.players.get(pid)
+        if ring is None:
+            ring = self.players[pid] = SeriesRing(self.player_capacity)
+            ring.append(t, score - delta)
+        ring.append(t, score)
+        if 0 <= team < len(self.teams):
+            total = self.totals[team] = self.totals[team] + delta
+            self.teams[team].append(t, total)
+            self.lods[team].add(t, total)
+
+    def momentum(self, t: Optional[float] = None) -> List[List[Column]]:
+        """Per team, the LOD columns of the last `window` seconds (oldest first)."""
+        t = self.clock() if t is None else t
+        return [lod.read(t) for lod in self.lods]
+
+    def team_columns(self, team: int, t0: float, t1: float, columns: int) -> List[Column]:
+        return minmax_columns(*self.teams[team].samples(), t0, t1, columns)
+
+    def player_columns(self, pid, t0: float, t1: float, columns: int) -> List[Column]:
+        ring = self.players.get(pid)
+        return minmax_columns(*ring.samples(), t0, t1, columns) if ring else [None] * columns
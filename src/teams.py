@@ -0,0 +1,85 @@
+# src/teams.py
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+from app_logging import get_logger
+from src.config import TEAMS as _DEFAULT_TEAMS, TEAM_PALETTE
+
+log = get_logger("teams")
+
+
+class Team(NamedTuple):
+    index: int
+    name: str
+    color: tuple
+    base_code: int
+
+
+def parse_teams(spec: str) -> List[Team]:
+    """Parse "Red:53,Green:43,Blue:63" into a team table (accents come from TEAM_PALETTE)."""
+    teams = []
+    for i, part in enumerate(p for p in spec.split(",") if p.strip()):
+        name, _, code = part.strip().partition(":")
+        teams.append(Team(i, name.strip(), TEAM_PALETTE[i % len(TEAM_PALETTE)], int(code)))
+    if len(teams) < 2:
+        raise ValueError(f"need at least two teams: {spec!r}")
+    return teams
+
+
+def load_teams() -> List[Team]:
+    spec = os.getenv("PHOTON_TEAMS", "")
+    if spec:
+        return parse_teams(spec)
+    return [Team(i, name, color, code) for i, (name, color, code) in enumerate(_DEFAULT_TEAMS)]
+
+
+TEAMS: List[Team] = load_teams()
+_BY_NAME: Dict[str, Team] = {t.name.lower(): t for t in TEAMS}
+BY_BASE: Dict[int, Team] = {t.base_code: t for t in TEAMS}
+
+
+def team_named(name) -> Optional[Team]:
+    """Case-insensitive lookup of a player's team string; None if it is not in the table."""
+    return _BY_NAME.get((name or "").strip().lower())
+
+
+def team_index(name) -> int:
+    """Index into TEAMS (and into team-indexed arrays), or -1 for an unknown team."""
+    t = _BY_NAME.get((name or "").strip().lower())
+    return -1 if t is None else t.index
+
+
+def team_side(name, sides: Dict[str, int]) -> int:
+    """
+    Who a player plays against, for tags: the team index for a team in the
+    table, an id past the table for any other non-empty name (so two
+    players on different unknown teams still oppose each other, as team
+    strings always did), or -1 for no team. Those ids are handed out from
+    the caller's sides dict and only compare within it, so they live as
+    long as the roster they describe rather than the process.
+    """
+    key = (name or "").strip().lower()
+    t = _BY_NAME.get(key)
+    if t is not None:
+        return t.index
+    if not key:
+        return -1
+    return sides.setdefault(key, len(TEAMS) + len(sides))
+
+
+def warn_unknown_teams(players: dict, where: str) -> List:
+    """
+    Log the players whose team isn't in the table (their tags still score
+    by team name, but they have no base and no panel); returns their pids.
+    """
+    unknown = [pid for pid, p in players.items() if team_named(p.get("team")) is None]
+    if unknown:
+        log.warning("%s: %d player(s) on a team outside PHOTON_TEAMS (%s): %s", where, len(unknown),
+                    ", ".join(t.name for t in TEAMS),
+                    ", ".join(f"{pid}={players[pid].get('team')!r}" for pid in unknown[:10]))
+    return unknown
+
+
+def team_color(name, default=(150, 150, 160)) -> tuple:
+    t = team_named(name)
+    return default if t is None else t.color
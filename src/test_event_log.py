@@ -0,0 +1,78 @@
+# src/test_event_log.py
+import os
+
+from src.event_log import BASE, SPILL, TAG, EventLog, read_spill
+
+
+def test_no_coalescing_by_default():
+    log = EventLog()
+    for _ in range(3):
+        log.log_tag(1, 2, ts=100.0)
+    assert len(log) == 3 and log.total == 3
+
+    ticker = EventLog(coalesce_window=2.0)
+    for _ in range(3):
+        ticker.log_tag(1, 2, ts=100.0)
+    assert len(ticker) == 1 and ticker.record(0)[4] == 3
+
+
+def test_clear_resets_total_and_labels():
+    log = EventLog()
+    log.log_base(1, "Red")
+    log.log_tag(1, 2)
+    log.clear()
+    assert len(log) == 0 and log.total == 0
+    log.log_base(1, "Green")
+    assert log.export(1)[0][3] == "Green"
+    assert log._labels == ["Green"]
+
+
+def test_spill_rotates_at_limit(tmp_path):
+    path = str(tmp_path / "stream.bin")
+    log = EventLog()
+    log.open_spill(path, limit=10 * SPILL.size)
+    for i in range(35):
+        log.log_tag(1, i)
+    log.close_spill()
+    assert os.path.getsize(path + ".1") == 10 * SPILL.size
+    assert os.path.getsize(path) == 4 * SPILL.size   # 34 finalized records: three rotations, four since
+
+    log.open_spill(path)
+    log.clear()
+    assert not os.path.exists(path + ".1")
+
+
+def test_spill_reads_back_with_labels(tmp_path):
+    path = str(tmp_path / "stream.bin")
+    log = EventLog()
+    log.open_spill(path)
+    log.log_base(1, "Red", ts=1.0)
+    log.log_tag(1, 2, ts=2.0)
+    log.log_base(2, "Green", ts=3.0)
+    expected = [(1.0, 1.0, BASE, 1, "Red", 1), (2.0, 2.0, TAG, 1, 2, 1), (3.0, 3.0, BASE, 2, "Green", 1)]
+    assert list(log.stream()) == expected            # the newest record isn't spilled yet
+    log.log_tag(2, 1, ts=4.0)
+    log.close_spill()
+    assert list(read_spill(path)) == expected
+
+
+def test_reopened_spill_appends_and_keeps_label_ids(tmp_path):
+    path = str(tmp_path / "stream.bin")
+    log = EventLog()
+    log.open_spill(path)
+    log.log_base(1, "Green", ts=1.0)
+    log.log_tag(1, 2, ts=2.0)
+    log.close_spill()                                  # crash: a new process opens the same stream
+
+    again = EventLog()
+    again.open_spill(path)
+    again.log_base(3, "Red", ts=3.0)
+    again.log_base(3, "Green", ts=4.0)
+    again.log_tag(3, 1, ts=5.0)
+    again.close_spill()
+    assert [r[4] for r in read_spill(path)] == ["Green", "Red", "Green"]
+
+    again.open_spill(path)
+    again.clear()                                      # a new match starts the stream over
+    again.close_spill()
+    assert list(read_spill(path)) == []
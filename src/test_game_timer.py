@@ -0,0 +1,99 @@
+# src/test_game_timer.py
+import time
+
+from src.game_timer import GameState, GameTimer
+from src.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_timer():
+    clock = FakeClock()
+    timer = GameTimer(start_countdown=30, play_seconds=360, scheduler=Scheduler(clock=clock))
+    phases = []
+    timer.subscribe(phases.append)
+    return clock, timer, phases
+
+
+def test_phases_change_at_their_deadlines():
+    clock, timer, phases = make_timer()
+    timer.start_countdown()
+    clock.t = 29.9
+    timer.tick()
+    assert timer.state == GameState.COUNTDOWN and timer.remaining_seconds() == 1
+    clock.t = 30.5
+    timer.tick()
+    assert timer.state == GameState.PLAYING
+    assert timer.elapsed() == 0.5          # the phase started at the deadline, not at the tick
+    clock.t = 400.0
+    timer.tick()
+    assert phases == [GameState.COUNTDOWN, GameState.PLAYING, GameState.ENDED]
+
+
+def test_at_cues_run_relative_to_the_phase_start():
+    clock, timer, _phases = make_timer()
+    clock.t = 5.0
+    timer.start_countdown()
+    ran = []
+    timer.at(13.0, ran.append, "music")
+    clock.t = 17.9
+    timer.tick()
+    assert ran == []
+    clock.t = 18.0
+    timer.tick()
+    assert ran == ["music"]
+    cue = timer.at(20.0, ran.append, "late")
+    cue.cancel()
+    clock.t = 26.0
+    timer.tick()
+    assert ran == ["music"]
+
+
+def test_pause_holds_the_countdown():
+    clock, timer, _phases = make_timer()
+    timer.start_countdown()
+    clock.t = 10.0
+    timer.pause()
+    assert timer.label() == "Paused"
+    clock.t = 100.0
+    timer.tick()
+    assert timer.state == GameState.COUNTDOWN and timer.remaining() == 20.0
+    timer.resume()
+    clock.t = 119.9
+    timer.tick()
+    assert timer.state == GameState.COUNTDOWN
+    clock.t = 120.0
+    timer.tick()
+    assert timer.state == GameState.PLAYING
+
+
+def test_restore_counts_downtime_against_the_clock():
+    clock, timer, _phases = make_timer()
+    timer.start_countdown()
+    clock.t = 31.0
+    timer.tick()
+    clock.t = 91.0                          # a minute into play
+    snap = timer.snapshot()
+    snap["wall"] = time.time() - 5.0        # the process was down for five seconds
+
+    clock2, restored, phases = make_timer()
+    clock2.t = 1000.0
+    restored.restore(snap)
+    assert restored.state == GameState.PLAYING
+    assert abs(restored.elapsed() - 66.0) < 0.5   # play started at the 30 s deadline
+    clock2.t = 1000.0 + 294.5
+    restored.tick()
+    assert restored.state == GameState.ENDED
+    assert phases == [GameState.PLAYING, GameState.ENDED]
+
+
+def test_restore_of_a_finished_match_stays_finished():
+    _clock, timer, phases = make_timer()
+    timer.restore({"state": "ENDED", "elapsed": 0.0, "wall": time.time()})
+    assert timer.state == GameState.ENDED and phases == [GameState.ENDED]
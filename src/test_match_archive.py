@@ -0,0 +1,58 @@
+# src/test_match_archive.py
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import season_stats
+from src.match_archive import KIND_BASE, KIND_FRIENDLY, KIND_TAG, MatchArchive, load_meta, open_columns, select
+from src.match_replay import EVENT
+from src.match_stats import from_recording_events
+from src.teams import TEAMS
+
+RED, GREEN = TEAMS[0], TEAMS[1]
+PLAYERS = {
+    101: {"codename": "R1", "team": RED.name, "equip": 11, "score": 110},
+    102: {"codename": "R2", "team": RED.name, "equip": 12, "score": -10},
+    201: {"codename": "G1", "team": GREEN.name, "equip": 21, "score": 0},
+}
+EVENTS = [(31.0, 11, 21), (32.0, 11, 21), (33.0, 12, 11), (40.0, 11, GREEN.base_code), (45.0, 21, 12)]
+
+
+def archive_match(archive, started):
+    stats = from_recording_events(PLAYERS, b"".join(EVENT.pack(*e) for e in EVENTS), offset=30.0)
+    return archive.add(stats, PLAYERS, started, ended=started + 400)
+
+
+def test_archived_match_round_trips(tmp_path):
+    path = archive_match(MatchArchive(str(tmp_path / "A")), started=time.time())
+    cols = open_columns(path)
+    assert cols["kind"].tolist() == [KIND_TAG, KIND_TAG, KIND_FRIENDLY, KIND_BASE, KIND_TAG]
+    assert cols["shooter"].tolist() == [101, 101, 102, 101, 201]
+    assert cols["target"].tolist() == [201, 201, 101, GREEN.index, 102]
+    assert cols["t"].tolist() == pytest.approx([1.0, 2.0, 3.0, 10.0, 15.0])
+    meta = load_meta(path)
+    assert meta["players"]["101"] == ["R1", RED.name, 110]
+    assert meta["team_scores"][:2] == [100, 10]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_season_queries_over_archived_matches(tmp_path, workers):
+    day = 86400.0
+    t0 = time.mktime((2026, 10, 1, 12, 0, 0, 0, 0, -1))
+    archive_match(MatchArchive(str(tmp_path / "A")), started=t0)
+    archive_match(MatchArchive(str(tmp_path / "B")), started=t0 + day)   # a second arena
+    archive_match(MatchArchive(str(tmp_path / "A")), started=t0 + 40 * day)   # outside the window
+
+    matches = select(str(tmp_path), since=t0, until=t0 + 30 * day)
+    assert [m["started"] for m in matches] == [t0, t0 + day]
+
+    top = season_stats.run_query("top-taggers", matches, workers=workers)
+    assert top["top"] == [{"player": 101, "codename": "R1", "count": 4},
+                          {"player": 201, "codename": "G1", "count": 2}]
+    ff = season_stats.run_query("friendly-fire", matches, workers=workers)
+    assert ff["top"] == [{"player": 102, "codename": "R2", "count": 2}]
+    bases = season_stats.run_query("base-time", matches, workers=workers)
+    assert (bases["captures"], bases["avg_capture_s"], bases["avg_first_capture_s"]) == (2, 10.0, 10.0)
+    assert season_stats.run_query("wins", matches)["wins"] == {RED.name: 2}
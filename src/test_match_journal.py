@@ -0,0 +1,116 @@
+# src/test_match_journal.py
+from batch_scoring import handle_batch
+from metrics import REGISTRY
+from packet_handler import handle_packet
+from src.event_log import EventLog
+from src.game_timer import GameTimer
+from src.match_journal import MatchJournal
+from src.teams import TEAMS
+
+RED, GREEN = TEAMS[0], TEAMS[1]
+MSGS = ["11:21", "11:21", "21:11", "12:11", f"11:{GREEN.base_code}", "99:21", "21:12", "11:21"]
+
+
+class State:
+    def __init__(self):
+        self.players = {
+            1: {"codename": "R1", "team": RED.name, "equip": 11, "score": 0},
+            2: {"codename": "R2", "team": RED.name, "equip": 12, "score": 0},
+            3: {"codename": "G1", "team": GREEN.name, "equip": 21, "score": 0},
+        }
+        self.team_counts = {RED.name: 2, GREEN.name: 1}
+        self.event_log = EventLog(coalesce_window=2.0)
+        self.timer = GameTimer(start_countdown=30, play_seconds=360)
+
+    def log_tag(self, shooter, target, friendly=False):
+        self.event_log.log_tag(shooter, target, friendly)
+
+    def log_base(self, shooter, base):
+        self.event_log.log_base(shooter, base)
+
+    def log_out(self, shooter, target):
+        self.event_log.log_out(shooter, target)
+
+
+def board(state):
+    return {pid: (p["score"], bool(p.get("has_base"))) for pid, p in state.players.items()}
+
+
+def lines(state):
+    return state.event_log.lines(len(state.event_log))
+
+
+def counted():
+    return {(name, labels): m.value for name in ("photon_packets_applied_total", "photon_packets_ignored_total")
+            for labels, m in REGISTRY._families[name][2].items()}
+
+
+def play(tmp_path, torn=b""):
+    """A match that crashes after MSGS, with a snapshot part way through."""
+    live = State()
+    live.event_log.open_spill(str(tmp_path / "stream.bin"))
+    live.timer.start_countdown()
+    journal = MatchJournal(str(tmp_path))
+    journal.begin(live)
+    for i, msg in enumerate(MSGS):
+        handle_packet(msg, live)
+        journal.append(msg)
+        if i == 3:
+            journal.snapshot(live)
+    journal.flush()
+    journal._fh.write(torn)
+    journal.close()   # the process dies here: no end()
+    live.event_log.close_spill()
+    return live
+
+
+def recover(tmp_path, applied=None):
+    state = State()
+    state.event_log.open_spill(str(tmp_path / "stream.bin"))
+    journal = MatchJournal(str(tmp_path))
+    before = counted()
+
+    def apply(events, st):
+        if applied is not None:
+            applied.extend(events)
+        handle_batch(events, st, metrics=False)
+    assert journal.recover(state, apply)
+    assert counted() == before   # already counted when the packets first arrived
+    return state, journal
+
+
+def test_recover_rebuilds_scores_and_event_log(tmp_path):
+    live = play(tmp_path)
+    # what reached the disk plus the record in memory (times are the journal's, a hair later)
+    stream = [r[2:] for r in live.event_log.stream()]
+    state, journal = recover(tmp_path)
+    journal.close()
+    assert board(state) == board(live)
+    assert lines(state) == lines(live)
+    assert state.event_log.total == live.event_log.total
+    assert [r[2:] for r in state.event_log.stream()] == stream
+    assert state.timer.state == live.timer.state
+
+
+def test_recover_drops_a_torn_record_and_keeps_appending(tmp_path):
+    live = play(tmp_path, torn=b"\x01\x02\x03")
+    state, journal = recover(tmp_path)
+    handle_packet("21:11", state)
+    journal.append("21:11")
+    journal.close()
+    handle_packet("21:11", live)
+
+    again, journal = recover(tmp_path)
+    journal.close()
+    assert board(again) == board(state) == board(live)
+    assert lines(again) == lines(live)
+
+
+def test_recover_replays_only_the_tail_after_the_snapshot(tmp_path):
+    live = play(tmp_path)
+    applied = []
+    state, journal = recover(tmp_path, applied)
+    journal.close()
+    # MSGS[:4] are in the snapshot's scoreboard; the rest come from the journal
+    assert applied == [(1, *map(int, msg.split(":"))) for msg in MSGS[4:]]
+    assert board(state) == board(live)
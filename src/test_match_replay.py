@@ -0,0 +1,91 @@
+# src/test_match_replay.py
+from packet_handler import handle_packet
+from src.event_log import EventLog
+from src.game_timer import GameTimer
+from src.match_replay import EVENT, MatchReplay, ReplayWriter
+from src.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class State:
+    """Just enough of main.AppState for handle_packet and the recorder."""
+    def __init__(self, clock=None):
+        self.players = {
+            1: {"codename": "Red1", "team": "Red", "equip": 11, "score": 0},
+            2: {"codename": "Green1", "team": "Green", "equip": 21, "score": 0},
+        }
+        self.team_counts = {"Red": 1, "Green": 1}
+        self.event_log = EventLog()
+        self.timer = GameTimer(start_countdown=30, play_seconds=360, scheduler=Scheduler(clock=clock or FakeClock()))
+
+    def log_tag(self, shooter, target, friendly=False):
+        self.event_log.log_tag(shooter, target, friendly)
+
+    def log_base(self, shooter, base):
+        self.event_log.log_base(shooter, base)
+
+    def log_out(self, shooter, target):
+        self.event_log.log_out(shooter, target)
+
+
+def _record(writer, state, msg):
+    handle_packet(msg, state)
+    writer.append(msg, state)
+
+
+def test_pause_does_not_shift_recorded_times(tmp_path):
+    clock = FakeClock()
+    state = State(clock)
+    writer = ReplayWriter(str(tmp_path), keyframe_interval=5.0)
+    state.timer.start_countdown()
+    writer.begin(state)
+
+    clock.t = 40.0                      # 10 s into play
+    _record(writer, state, "11:21")
+    clock.t = 50.0
+    state.timer.pause()
+    clock.t = 150.0                     # 100 s paused
+    state.timer.resume()
+    clock.t = 160.0                     # 20 s into play on the game clock
+    _record(writer, state, "11:21")
+    path = writer.finish(state)
+
+    times = [t for t, _a, _b in EVENT.iter_unpack(writer.events)]
+    assert times == [40.0, 60.0]
+
+    replay_state = State()
+    replay = MatchReplay(path, replay_state, handle_packet)
+    replay.seek(55.0)                   # after the first tag, before the second
+    assert replay_state.players[1]["score"] == 10
+    replay.seek(65.0)
+    assert replay_state.players[1]["score"] == 20
+    replay.seek(35.0)
+    assert replay_state.players[1]["score"] == 0
+
+
+def test_writer_begun_mid_match_lines_up_with_the_match_clock(tmp_path):
+    clock = FakeClock()
+    state = State(clock)
+    state.timer.start_countdown()
+    clock.t = 40.0   # 10 s into play: a match resumed after a crash
+    state.players[1]["score"] = 30
+    writer = ReplayWriter(str(tmp_path))
+    writer.begin(state, position=40.0)
+    clock.t = 41.0
+    _record(writer, state, "11:21")
+    path = writer.finish(state)
+
+    replay = MatchReplay(path, State(clock), lambda msg, st: handle_packet(msg, st, metrics=False))
+    assert replay._kf_times[0] == 40.0
+    assert replay._times == [41.0]
+    replay.seek(40.5)
+    assert replay.state.players[1]["score"] == 30
+    replay.seek(41.0)
+    assert replay.state.players[1]["score"] == 40
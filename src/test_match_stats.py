@@ -0,0 +1,84 @@
+# src/test_match_stats.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from packet_handler import handle_packet
+from src.event_log import EventLog
+from src.game_modes import compile_mode, parse_mode
+from src.match_replay import EVENT
+from src.match_stats import from_recording_events
+from src.teams import TEAMS
+
+RED, GREEN = TEAMS[0], TEAMS[1]
+PLAYERS = {
+    1: {"codename": "R1", "team": RED.name, "equip": 11, "score": 0},
+    2: {"codename": "R2", "team": RED.name, "equip": 12, "score": 0},
+    3: {"codename": "G1", "team": GREEN.name, "equip": 21, "score": 0},
+}
+COUNTDOWN = 30.0
+# (recording time, attacker equip, target equip or base code)
+RECORDED = [
+    (31.0, 11, 21),              # R1 tags G1
+    (32.0, 11, 21),              # R1 tags G1 (streak 2)
+    (33.0, 21, 11),              # G1 tags R1: R1's streak resets
+    (34.0, 11, 21),              # R1 tags G1
+    (35.0, 12, 11),              # R2 hits teammate R1
+    (40.0, 12, GREEN.base_code),  # R2 takes the green base at game time 10
+    (41.0, 21, GREEN.base_code),  # G1 shoots their own base: no score
+    (42.0, 99, 21),              # unknown equipment
+]
+
+
+class State:
+    def __init__(self):
+        self.players = {pid: dict(p) for pid, p in PLAYERS.items()}
+        self.team_counts = {}
+        self.event_log = EventLog()
+
+    def log_tag(self, shooter, target, friendly=False):
+        pass
+
+    def log_base(self, shooter, base):
+        pass
+
+    def log_out(self, shooter, target):
+        pass
+
+
+def packed(events):
+    return b"".join(EVENT.pack(t, a, b) for t, a, b in events)
+
+
+def test_stats_from_recorded_events():
+    stats = from_recording_events(PLAYERS, packed(RECORDED), offset=COUNTDOWN)
+    row = {pid: i for i, pid in enumerate(stats.pids)}
+    r1, r2, g1 = row[1], row[2], row[3]
+
+    assert stats.n_events == len(RECORDED)
+    assert stats.matrix[r1, g1] == 3 and stats.matrix[g1, r1] == 1 and stats.matrix[r2, r1] == 1
+    assert stats.matrix.sum() == 5
+    assert stats.row_stats(r1) == {"pid": 1, "name": "R1", "team": RED.name, "score": 20, "tags": 3,
+                                   "tagged": 1, "ff": 0, "streak": 2, "bases": 0, "first_base": None}
+    assert stats.row_stats(r2)["ff"] == 1 and stats.ff_received[r1] == 1
+    assert stats.row_stats(r2)["bases"] == 1 and stats.row_stats(r2)["first_base"] == pytest.approx(10.0)
+    assert stats.captures == [(pytest.approx(10.0), 2, GREEN.name)]
+    assert stats.winner() == RED.name
+
+    times, curve = stats.player_curve(1)
+    assert curve.tolist() == [10, 20, 20, 30, 20]   # being tagged costs 0 in classic; R2's friendly fire -10
+    assert times.tolist() == pytest.approx([1.0, 2.0, 3.0, 4.0, 5.0])
+
+
+@pytest.mark.parametrize("spec", ["classic", "team", "capture", "elimination,lives=2"])
+def test_stats_scores_match_the_live_scoreboard(spec):
+    rules = compile_mode(parse_mode(spec))
+    state = State()
+    state.rules = rules
+    for _t, a, b in RECORDED:
+        handle_packet(f"{a}:{b}", state)
+    stats = from_recording_events(PLAYERS, packed(RECORDED), offset=COUNTDOWN, rules=rules)
+    assert dict(zip(stats.pids, stats.scores.tolist())) == {pid: p["score"] for pid, p in state.players.items()}
+    assert stats.team_scores[:2] == [sum(p["score"] for p in state.players.values() if p["team"] == t.name)
+                                     for t in (RED, GREEN)]
+    assert stats.team_curves[-1].tolist() == stats.team_scores
@@ -0,0 +1,37 @@
+# src/test_play_display.py
+from main import AppState
+from packet_handler import handle_packet
+from src.ui.screens.play_display import PlayDisplay
+
+
+def _state():
+    state = AppState()
+    state.players.update({
+        1: {"codename": "Red1", "team": "Red", "equip": 11, "score": 0},
+        2: {"codename": "Red2", "team": "Red", "equip": 12, "score": 0},
+        3: {"codename": "Green1", "team": "Green", "equip": 21, "score": 0},
+    })
+    return state
+
+
+def test_roster_order_resorts_only_on_score_changes():
+    state = _state()
+    view = PlayDisplay(state)
+    order, totals = view._sorted_roster()
+    assert order[:2] == [[1, 2], [3]] and totals[:2] == [0, 0]
+    assert view._sorted_roster()[0] is order   # unchanged scores: reused
+
+    handle_packet("12:21", state)              # Red2 tags Green1
+    order, totals = view._sorted_roster()
+    assert order[:2] == [[2, 1], [3]] and totals[:2] == [10, 0]
+
+    state.players[4] = {"codename": "Green2", "team": "Green", "equip": 22, "score": 0}
+    assert view._sorted_roster()[0][1] == [3, 4]  # roster grew
+
+
+def test_visible_rows_read_live_entries():
+    state = _state()
+    view = PlayDisplay(state)
+    view._sorted_roster()
+    state.players[1]["codename"] = "Renamed"
+    assert view._row(state.players[1])["codename"] == "Renamed"
@@ -1,9 +1,10 @@
 import pygame as pg
 from ui.screens.player_entry import PlayerEntry
+from src.teams import TEAMS
 
 class DummyState:
     def __init__(self):
-        self.team_counts = {"Red": 0, "Green": 0}
+        self.team_counts = {t.name: 0 for t in TEAMS}
         self.players = {}
         self.addr = "127.0.0.1"  # host/ip string
 
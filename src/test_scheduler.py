@@ -0,0 +1,64 @@
+# src/test_scheduler.py
+from src.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_callbacks_run_in_deadline_order_fifo_on_ties():
+    clock = FakeClock()
+    sched = Scheduler(clock=clock)
+    ran = []
+    sched.at(105.0, ran.append, "c")
+    sched.at(101.0, ran.append, "a")
+    sched.after(1.0, ran.append, "b")     # also due at 101.0, scheduled second
+    sched.at(110.0, ran.append, "d")
+    assert sched.next_deadline() == 101.0
+    assert sched.run_due() == 0
+    clock.t = 105.0
+    assert sched.run_due() == 3
+    assert ran == ["a", "b", "c"]
+    assert sched.next_deadline() == 110.0
+
+
+def test_callback_scheduling_due_work_runs_in_the_same_call():
+    clock = FakeClock()
+    sched = Scheduler(clock=clock)
+    ran = []
+    sched.at(100.0, lambda: sched.at(100.0, ran.append, "chained"))
+    assert sched.run_due() == 2 and ran == ["chained"]
+
+
+def test_cancel_skips_the_entry():
+    clock = FakeClock()
+    sched = Scheduler(clock=clock)
+    ran = []
+    first = sched.at(101.0, ran.append, "first")
+    sched.at(102.0, ran.append, "second")
+    first.cancel()
+    assert sched.next_deadline() == 102.0
+    clock.t = 103.0
+    assert sched.run_due() == 1 and ran == ["second"]
+
+
+def test_pause_stops_the_clock_and_shifts_deadlines():
+    clock = FakeClock()
+    sched = Scheduler(clock=clock)
+    ran = []
+    sched.after(10.0, ran.append, "due")   # scheduler time 110
+    clock.t = 104.0
+    sched.pause()
+    clock.t = 200.0
+    assert sched.now() == 104.0
+    assert sched.run_due() == 0            # nothing fires while paused
+    sched.resume()
+    assert sched.now() == 104.0
+    clock.t = 205.9         # six seconds were left when it paused
+    assert sched.run_due() == 0
+    clock.t = 206.0
+    assert sched.run_due() == 1 and ran == ["due"]
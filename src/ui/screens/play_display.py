@@ -1,9 +1,14 @@
 # src/ui/screens/play_display.py
+import math
 import os
 import pygame
 import random
 import time
+from collections import OrderedDict
 from udp_broadcast import send_special_code
+from app_logging import get_logger
+
+log = get_logger("play")
 
 # Try to read TEAM_CAP from your project config; fall back to 6 if not present.
 try:
@@ -13,14 +18,15 @@ except Exception:
 
 # === Timer HUD ===
 from src.game_timer import GameState
+from src.teams import TEAMS, team_index
+from src.assets import ASSETS, BASE_ICON, MUSIC_TRACKS, track_path
+from src.graphs.charts import draw_momentum
 
 # Colors & layout
 BG = (18, 18, 22)
 PANEL = (28, 28, 36)
 TEXT = (235, 235, 245)
 MUTED = (170, 170, 180)
-RED_ACCENT = (220, 70, 70)
-GREEN_ACCENT = (70, 200, 120)
 FLASH_COLOR = (255, 235, 59)
 
 FLASH_PERIOD = 0.5
@@ -32,19 +38,16 @@ ROW_maxH = 26
 TEAM_ROWS = 15
 PAD = 16
 GAP = 10
+SCROLL_STEP = 3          # rows per mouse-wheel notch
+MUSIC_CUE = 13.0         # seconds into the countdown the music starts
+GO_SECONDS = 1.0         # "GO!" stays up this long into the match
+TEXT_CACHE_SIZE = 512    # rendered text surfaces kept for reuse between frames
+MOMENTUM_W = 360         # live momentum chart, in the action panel left of the back button
+BACK_W, BACK_H = 190, 34
 
 COLUMNS = ["Base", "Codename", "Equip ID", "Score"]
 
 
-def _norm_team(t: str) -> str:
-    t = (t or "").strip().lower()
-    if t.startswith("r"):
-        return "Red"
-    if t.startswith("g"):
-        return "Green"
-    return "Unassigned"
-
-
 def _get(d, key, default=""):
     try:
         v = d.get(key, default)
@@ -53,11 +56,22 @@ def _get(d, key, default=""):
     return "" if v is None else str(v)
 
 
+def _score(pdata) -> int:
+    try:
+        return int(_get(pdata, "score") or 0)
+    except ValueError:
+        return 0
+
+
 # --- Timer label overlay ---
+_timer_font = None
+
+
 def _draw_timer_label(surface, text: str):
-    pygame.font.init()
-    font = pygame.font.SysFont(None, 28)
-    label = font.render(text, True, (255, 255, 255))
+    global _timer_font
+    if _timer_font is None:
+        _timer_font = pygame.font.SysFont(None, 28)
+    label = _timer_font.render(text, True, (255, 255, 255))
     bg = pygame.Surface((label.get_width() + 12, label.get_height() + 8), pygame.SRCALPHA)
     bg.fill((0, 0, 0, 140))
     surface.blit(bg, (16, 16))
@@ -65,29 +79,25 @@ def _draw_timer_label(surface, text: str):
 
 
 class PlayDisplay:
-    """Play screen view: shows Red/Green panels reading live from state.players."""
+    """Play screen view: one panel per team in the team table, reading live from state.players."""
     def __init__(self, state):
         self.state = state
-        pygame.font.init()
-        self.font = pygame.font.SysFont("Arial", 16)
-        self.font_hdr = pygame.font.SysFont("Arial", 18, bold=True)
-        self.font_title = pygame.font.SysFont("Arial", 26, bold=True)
-        self._layout_ready = False
-
-        # Countdown setup
-        self._countdown_steps = 30
-        self._step_seconds = 1.0
-        self._go_seconds = 1.0
-        self._countdown_total = self._countdown_steps * self._step_seconds + self._go_seconds
-
-        # Flags
+        # fonts are opened on first draw; the system font scan runs in a warm-up thread at startup
+        self.font = self.font_hdr = self.font_title = None
+        self.teams = TEAMS
+        self._layout_key = None
+        self._tiles = []
+
+        # Flags (the countdown itself is state.timer; the view only hangs cues off its scheduler)
         self._countdown_running = False
-        self._countdown_start = None
-        self._countdown_finished = False
+        self._music_cue = None
         self._sent_start_code = False
         # NOTE: _sent_end_code is used by instructor’s generator; keep for parity
         self._sent_end_code = False
         self._playing_music = False
+        self._song = None  # track picked (and preloaded) when the countdown starts
+        # only the arena on screen owns the (single) music channel
+        self.audible = True
 
         # Fonts + UI
         self._overlay_big_font = None
@@ -95,7 +105,18 @@ class PlayDisplay:
         self._back_button_rect = None
         self._back_button_text = "Back to Player Entry"
         self._back_button_font = None
-        self._base_icon = None
+
+        # virtualized scrolling: rosters scroll from the top, the ticker back from the newest line
+        self._scroll = {}
+        self._ticker_scroll = 0
+        self._ticker_total = 0
+        self._panel_rects = {}
+        self._event_rect = None
+        self._text_cache = OrderedDict()
+        # roster order per team, re-sorted only when a score changes (score_history.version)
+        self._order_key = None
+        self._order = [[] for _ in self.teams]
+        self._totals = [0] * len(self.teams)
 
     # ---------- text helpers ----------
     def _ellipsize(self, text: str, max_w: int, font) -> str:
@@ -117,130 +138,229 @@ class PlayDisplay:
                 hi = mid - 1
         return text[:lo] + ell
 
+    def _text_surface(self, font, text, max_w, color=TEXT):
+        """Ellipsized + rendered text, reused across frames (rows rarely change)."""
+        key = (id(font), text, int(max_w), color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            surf = font.render(self._ellipsize(text, max(0, int(max_w)), font), True, color)
+            self._text_cache[key] = surf
+            if len(self._text_cache) > TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return surf
+
     def _blit_centered(self, surface, font, text, box_x, box_w, box_y, box_h):
-        safe = self._ellipsize(text, max(0, box_w), font)
-        surf = font.render(safe, True, TEXT)
+        surf = self._text_surface(font, text, box_w)
         rect = surf.get_rect(center=(box_x + box_w / 2, box_y + box_h / 2))
         surface.blit(surf, rect)
 
-    def _ensure_layout(self, surface: pygame.Surface):
-        if self._layout_ready:
+    def _draw_scrollbar(self, surface, rect, first, visible, total):
+        if total <= visible:
+            return
+        track = pygame.Rect(rect.right - 6, rect.y, 4, rect.height)
+        pygame.draw.rect(surface, PANEL, track, border_radius=2)
+        thumb_h = max(12, int(rect.height * visible / total))
+        thumb_y = rect.y + int((rect.height - thumb_h) * first / max(1, total - visible))
+        pygame.draw.rect(surface, MUTED, (track.x, thumb_y, track.width, thumb_h), border_radius=2)
+
+    def scroll(self, area, rows):
+        """Scroll a roster panel (by team name) or the "ticker" by rows (positive = down/newer)."""
+        if area == "ticker":
+            self._ticker_scroll = max(0, self._ticker_scroll - rows)
+        else:
+            self._scroll[area] = max(0, self._scroll.get(area, 0) + rows)
+
+    def _ensure_layout(self, full_w, panels_h):
+        """Tile one panel per team: a single row for up to three teams, then a near-square grid."""
+        key = (full_w, panels_h, len(self.teams))
+        if key == self._layout_key:
+            return
+        n = len(self.teams)
+        cols = n if n <= 3 else math.ceil(math.sqrt(n))
+        rows = math.ceil(n / cols)
+        panel_w = (full_w - PAD * 2 - GAP * (cols - 1)) // cols
+        panel_h = (panels_h - GAP * (rows - 1)) // rows
+        self._tiles = [
+            pygame.Rect(PAD + (i % cols) * (panel_w + GAP), PAD + (i // cols) * (panel_h + GAP), panel_w, panel_h)
+            for i in range(n)
+        ]
+        self._layout_key = key
+
+    def _pick_song(self):
+        self._song = track_path(random.randint(1, MUSIC_TRACKS))
+        ASSETS.preload_music(self._song)
+
+    def preload_music(self):
+        """Pick the next match's track and read it in the background (App calls this during the splash)."""
+        if self._song is None:
+            self._pick_song()
+
+    def _music_start(self, wait: float = 0.0):
+        if not self.audible or not pygame.mixer.get_init():
             return
-        w, h = surface.get_size()
-        total_w = w - (PAD * 2) - GAP
-        panel_w = total_w // 2
-        panel_h = h - (PAD * 2)
-        self.left_rect = pygame.Rect(PAD, PAD, panel_w, panel_h)
-        self.right_rect = pygame.Rect(PAD + panel_w + GAP, PAD, panel_w, panel_h)
-        self._layout_ready = True
-
-    def _music_start(self):
-        random_number = random.randint(1, 8)
-        print(f"now playing: {random_number}.mp3")
-        song_path = os.path.expanduser(f"assets/music/{random_number}.mp3")
-        pygame.mixer.music.load(song_path)
+        if self._song is None:
+            self._pick_song()
+        data = ASSETS.music(self._song, wait=wait)
+        if data is None:
+            log.warning("Music %s unavailable (missing or still loading); skipping", self._song)
+            return
+        log.info("now playing: %s", os.path.basename(self._song))
+        pygame.mixer.music.load(data, "mp3")
         pygame.mixer.music.play()
+        self._song = None  # a fresh pick for the next match
 
     def _music_stop(self):
-        pygame.mixer.music.stop()
+        if self.audible and pygame.mixer.get_init():
+            pygame.mixer.music.stop()
 
     def update(self, dt: float):
-        if not self._countdown_running or self._countdown_finished:
-            return
-
-        now = time.monotonic()
-        elapsed = now - self._countdown_start if self._countdown_start is not None else 0.0
-
-        if (elapsed // 1) == 13 and not self._playing_music:
-            print("Starting background music...")
+        pass  # phase cues fire from state.timer's scheduler; nothing to poll
+
+    def _on_phase(self, phase):
+        """state.timer subscriber: start code at the countdown deadline, music off at the end."""
+        if phase == GameState.PLAYING:
+            self._cancel_music_cue()
+            if self._countdown_running and not self._sent_start_code:
+                self._sent_start_code = True
+                try:
+                    send_special_code(202, repeat=1, addr=getattr(self.state, "addr", "127.0.0.1"),
+                                      port=getattr(self.state, "port", 7500))
+                except Exception:
+                    log.warning("Failed to send start code 202")
+        elif phase in (GameState.ENDED, GameState.LOBBY):
+            self._cancel_music_cue()
+            if self._playing_music:
+                log.info("Stopping background music...")
+                self._music_stop()
+            self._playing_music = False
+            if phase == GameState.LOBBY:
+                self._countdown_running = False
+
+    def _cue_music(self):
+        self._music_cue = None
+        if not self._playing_music:
+            log.info("Starting background music...")
             self._playing_music = True
             self._music_start()
 
-        if elapsed >= self._countdown_total:
-            if not self._countdown_finished:
-                self._countdown_finished = True
-                if not self._sent_start_code:
-                    try:
-                        send_special_code(202, repeat=1, addr="127.0.0.1", port=7500)
-                    except Exception:
-                        print("Failed to send start code 202")
-                    self._sent_start_code = True
+    def _cancel_music_cue(self):
+        if self._music_cue is not None:
+            self._music_cue.cancel()
+            self._music_cue = None
+
+    def toggle_pause(self):
+        """Stop/restart the match clock; the countdown, cues and music all follow it."""
+        timer = self.state.timer
+        if timer.state not in (GameState.COUNTDOWN, GameState.PLAYING):
             return
+        if timer.paused:
+            timer.resume()
+            if self._playing_music and self.audible and pygame.mixer.get_init():
+                pygame.mixer.music.unpause()
+        else:
+            timer.pause()
+            if self._playing_music and self.audible and pygame.mixer.get_init():
+                pygame.mixer.music.pause()
+        log.info("Match clock %s", "paused" if timer.paused else "resumed")
 
     def enter(self):
-        """Restarts pre-game countdown when the screen is entered."""
+        """Line the overlay up with state.timer's countdown when the screen is entered."""
+        timer = self.state.timer
+        timer.subscribe(self._on_phase)
         self._countdown_running = True
-        self._countdown_start = time.monotonic()
-        self._countdown_finished = False
         self._sent_start_code = False
         self._sent_end_code = False
         self._playing_music = False
+        self._cancel_music_cue()
+        if timer.state == GameState.COUNTDOWN:
+            self._music_cue = timer.at(MUSIC_CUE, self._cue_music)
+        self.preload_music()  # read from disk now, well before the cue
+        ASSETS.preload_image(BASE_ICON)
+        self._scroll.clear()
+        self._ticker_scroll = 0
+        self._order_key = None  # the roster may have changed on the entry screen
+
+    def resume(self, timer):
+        """Pick up a timer restored after a crash (cues are relative to its phase start)."""
+        self.enter()
+        if timer.state != GameState.PLAYING:
+            return
+        self._sent_start_code = True
+        self._playing_music = True
+        try:
+            self._music_start(wait=2.0)  # resuming mid-match: nothing is preloaded yet
+        except Exception:
+            log.warning("Could not restart background music")
 
     def send_game_end(self):
         if self._sent_end_code:
             return
         addr = getattr(self.state, "addr", "127.0.0.1")
         try:
-            send_special_code(221, repeat=3, addr=addr, port=7500)
+            send_special_code(221, repeat=3, addr=addr, port=getattr(self.state, "port", 7500))
         except Exception:
-            print("Failed to send game end code 221")
+            log.warning("Failed to send game end code 221")
         self._sent_end_code = True
 
     def handle_event(self, event, manager=None):
+        if event.type == pygame.MOUSEWHEEL:
+            pos = pygame.mouse.get_pos()
+            if self._event_rect and self._event_rect.collidepoint(pos):
+                self.scroll("ticker", -event.y * SCROLL_STEP)
+            for team, rect in self._panel_rects.items():
+                if rect.collidepoint(pos):
+                    self.scroll(team, -event.y * SCROLL_STEP)
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_PAGEUP:
+                self.scroll("ticker", -SCROLL_STEP)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.scroll("ticker", SCROLL_STEP)
+            elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                step = -1 if event.key == pygame.K_UP else 1
+                for team in self._panel_rects:
+                    self.scroll(team, step)
+            elif event.key == pygame.K_HOME:
+                self._scroll.clear()
+                self._ticker_scroll = 0
+            elif event.key == pygame.K_F6 and self._countdown_running:
+                self.toggle_pause()
+            return
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             pos = event.pos
             if self._back_button_rect and self._back_button_rect.collidepoint(pos):
                 if manager:
-                    print("Stopping background music...")
+                    log.info("Stopping background music...")
                     self._music_stop()
-                    send_special_code(221, repeat=3, addr=getattr(self.state, "addr", "127.0.0.1"), port=7500)
+                    send_special_code(221, repeat=3, addr=getattr(self.state, "addr", "127.0.0.1"),
+                                      port=getattr(self.state, "port", 7500))
                     manager.switch_to("player_entry")
                 return
 
     def draw(self, surface: pygame.Surface):
+        if self.font is None:
+            self.font = pygame.font.SysFont("Arial", 16)
+            self.font_hdr = pygame.font.SysFont("Arial", 18, bold=True)
+            self.font_title = pygame.font.SysFont("Arial", 26, bold=True)
         surface.fill(BG)
 
         full_w, full_h = surface.get_size()
         event_h = max(72, int(full_h * EVENT_H))
         event_rect = pygame.Rect(PAD, full_h - PAD - event_h, full_w - PAD * 2, event_h)
 
-        total_w = full_w - (PAD * 2) - GAP
-        panel_w = total_w // 2
-        panel_h = full_h - (PAD * 3) - event_h
-        self.left_rect = pygame.Rect(PAD, PAD, panel_w, panel_h)
-        self.right_rect = pygame.Rect(PAD + panel_w + GAP, PAD, panel_w, panel_h)
-
-        players_dict = getattr(self.state, "players", {}) or {}
-        red, green = [], []
-        red_total, green_total = 0, 0
-
-        for pid, pdata in players_dict.items():
-            team = _norm_team(_get(pdata, "team"))
-            try:
-                score_value = int(_get(pdata, "score") or 0)
-            except ValueError:
-                score_value = 0
-            row = {
-                "codename": _get(pdata, "codename"),
-                "equip_id": _get(pdata, "equip"),
-                "score": str(score_value),
-                "has_base": (pdata.get("has_base") if isinstance(pdata, dict) else getattr(pdata, "has_base", False)) or False,
-            }
-            if team == "Red":
-                red.append(row)
-                red_total += score_value
-            elif team == "Green":
-                green.append(row)
-                green_total += score_value
-
-        red.sort(key=lambda r: int(r["score"]), reverse=True)
-        green.sort(key=lambda r: int(r["score"]), reverse=True)
-
-        flash_red = red_total > green_total
-        flash_green = green_total > red_total
-
-        self._draw_panel(surface, self.left_rect, "Red", red, TEAM_CAP, RED_ACCENT, team_score=red_total, flash=flash_red)
-        self._draw_panel(surface, self.right_rect, "Green", green, TEAM_CAP, GREEN_ACCENT, team_score=green_total, flash=flash_green)
+        self._ensure_layout(full_w, full_h - (PAD * 3) - event_h)
+
+        order, totals = self._sorted_roster()
+
+        # the leader flashes, unless the top score is shared
+        best = max(totals)
+        leader = totals.index(best) if totals.count(best) == 1 else -1
+
+        for team, rect, pids, total in zip(self.teams, self._tiles, order, totals):
+            self._draw_panel(surface, rect, team.name, pids, TEAM_CAP, team.color,
+                             team_score=total, flash=team.index == leader)
 
         # --- Current Game Action area (FIXED DRAW ORDER) ---
         # Draw the panel FIRST so it doesn't cover the text.
@@ -250,18 +370,49 @@ class PlayDisplay:
         header_surf = self.font_hdr.render("Current Game Action", True, TEXT)
         surface.blit(header_surf, (event_rect.x + PAD, event_rect.y + PAD))
 
+        # team score lines over the last minute, from the score history's per-column buckets
+        history = getattr(self.state, "score_history", None)
+        ticker_right = event_rect.right
+        if history is not None:
+            chart_w = min(MOMENTUM_W, event_rect.width // 3)
+            chart = pygame.Rect(full_w - PAD * 2 - BACK_W - chart_w, event_rect.y + PAD // 2,
+                                chart_w, event_rect.height - PAD)
+            draw_momentum(surface, chart, history.momentum(), [t.color for t in self.teams],
+                          title=f"Momentum (last {history.window:.0f} s)")
+            ticker_right = chart.x - PAD // 2
+
+        # devices the ingest flood guard is shedding right now
+        guard = getattr(self.state, "flood_guard", None)
+        offenders = guard.offenders() if guard is not None else []
+        if offenders:
+            text = "Flood guard: " + ", ".join(f"{label} ({n:,} dropped)" for label, n in offenders)
+            max_w = ticker_right - event_rect.x - header_surf.get_width() - PAD * 4
+            warn = self._text_surface(self.font, text, max_w, FLASH_COLOR)
+            surface.blit(warn, (ticker_right - PAD - warn.get_width(),
+                                event_rect.y + PAD + (header_surf.get_height() - warn.get_height()) // 2))
+
         # Now render the events INSIDE the box with clipping.
         # We show the newest at the bottom, like a ticker.
         inner_x = event_rect.x + PAD
         inner_top = event_rect.y + PAD + header_surf.get_height() + 6
-        inner_w = event_rect.width - PAD * 2
+        inner_w = ticker_right - event_rect.x - PAD * 2
         inner_h = event_rect.bottom - PAD - inner_top
 
         line_h = max(18, self.font.get_height() + 4)
         max_lines = max(1, inner_h // line_h)
-
-        events_src = list(getattr(self.state, "event_log", []))
-        events = events_src[-max_lines:]  # keep only what fits
+        self._event_rect = event_rect
+
+        # only the lines that fit get formatted (EventLog stores compact records);
+        # while scrolled back, new arrivals push the offset so the view holds still
+        event_log = getattr(self.state, "event_log", None)
+        events = []
+        if event_log is not None:
+            if self._ticker_scroll:
+                self._ticker_scroll += event_log.total - self._ticker_total
+            self._ticker_total = event_log.total
+            # (a cleared log restarts total at 0, which can take the offset below zero)
+            self._ticker_scroll = max(0, min(self._ticker_scroll, len(event_log) - max_lines))
+            events = event_log.lines(max_lines, offset=self._ticker_scroll)
 
         # Clip to the inner area so nothing draws outside the box
         old_clip = surface.get_clip()
@@ -270,16 +421,24 @@ class PlayDisplay:
         # Draw from oldest to newest, anchored to the bottom
         y_start = inner_top + inner_h - (len(events) * line_h)
         y = max(inner_top, y_start)
-        for e in events:
-            txt = e["text"] if isinstance(e, dict) else str(e)
-            txt = self._ellipsize(txt, inner_w, self.font)
-            surface.blit(self.font.render(txt, True, TEXT), (inner_x, y))
+        for txt in events:
+            surface.blit(self._text_surface(self.font, txt, inner_w), (inner_x, y))
             y += line_h
 
         surface.set_clip(old_clip)
-
-        # --- Countdown overlay ---
-        if self._countdown_running and not self._countdown_finished:
+        if event_log is not None:
+            first = len(event_log) - self._ticker_scroll - len(events)
+            self._draw_scrollbar(surface, pygame.Rect(ticker_right - PAD // 2 - 4, inner_top, 6, inner_h),
+                                 first, max_lines, len(event_log))
+
+        # --- Countdown overlay (straight from state.timer, so it can't drift from the phase change) ---
+        timer = self.state.timer
+        overlay_label = None
+        if self._countdown_running and timer.state == GameState.COUNTDOWN:
+            overlay_label = str(max(1, timer.remaining_seconds()))
+        elif self._countdown_running and timer.state == GameState.PLAYING and timer.elapsed() < GO_SECONDS:
+            overlay_label = "GO!"
+        if overlay_label:
             if self._overlay_big_font is None:
                 w, h = surface.get_size()
                 size = max(48, int(min(w, h) * 0.22))
@@ -289,29 +448,19 @@ class PlayDisplay:
             overlay = pygame.Surface(surface.get_size(), flags=pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 190))
             surface.blit(overlay, (0, 0))
-            now = time.monotonic()
-            elapsed = now - self._countdown_start if self._countdown_start is not None else 0.0
-            if elapsed < self._countdown_steps * self._step_seconds:
-                idx = int(elapsed // self._step_seconds)
-                label = str(self._countdown_steps - idx)
-            elif elapsed < self._countdown_total:
-                label = "GO!"
-            else:
-                label = ""
-            if label:
-                big_surf = self._overlay_big_font.render(label, True, TEXT)
-                big_rect = big_surf.get_rect(center=(full_w // 2, full_h // 2))
-                surface.blit(big_surf, big_rect)
-                small = self._overlay_small_font.render("Get ready!", True, MUTED)
-                small_rect = small.get_rect(center=(full_w // 2, big_rect.bottom + 28))
-                surface.blit(small, small_rect)
-
-        if self._countdown_finished:
+            big_surf = self._overlay_big_font.render(overlay_label, True, TEXT)
+            big_rect = big_surf.get_rect(center=(full_w // 2, full_h // 2))
+            surface.blit(big_surf, big_rect)
+            small = self._overlay_small_font.render("Paused" if timer.paused else "Get ready!", True, MUTED)
+            small_rect = small.get_rect(center=(full_w // 2, big_rect.bottom + 28))
+            surface.blit(small, small_rect)
+
+        if timer.state in (GameState.PLAYING, GameState.ENDED):
             started_surf = self.font.render("Game started!", True, (0, 255, 255))
             surface.blit(started_surf, (full_w - started_surf.get_width() - 12, 8))
 
         # --- Back button ---
-        btn_w, btn_h = 190, 34
+        btn_w, btn_h = BACK_W, BACK_H
         btn_x, btn_y = full_w - PAD - btn_w, full_h - PAD - btn_h
         self._back_button_rect = pygame.Rect(btn_x, btn_y, btn_w, btn_h)
         if self._back_button_font is None:
@@ -327,6 +476,43 @@ class PlayDisplay:
             _draw_timer_label(surface, self.state.timer.label())
 
     # --- helpers ---
+    def _sorted_roster(self):
+        """
+        Per team, pids by score (highest first, ties in roster order), and the
+        team totals. Rebuilt when the score history's version or the roster
+        size moves; other frames reuse it, so drawing costs the visible rows.
+        """
+        players = getattr(self.state, "players", {}) or {}
+        history = getattr(self.state, "score_history", None)
+        key = (history.version, len(players)) if history is not None else None
+        if key is not None and key == self._order_key:
+            return self._order, self._totals
+        n = len(self.teams)
+        by_team = [[] for _ in range(n)]
+        totals = [0] * n
+        for pid, pdata in players.items():
+            idx = team_index(_get(pdata, "team"))
+            if idx < 0:
+                continue
+            score = _score(pdata)
+            by_team[idx].append((score, pid))
+            totals[idx] += score
+        for rows in by_team:
+            rows.sort(key=lambda r: r[0], reverse=True)
+        self._order = [[pid for _score_value, pid in rows] for rows in by_team]
+        self._totals = totals
+        self._order_key = key
+        return self._order, totals
+
+    def _row(self, pdata):
+        """Cells of one visible roster row, read live from the player's entry."""
+        return {
+            "codename": _get(pdata, "codename"),
+            "equip_id": _get(pdata, "equip"),
+            "score": str(_score(pdata)),
+            "has_base": (pdata.get("has_base") if isinstance(pdata, dict) else getattr(pdata, "has_base", False)) or False,
+        }
+
     def _measure_columns(self, rows, avail_w):
         gap_px = self.font.size("   ")[0]
         n = len(COLUMNS)
@@ -355,9 +541,10 @@ class PlayDisplay:
                 x += gap_px
         return boxes, gap_px
 
-    def _draw_panel(self, surface, rect, team_name, rows, cap, accent, *, team_score=0, flash=False):
+    def _draw_panel(self, surface, rect, team_name, pids, cap, accent, *, team_score=0, flash=False):
         pygame.draw.rect(surface, PANEL, rect, border_radius=12)
-        title = f"{team_name}  ({len(rows)}/{cap})"
+        self._panel_rects[team_name] = rect
+        title = f"{team_name}  ({len(pids)}/{cap})"
         title_surf = self.font_title.render(title, True, accent)
         title_pos = (rect.x + PAD, rect.y + PAD)
         surface.blit(title_surf, title_pos)
@@ -367,35 +554,35 @@ class PlayDisplay:
         score_surf = self.font_title.render(score_text, True, score_color)
         surface.blit(score_surf, (title_pos[0] + title_surf.get_width() + 14, title_pos[1]))
         header_y = title_pos[1] + title_surf.get_height() + TITLE_Y
+        top_headers = header_y + self.font_hdr.get_height() + GAP
+        height_avail = (rect.bottom - PAD) - top_headers
+        row_h = int(max(ROW_minH, min(ROW_maxH, height_avail / TEAM_ROWS)))
+
+        # only the rows that fit are measured and drawn; the rest are reached by scrolling
+        visible = max(1, height_avail // row_h)
+        first = min(self._scroll.get(team_name, 0), max(0, len(pids) - visible))
+        self._scroll[team_name] = first
+        players = self.state.players
+        shown = [self._row(players.get(pid, {})) for pid in pids[first:first + visible]]
+
         avail_w = rect.width - (PAD * 2)
-        col_boxes_rel, gap_px = self._measure_columns(rows, avail_w)
+        col_boxes_rel, gap_px = self._measure_columns(shown, avail_w)
         col_boxes_abs = [(rect.x + PAD + x_rel, w) for (x_rel, w) in col_boxes_rel]
         for (label, (x_start, w)) in zip(COLUMNS, col_boxes_abs):
             self._blit_centered(surface, self.font_hdr, label, x_start, w, header_y, self.font_hdr.get_height())
-        rows_target = max(TEAM_ROWS, len(rows))
-        top_headers = header_y + self.font_hdr.get_height() + GAP
-        height_avail = (rect.bottom - PAD) - top_headers
-        row_h = int(max(ROW_minH, min(ROW_maxH, height_avail / rows_target)))
-        if self._base_icon is None:
-            try:
-                raw = pygame.image.load("assets/baseicon.jpg").convert_alpha()
-                icon_h = max(16, row_h - 8)
-                scale = icon_h / raw.get_height()
-                icon_w = max(16, int(raw.get_width() * scale))
-                self._base_icon = pygame.transform.smoothscale(raw, (icon_w, icon_h))
-            except Exception:
-                self._base_icon = None
+        # decoded in the background during the countdown; scaled once per row height
+        base_icon = ASSETS.image(BASE_ICON, height=max(16, row_h - 8))
         row_y = top_headers
-        for r in rows:
+        for r in shown:
             base_idx = 0
-            if r.get("has_base") and self._base_icon is not None:
+            if r.get("has_base") and base_icon is not None:
                 x_start, w = col_boxes_abs[base_idx]
-                ix = x_start + (w - self._base_icon.get_width()) // 2
-                iy = row_y + (row_h - self._base_icon.get_height()) // 2
-                surface.blit(self._base_icon, (ix, iy))
+                ix = x_start + (w - base_icon.get_width()) // 2
+                iy = row_y + (row_h - base_icon.get_height()) // 2
+                surface.blit(base_icon, (ix, iy))
             cells = [r["codename"], r["equip_id"], r["score"]]
             for (x_start, w), cell in zip(col_boxes_abs[1:], cells):
                 self._blit_centered(surface, self.font, cell, x_start, w, row_y, row_h)
             row_y += row_h
-            if row_y > rect.bottom - PAD:
-                break
\ No newline at end of file
+        self._draw_scrollbar(surface, pygame.Rect(rect.right - PAD // 2 - 4, top_headers, 6, visible * row_h),
+                             first, visible, len(pids))
\ No newline at end of file
@@ -1,28 +1,45 @@
 import os
+import threading
 import pygame as pg
 from src.ui.widgets.widgets_core import Label, Button
 from src.ui.widgets.inputs import TextInput, TeamSelector
-from src.graphs.charts import draw_team_table, draw_bar_chart
+from src.graphs.charts import draw_team_table, draw_bar_chart, draw_leaderboard
 from src.config import TEAM_CAP
+from src.teams import team_named
 
 USE_STUBS = os.getenv("PHOTON_USE_STUBS", "0") == "1"
 
 # ---- Database fallback -------------------------------------------------------
-if not USE_STUBS:
-    try:
-        import db_players as db
-    except Exception as e:
-        print(f"Falling back to stub because import failed: {e}")
-        USE_STUBS = True
-
-if USE_STUBS:
-    class _DBStub:
-        def get_codename(self, pid):
-            # Pretend the player doesn't exist so UI can add it to memory.
-            return None
-        def add_player(self, pid, name):
-            print(f"Stub: add_player({pid}, {name})")
-    db = _DBStub()
+# db_players pulls in psycopg2, so it's imported on first use instead of with
+# this module (the App warms it up in the background during the splash).
+class _DBStub:
+    def get_codename(self, pid):
+        # Pretend the player doesn't exist so UI can add it to memory.
+        return None
+    def add_player(self, pid, name):
+        print(f"Stub: add_player({pid}, {name})")
+    def clear_all_players(self):
+        print("Stub: clear_all_players()")
+    def top_players(self, n=10):
+        return []
+    def player_rank(self, pid):
+        return None
+
+_db = None
+
+def _get_db():
+    global _db, USE_STUBS
+    if _db is None:
+        if not USE_STUBS:
+            try:
+                import db_players
+                _db = db_players
+            except Exception as e:
+                print(f"Falling back to stub because import failed: {e}")
+                USE_STUBS = True
+        if USE_STUBS:
+            _db = _DBStub()
+    return _db
 
 # ---- UDP fallback ------------------------------------------------------------
 if not USE_STUBS:
@@ -40,10 +57,11 @@ if USE_STUBS:
 
 
 class PlayerEntry:
-    def __init__(self, state, on_start):
+    def __init__(self, state, on_start, on_replay=None):
         # `state` is shared AppState (has .team_counts, .players, .addr)
         # `on_start` is a callback that router uses to switch to the Play screen
-        self.state, self.on_start = state, on_start
+        # `on_replay` (optional) opens the replay viewer for the last match
+        self.state, self.on_start, self.on_replay = state, on_start, on_replay
 
         # --- UI controls ------------------------------------------------------
         self.lbl      = Label("Player Entry", (40, 20))
@@ -55,14 +73,20 @@ class PlayerEntry:
         self.btn_add  = Button((200, 270, 160, 40), "Add Player", self._on_add)
 
         self.in_addr = TextInput((40, 420, 180, 32), text=self.state.addr, placeholder="IP") 
-        self.in_port = TextInput((230, 420, 100, 32), text="7500", numeric=True, placeholder="Port")
+        self.in_port = TextInput((230, 420, 100, 32), text=str(getattr(self.state, "port", 7500)), numeric=True, placeholder="Port")
+
 
+        # lifetime leaderboard, fetched off the UI thread (pid -> (rank, rating, matches, wins))
+        self.ranks = {}
+        self.leaders = []
 
         self.message = ""                      # status line for success/errors
         self.font    = pg.font.Font(None, 28)  # shared font
 
     # Screen lifecycle
-    def on_enter(self): pass
+    def on_enter(self):
+        # ratings move when a match ends, so refresh the board and the roster's ranks
+        self._fetch_ranks(list(self.state.players), leaders=True)
     def on_exit(self):  pass
 
     def handle_event(self, ev):
@@ -76,15 +100,16 @@ class PlayerEntry:
                 self.in_equip.focus = False; self.in_pid.focus = True
             return
 
-        # ----- Global keys: F12 clears, F5 starts ----------------------------
+        # ----- Global keys: F12 clears, F5 starts, F9 replays ---------------
         if ev.type == pg.KEYDOWN:
             if ev.key == pg.K_F12:
-                db.clear_all_players()
+                _get_db().clear_all_players()
                 self.state.players.clear()
                 self.state.team_counts.clear()
                 self._clear(message = False)
                 self.message = "Roster cleared - Let's start a new game"
             if ev.key == pg.K_F5:  self.on_start()
+            if ev.key == pg.K_F9 and self.on_replay:  self.on_replay()
 
         # Delegate mouse/keyboard to widgets
         self.in_pid.handle_event(ev)
@@ -121,9 +146,12 @@ class PlayerEntry:
         self.in_addr.draw(surf)
         self.in_port.draw(surf)
 
-        # Team chart (right panel)
+        # Team chart (right panel), with each player's all-time rank
         draw_team_table(surf, pg.Rect(surf.get_width()-380, 40, 340, 420),
-                       self.state.players, "Teams")
+                       self.state.players, "Teams", ranks=self.ranks)
+
+        # All-time leaders (lower left)
+        draw_leaderboard(surf, pg.Rect(40, 462, 460, 122), self.leaders, "All-time Top 5")
         
         # Bar chart below the team table
         draw_bar_chart(surf, pg.Rect(surf.get_width() - 380, 480, 340, 100),
@@ -133,7 +161,7 @@ class PlayerEntry:
         # Status + hints
         if self.message:
             surf.blit(self.font.render(self.message, True, (250,220,120)), (40, 330))
-        surf.blit(self.font.render("F5: Start   F12: Clear   Esc: Exit", True, (170,180,195)), (40, 370))
+        surf.blit(self.font.render("F5: Start   F9: Replay   F12: Clear   Esc: Exit", True, (170,180,195)), (40, 370))
 
         surf.blit(self.font.render("UDP Target", True, (220,220,230)), (40, 395)) 
         self.in_addr.draw(surf); self.in_port.draw(surf)
@@ -152,6 +180,24 @@ class PlayerEntry:
             self.message = ""
         self.in_pid.focus = True
 
+    def _fetch_ranks(self, pids, leaders=False):
+        """Look up lifetime ranks (and optionally the top 5) in the background; the lobby never waits on it."""
+        if USE_STUBS:
+            return
+
+        def run():
+            db = _get_db()
+            try:
+                if leaders:
+                    self.leaders = db.top_players(5)
+                for pid in pids:
+                    rank = db.player_rank(pid)
+                    if rank is not None:
+                        self.ranks[pid] = rank
+            except Exception:
+                pass  # no DB or no leaderboard yet: the lobby just shows no ranks
+        threading.Thread(target=run, name="lobby-ranks", daemon=True).start()
+
     # -------------------------------------------------------------------------
     # MAIN ACTION: Add Player
     # Tries real DB + UDP; if unavailable, uses stubs and keeps the UI working.
@@ -189,6 +235,10 @@ class PlayerEntry:
                 self.message = f"Equipment ID {equip} is already assigned to PID {p_pid}."
                 return
 
+        # only teams from the team table have a base and a panel
+        if team_named(team) is None:
+            self.message = f"Unknown team {team!r}"
+            return
         # enforce team cap before touching DB/NET
         if self.state.team_counts.get(team, 0) >= TEAM_CAP:
             self.message = f"{team} team is full (cap {TEAM_CAP})"
@@ -196,7 +246,7 @@ class PlayerEntry:
 
         #DB LOOKUP: does this player already exist?
         try:
-            existing = db.get_codename(pid)  # may raise if DB not reachable
+            existing = _get_db().get_codename(pid)  # may raise if DB not reachable
         except Exception as e:
             # If DB not available, continue as if new player and explain
             self.message = f"DB lookup error; continuing with stub. ({e})"
@@ -208,7 +258,7 @@ class PlayerEntry:
                 self.message = "Codename required for new player"
                 return
             try:
-                db.add_player(pid, name_txt)
+                _get_db().add_player(pid, name_txt)
             except Exception as e:
                 # Keep going—UI should still function and show status
                 self.message = f"DB insert error; continuing with stub. ({e})"
@@ -231,6 +281,7 @@ class PlayerEntry:
             return                                                     
         # persist chosen address so next add reuses it               
         self.state.addr = addr_txt                                 
+        self.state.port = port
 
         # UDP BROADCAST of equipment id
         try:
@@ -249,6 +300,7 @@ class PlayerEntry:
             "has_base": False,
         }
         self.state.team_counts[team] = self.state.team_counts.get(team, 0) + 1
+        self._fetch_ranks([pid])
 
         # Final user message depends on whether we were on real services or stubs
         self.message = "Added player + broadcast sent" if not USE_STUBS else \
@@ -0,0 +1,174 @@
+# src/ui/screens/results.py
+import pygame
+
+from src.graphs.charts import draw_heatmap, heatmap_surface
+from src.teams import TEAMS
+
+BG = (18, 18, 22)
+PANEL = (28, 28, 36)
+TEXT = (235, 235, 245)
+MUTED = (170, 170, 180)
+HEAT_W = 400
+PAD = 16
+ROW_H = 22
+SCROLL_STEP = 3
+CAPTURE_LINES = 4
+
+# stat table: header, row_stats key, column width
+COLUMNS = [("Player", "name", 120), ("Score", "score", 58), ("Tags", "tags", 44), ("Hit", "tagged", 40),
+           ("FF", "ff", 34), ("Streak", "streak", 52), ("Bases", "bases", 44), ("1st base", "first_base", 60)]
+
+
+def _clock(seconds) -> str:
+    if seconds is None:
+        return "-"
+    s = max(0, int(seconds))
+    return f"{s // 60}:{s % 60:02d}"
+
+
+class Results:
+    """
+    Post-game screen over a src.match_stats.MatchStats: the tag matrix as a
+    heatmap (hover a cell for the pair), and a per-player stat table.
+    The heatmap and table are rendered once per match (and per scroll), not per frame.
+    """
+    def __init__(self, on_back):
+        self.on_back = on_back
+        self.stats = None
+        self.font = self.font_hdr = self.font_title = None
+        self._cells = None
+        self._grid = None
+        self._table = None
+        self._table_key = None
+        self._scroll = 0
+        self._back_rect = None
+
+    def show(self, stats):
+        self.stats = stats
+        self._cells = None
+        self._table_key = None
+        self._scroll = 0
+
+    # ---------- input ----------
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_BACKSPACE, pygame.K_RETURN):
+                self.on_back()
+            elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                self._scroll_by(-1 if event.key == pygame.K_UP else 1)
+            elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                self._scroll_by(-SCROLL_STEP * 3 if event.key == pygame.K_PAGEUP else SCROLL_STEP * 3)
+        elif event.type == pygame.MOUSEWHEEL:
+            self._scroll_by(-event.y * SCROLL_STEP)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self._back_rect and self._back_rect.collidepoint(event.pos):
+                self.on_back()
+
+    def _scroll_by(self, rows):
+        if self.stats is not None:
+            self._scroll = max(0, min(len(self.stats.pids) - 1, self._scroll + rows))
+
+    # ---------- drawing ----------
+    def draw(self, surface: pygame.Surface):
+        if self.font is None:
+            self.font = pygame.font.SysFont("Arial", 15)
+            self.font_hdr = pygame.font.SysFont("Arial", 15, bold=True)
+            self.font_title = pygame.font.SysFont("Arial", 24, bold=True)
+        surface.fill(BG)
+        full_w, full_h = surface.get_size()
+        stats = self.stats
+        if stats is None:
+            surface.blit(self.font_title.render("No results", True, TEXT), (PAD, PAD))
+            return
+
+        winner = stats.winner()
+        scores = "   ".join(f"{tm.name} {s:,}" for tm, s in zip(TEAMS, stats.team_scores))
+        title = f"{winner} wins!" if winner else "Draw!"
+        surface.blit(self.font_title.render(title, True, TEXT), (PAD, PAD - 4))
+        sub = self.font.render(f"{scores}     {stats.n_events:,} events, {len(stats.captures)} base captures",
+                               True, MUTED)
+        surface.blit(sub, (PAD, PAD + 26))
+
+        top = PAD + 52
+        bottom = full_h - PAD - 44
+        heat_rect = pygame.Rect(PAD, top, HEAT_W, min(bottom - top, HEAT_W + 16))  # square grid + title
+        if self._cells is None:
+            self._cells = heatmap_surface(stats.matrix[stats.order][:, stats.order])
+        colors = [TEAMS[t].color if t >= 0 else MUTED for t in stats.team[stats.order].tolist()]
+        self._grid = draw_heatmap(surface, heat_rect, self._cells, colors, title="Tags: shooter (row) x target (column)")
+        self._draw_hover(surface)
+
+        table_rect = pygame.Rect(heat_rect.right + PAD, top, full_w - heat_rect.right - PAD * 2,
+                                 bottom - top - CAPTURE_LINES * 18 - 8)
+        self._draw_table(surface, table_rect)
+        self._draw_captures(surface, pygame.Rect(table_rect.x, table_rect.bottom + 6, table_rect.width,
+                                                 CAPTURE_LINES * 18))
+
+        btn = pygame.Rect(full_w - PAD - 190, full_h - PAD - 34, 190, 34)
+        self._back_rect = btn
+        pygame.draw.rect(surface, PANEL, btn, border_radius=8)
+        pygame.draw.rect(surface, MUTED, btn, width=1, border_radius=8)
+        label = self.font_hdr.render("Back to Player Entry", True, TEXT)
+        surface.blit(label, label.get_rect(center=btn.center))
+
+    def _draw_hover(self, surface):
+        grid, stats = self._grid, self.stats
+        pos = pygame.mouse.get_pos()
+        n = len(stats.pids)
+        if not n or not grid.width or not grid.collidepoint(pos):
+            return
+        r = stats.order[(pos[1] - grid.y) * n // grid.height]
+        c = stats.order[(pos[0] - grid.x) * n // grid.width]
+        text = f"{stats.names[r]} -> {stats.names[c]}: {int(stats.matrix[r, c])}"
+        tip = self.font.render(text, True, TEXT)
+        bg = pygame.Rect(0, 0, tip.get_width() + 10, tip.get_height() + 6)
+        bg.midbottom = (min(max(pos[0], bg.width // 2), surface.get_width() - bg.width // 2), pos[1] - 8)
+        pygame.draw.rect(surface, PANEL, bg, border_radius=4)
+        surface.blit(tip, (bg.x + 5, bg.y + 3))
+
+    def _draw_table(self, surface, rect):
+        key = (rect.size, self._scroll, id(self.stats))
+        if key != self._table_key:
+            self._table = self._render_table(rect.size)
+            self._table_key = key
+        surface.blit(self._table, rect.topleft)
+
+    def _render_table(self, size):
+        stats = self.stats
+        surf = pygame.Surface(size)
+        surf.fill(PANEL)
+        x = 8
+        for header, _key, w in COLUMNS:
+            surf.blit(self.font_hdr.render(header, True, MUTED), (x, 4))
+            x += w
+        by_score = sorted(range(len(stats.pids)), key=lambda i: -int(stats.scores[i]))
+        visible = (size[1] - ROW_H - 4) // ROW_H
+        for n, row in enumerate(by_score[self._scroll:self._scroll + visible]):
+            y = 4 + ROW_H * (n + 1)
+            if n % 2 == 0:
+                pygame.draw.rect(surf, (34, 34, 44), (0, y - 2, size[0], ROW_H))
+            s = stats.row_stats(row)
+            tint = TEAMS[stats.team[row]].color if stats.team[row] >= 0 else MUTED
+            x = 8
+            for _header, key, w in COLUMNS:
+                value = s[key]
+                if key == "name":
+                    text = f"{self._scroll + n + 1}. {value}"
+                    color = tint
+                elif key == "first_base":
+                    text, color = _clock(value), TEXT
+                else:
+                    text, color = f"{value:,}" if isinstance(value, int) else str(value), TEXT
+                while self.font.size(text)[0] > w - 6 and len(text) > 1:
+                    text = text[:-1]
+                surf.blit(self.font.render(text, True, color), (x, y))
+                x += w
+        return surf
+
+    def _draw_captures(self, surface, rect):
+        stats = self.stats
+        surface.blit(self.font_hdr.render("Base captures", True, MUTED), (rect.x, rect.y))
+        names = dict(zip(stats.pids, stats.names))
+        for i, (t, pid, base) in enumerate(stats.captures[:CAPTURE_LINES - 1]):
+            line = f"{_clock(t)}  {names.get(pid, pid)} took the {base} base"
+            surface.blit(self.font.render(line, True, TEXT), (rect.x, rect.y + 18 * (i + 1)))
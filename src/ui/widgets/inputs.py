@@ -1,4 +1,5 @@
 import pygame as pg
+from src.teams import TEAMS
 
 class TextInput:
     """Single-line text box; numeric=True restricts to digits."""
@@ -46,12 +47,15 @@ class TextInput:
 
 
 class TeamSelector:
-    """Two buttons (Red/Green). Selected one is bright with thick white outline."""
-    def __init__(self, pos, default="Red"):
-        self.options = ["Red", "Green"]
-        self.idx = self.options.index(default)
+    """One button per team. Selected one is bright with thick white outline."""
+    def __init__(self, pos, default=None, teams=TEAMS, width=430):
+        self.options = [t.name for t in teams]
+        self.colors = [t.color for t in teams]
+        self.idx = self.options.index(default) if default else 0
         self.font = pg.font.Font(None, 28)
-        self.button_rects = [pg.Rect(pos[0] + i * 110, pos[1], 100, 36) for i in range(2)]
+        n = len(self.options)
+        btn_w = min(100, (width - 10 * (n - 1)) // n)
+        self.button_rects = [pg.Rect(pos[0] + i * (btn_w + 10), pos[1], btn_w, 36) for i in range(n)]
 
     def get_team(self):
         return self.options[self.idx]
@@ -69,7 +73,7 @@ class TeamSelector:
     def draw(self, surf):
         for i, r in enumerate(self.button_rects):
             active = (i == self.idx)
-            color = (200, 60, 60) if i == 0 else (60, 180, 90)
+            color = self.colors[i]
             if not active:
                 color = tuple(int(c * 0.6) for c in color)  # dim inactive
             pg.draw.rect(surf, color, r, border_radius=8)
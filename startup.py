@@ -0,0 +1,95 @@
+# startup.py
+"""
+Startup pipeline and time-to-interactive breakdown.
+
+main.py imports this first, so the clock starts before the heavy imports.
+The App marks its sequential phases (imports, display, arenas, ...) and
+hands slow, independent work (driver and NumPy imports, DB connect, font
+scan, asset decode, socket bind) to warm-up threads that run while the splash is up.
+The splash leaves as soon as the warm-ups finish, and the first interactive
+screen logs one line:
+
+  Startup 0.41 s to interactive: imports 0.08, display 0.02, mixer 0.03, arenas 0.03, splash 0.24
+    | warm-up: db 0.21, fonts 0.05, modules 0.06, network 0.01, assets 0.02
+
+The same numbers are exported as photon_startup_seconds{phase=...}.
+"""
+import time
+
+T0 = time.perf_counter()
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app_logging import get_logger
+from metrics import REGISTRY
+
+log = get_logger("startup")
+
+
+class Startup:
+    def __init__(self, t0: float = T0):
+        self.t0 = t0
+        self._last = t0
+        self.phases: List[Tuple[str, float]] = []  # sequential, main thread
+        self.warmups: Dict[str, Optional[float]] = {}  # name -> seconds (None while running)
+        self.failed: Dict[str, str] = {}
+        self._threads: List[threading.Thread] = []
+        self.ready_at = None
+
+    def mark(self, name: str):
+        """Close the phase that started at the previous mark."""
+        now = time.perf_counter()
+        secs, self._last = now - self._last, now
+        self.phases.append((name, secs))
+        REGISTRY.gauge("photon_startup_seconds", lambda: secs, "Startup time per phase", phase=name)
+
+    def warm_up(self, name: str, fn: Callable[[], object], on_done: Optional[Callable[[object], None]] = None):
+        """Run fn on a daemon thread; on_done(result) runs on that thread if fn succeeds."""
+        self.warmups[name] = None
+
+        def run():
+            t0 = time.perf_counter()
+            try:
+                result = fn()
+                if on_done is not None:
+                    on_done(result)
+            except Exception as e:
+                self.failed[name] = (str(e).strip().splitlines() or [type(e).__name__])[0]
+                log.warning("Warm-up %s failed: %s", name, self.failed[name])
+            self.warmups[name] = time.perf_counter() - t0
+
+        t = threading.Thread(target=run, name=f"warmup-{name}", daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def done(self) -> bool:
+        return not any(t.is_alive() for t in self._threads)
+
+    def wait(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+        return self.done()
+
+    def interactive(self):
+        """First interactive screen is up: log the breakdown (once)."""
+        if self.ready_at is not None:
+            return
+        self.mark("splash")
+        self.ready_at = time.perf_counter()
+        REGISTRY.gauge("photon_startup_seconds", lambda: self.ready_at - self.t0,
+                       "Startup time per phase", phase="interactive")
+        log.info("%s", self.report())
+
+    def report(self) -> str:
+        total = (self.ready_at or time.perf_counter()) - self.t0
+        seq = ", ".join(f"{name} {secs:.2f}" for name, secs in self.phases)
+        warm = ", ".join(
+            f"{name} " + ("running" if secs is None else f"{secs:.2f}") + (" (failed)" if name in self.failed else "")
+            for name, secs in self.warmups.items())
+        return f"Startup {total:.2f} s to interactive: {seq}" + (f" | warm-up: {warm}" if warm else "")
+
+
+# one per process, like metrics.REGISTRY
+STARTUP = Startup()
@@ -0,0 +1,133 @@
+# test_batch_scoring.py
+"""handle_batch must leave exactly the state handle_packet leaves, event for event, in every game mode."""
+import random
+
+import pytest
+
+from batch_scoring import KIND_ID, KIND_PAIR, Roster, event_text, handle_batch, parse_messages
+from metrics import REGISTRY
+from packet_handler import handle_packet
+from src.event_log import EventLog
+from src.game_modes import MODES, compile_mode, parse_mode
+from src.score_history import ScoreHistory
+from src.teams import TEAMS
+
+MODE_SPECS = sorted(MODES) + ["elimination,lives=2", "capture,capture_limit=3", "classic,friendly=0,base=50"]
+
+
+class State:
+    def __init__(self, players, rules):
+        self.players = {pid: dict(p) for pid, p in players.items()}
+        self.team_counts = {}
+        self.rules = rules
+        self.event_log = EventLog()
+        self.event_log.templates = rules.templates
+        self.score_history = ScoreHistory(len(TEAMS), clock=lambda: 0.0)
+
+    def log_tag(self, shooter, target, friendly=False):
+        self.event_log.log_tag(shooter, target, friendly, ts=0.0)
+
+    def log_base(self, shooter, base):
+        self.event_log.log_base(shooter, base, ts=0.0)
+
+    def log_out(self, shooter, target):
+        self.event_log.log_out(shooter, target, ts=0.0)
+
+
+def make_stream(seed, n_players=12, n_events=3000):
+    """A roster over two teams plus one player with no team, and a mixed packet stream (some decoded)."""
+    rng = random.Random(seed)
+    players = {pid: {"codename": f"P{pid}", "team": TEAMS[pid % 2].name if pid != n_players - 1 else "",
+                     "equip": 10 + pid, "score": 0}
+               for pid in range(n_players)}
+    bases = [t.base_code for t in TEAMS]
+    msgs = []
+    for _ in range(n_events):
+        r = rng.random()
+        a = 10 + rng.randrange(n_players + 1)   # one id past the roster: unknown equipment
+        if r < 0.15:
+            msgs.append(f"{a}:{rng.choice(bases)}")
+        elif r < 0.2:
+            msgs.append(str(a))
+        elif r < 0.22:
+            msgs.append("x:y")
+        elif r < 0.4:
+            msgs.append((1, a, 10 + rng.randrange(n_players + 1)))   # binary-protocol event
+        else:
+            msgs.append(f"{a}:{10 + rng.randrange(n_players + 1)}")
+    return players, msgs
+
+
+def counters():
+    out = {}
+    for name in ("photon_packets_applied_total", "photon_packets_ignored_total"):
+        for labels, metric in REGISTRY._families[name][2].items():
+            out[(name, labels)] = metric.value
+    return out
+
+
+def run(spec, batch, seed=1):
+    players, msgs = make_stream(seed)
+    state = State(players, compile_mode(parse_mode(spec)))
+    replies = []
+    before = counters()
+    if batch:
+        rng = random.Random(seed + 7)
+        i = 0
+        while i < len(msgs):
+            n = rng.randrange(1, 200)
+            handle_batch(msgs[i:i + n], state, udp_send=replies.append)
+            i += n
+    else:
+        for msg in msgs:
+            handle_packet(event_text(msg) if type(msg) is tuple else msg, state, udp_send=replies.append)
+    after = counters()
+    log = [state.event_log.format(state.event_log.record(i)) for i in range(len(state.event_log))]
+    metrics = {key: after[key] - before.get(key, 0) for key in after}
+    return state.players, replies, log, state.score_history.totals, metrics
+
+
+@pytest.mark.parametrize("spec", MODE_SPECS)
+def test_batch_matches_packet_by_packet(spec):
+    one, batch = run(spec, batch=False), run(spec, batch=True)
+    for got, want in zip(batch, one):
+        assert got == want
+
+
+@pytest.mark.parametrize("spec, reason", [("elimination", "eliminated"), ("elimination,lives=2", "eliminated"),
+                                          ("capture", "capture_limit"), ("capture,capture_limit=3", "capture_limit")])
+def test_stream_reaches_mode_limits(spec, reason):
+    """The parity runs above only mean something if the stream actually eliminates / hits the limit."""
+    players, _replies, log, _totals, metrics = run(spec, batch=True)
+    assert metrics[("photon_packets_ignored_total", (("reason", reason),))] > 0
+    if reason == "eliminated":
+        lives = parse_mode(spec).lives
+        assert any(p.get("tagged", 0) >= lives for p in players.values())
+        assert any("eliminated" in line for line in log)
+    else:
+        limit = parse_mode(spec).capture_limit
+        assert max(p.get("captures", 0) for p in players.values()) == limit
+
+
+def test_parse_messages_counts_malformed():
+    kinds, a, b, malformed = parse_messages(["11:21", " 7 ", "", "x:y", "1:2:3", (KIND_PAIR, 5, 6)])
+    assert (kinds, a, b, malformed) == ([KIND_PAIR, KIND_ID, KIND_PAIR], [11, 7, 5], [21, 0, 6], 2)
+
+
+@pytest.mark.parametrize("equips", [[11, 12, 13], [11, 1 << 40, 5]])   # direct lookup table / bisection
+def test_roster_lookup(equips):
+    np = pytest.importorskip("numpy")
+    players = {pid: {"team": TEAMS[0].name, "equip": e} for pid, e in enumerate(equips, 1)}
+    players[9] = {"team": TEAMS[1].name, "equip": equips[0]}   # duplicate equip: first row wins
+    roster = Roster(players)
+    queries = np.array(equips + [-1, 99, 1 << 50], dtype=np.int64)
+    assert roster.lookup(queries).tolist() == [0, 1, 2, -1, -1, -1]
+
+
+def test_ids_past_int64_match_no_player():
+    players = {1: {"codename": "A", "team": TEAMS[0].name, "equip": 11, "score": 0},
+               2: {"codename": "B", "team": TEAMS[1].name, "equip": 12, "score": 0}}
+    state = State(players, compile_mode(parse_mode("classic")))
+    replies = handle_batch([f"11:{1 << 70}", f"{1 << 70}:12", "11:12"], state)
+    assert [p["score"] for p in state.players.values()] == [10, 0]
+    assert replies == [12]
@@ -0,0 +1,118 @@
+# test_db_matches.py
+"""Lifetime totals / rating bookkeeping of db_matches against a fake cursor (no Postgres needed)."""
+import random
+from collections import Counter
+
+import pytest
+
+import db_matches
+from db_matches import MatchRecorder, rating_bucket
+from db_players import RATING_START
+
+
+class FakeCursor:
+    """player_totals and rating_buckets as dicts; understands the statements _update_totals issues."""
+    def __init__(self):
+        self.totals = {}    # pid -> dict of player_totals columns
+        self.buckets = Counter()
+        self._result = []
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT player_id, rating FROM player_totals"):
+            self._result = [(pid, self.totals[pid]["rating"]) for pid in params[0] if pid in self.totals]
+        else:
+            self._result = []
+
+    def fetchall(self):
+        return self._result
+
+    def execute_values(self, cur, sql, rows, template=None, page_size=100):
+        assert cur is self
+        if sql is db_matches._UPSERT_TOTALS:
+            for pid, codename, matches, wins, score, best, tags, tagged, friendly, bases, rating, bucket, _ts in rows:
+                t = self.totals.setdefault(pid, dict(matches=0, wins=0, total_score=0, best_score=0, tags=0,
+                                                     tagged=0, friendly=0, bases=0))
+                t.update(codename=codename, rating=rating, rating_bucket=bucket,
+                         best_score=max(t["best_score"], best))
+                for key, value in (("matches", matches), ("wins", wins), ("total_score", score), ("tags", tags),
+                                   ("tagged", tagged), ("friendly", friendly), ("bases", bases)):
+                    t[key] += value
+        elif "rating_buckets" in sql:
+            for bucket, n in rows:
+                self.buckets[bucket] += n
+        else:
+            raise AssertionError(sql)
+
+    def rank(self, pid):
+        """db_players._RANK: bucket counts above + players ahead inside the player's own bucket."""
+        me = self.totals[pid]
+        above = sum(n for b, n in self.buckets.items() if b > me["rating_bucket"])
+        inside = sum(1 for q, t in self.totals.items() if t["rating_bucket"] == me["rating_bucket"]
+                     and (t["rating"] > me["rating"] or (t["rating"] == me["rating"] and q < pid)))
+        return 1 + above + inside
+
+
+@pytest.fixture
+def cur(monkeypatch):
+    cur = FakeCursor()
+    monkeypatch.setattr(db_matches, "execute_values", cur.execute_values)
+    return cur
+
+
+def _end_rows(recorder):
+    item = recorder._items[-1]
+    assert item[0] == "end"
+    return item[2]
+
+
+def test_totals_count_events_dropped_from_the_buffer(cur):
+    recorder = MatchRecorder(max_pending=5)   # never started: everything past 5 queued items is dropped
+    recorder.begin_match()
+    for _ in range(20):
+        recorder.record_tag(1, 2)
+    recorder.record_tag(1, 3, friendly=True)
+    recorder.record_base(3, "Green")
+    assert recorder.dropped > 0
+    players = {
+        1: {"codename": "Red1", "team": "Red", "score": 190},
+        2: {"codename": "Green1", "team": "Green", "score": 0},
+        3: {"codename": "Red2", "team": "Red", "score": 90, "has_base": True},
+    }
+    recorder.end_match(players)
+    MatchRecorder._update_totals(cur, 0.0, _end_rows(recorder))
+
+    t1, t2, t3 = cur.totals[1], cur.totals[2], cur.totals[3]
+    assert (t1["tags"], t1["tagged"], t1["friendly"], t1["bases"]) == (20, 0, 1, 0)
+    assert (t2["tags"], t2["tagged"]) == (0, 20)
+    assert (t3["bases"], t3["tagged"]) == (1, 0)   # friendly fire isn't counted as tagged
+    assert (t1["wins"], t2["wins"], t3["wins"]) == (1, 0, 1)
+    assert t1["rating"] > RATING_START > t2["rating"]
+    assert t1["total_score"] == t1["best_score"] == 190
+
+
+def test_tally_resets_between_matches(cur):
+    recorder = MatchRecorder()
+    recorder.begin_match()
+    recorder.record_tag(1, 2)
+    recorder.end_match({1: {"team": "Red", "score": 10}})
+    recorder.begin_match()
+    recorder.end_match({1: {"team": "Red", "score": 0}})
+    assert _end_rows(recorder)[0][5:] == (0, 0, 0, 0)
+
+
+def test_buckets_and_ranks_follow_ratings(cur):
+    rng = random.Random(7)
+    pids = list(range(1, 41))
+    for _match in range(60):
+        players = {pid: {"codename": f"P{pid}", "team": rng.choice(["Red", "Green"]), "score": rng.randrange(0, 500, 10)}
+                   for pid in rng.sample(pids, 12)}
+        rows = [(pid, p["codename"], p["team"], p["score"], False, 0, 0, 0, 0) for pid, p in players.items()]
+        MatchRecorder._update_totals(cur, 0.0, rows)
+
+    expected = Counter(rating_bucket(t["rating"]) for t in cur.totals.values())
+    assert +cur.buckets == expected
+    assert all(t["rating_bucket"] == rating_bucket(t["rating"]) for t in cur.totals.values())
+
+    order = sorted(cur.totals, key=lambda pid: (-cur.totals[pid]["rating"], pid))
+    assert [cur.rank(pid) for pid in order] == list(range(1, len(order) + 1))
+    assert sum(t["matches"] for t in cur.totals.values()) == 60 * 12
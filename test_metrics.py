@@ -0,0 +1,35 @@
+# test_metrics.py
+import sys
+import threading
+
+from metrics import Histogram, Registry
+
+
+def test_histogram_observes_from_many_threads():
+    h = Histogram(bounds=(0.5,))
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        workers = [threading.Thread(target=lambda v=v: [h.observe(v) for _ in range(20000)]) for v in (0.25, 1.0) * 2]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        sys.setswitchinterval(old)
+    counts, total, count = h.snapshot()
+    assert counts == [40000, 40000]
+    assert count == 80000
+    assert total == 40000 * 0.25 + 40000 * 1.0
+
+
+def test_render_histogram_buckets_are_cumulative():
+    reg = Registry()
+    h = reg.histogram("photon_test_seconds", "Test timings", buckets=(0.1, 1.0), op="x")
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v)
+    text = reg.render()
+    assert 'photon_test_seconds_bucket{op="x",le="0.1"} 1' in text
+    assert 'photon_test_seconds_bucket{op="x",le="1.0"} 2' in text
+    assert 'photon_test_seconds_bucket{op="x",le="+Inf"} 3' in text
+    assert 'photon_test_seconds_count{op="x"} 3' in text
@@ -0,0 +1,121 @@
+# test_packet_filter.py
+import wire
+from packet_filter import TEXT_DEDUPE_WINDOW, DedupeWindow, FloodGuard, TokenBuckets
+from udp_receiver import _binary_events
+
+ADDR = ("10.0.0.5", 4000)
+
+
+class Collide:
+    """Distinct keys that share a hash."""
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 1
+
+    def __eq__(self, other):
+        return isinstance(other, Collide) and other.name == self.name
+
+
+def test_hash_collisions_are_not_duplicates():
+    d = DedupeWindow(1.0)
+    assert not d.seen(Collide("a"), now=0.0)
+    assert not d.seen(Collide("b"), now=0.0)
+    assert d.seen(Collide("a"), now=0.5)
+    assert d.dropped == 1
+
+
+def test_window_expires_and_capacity_evicts():
+    d = DedupeWindow(1.0, capacity=2)
+    assert not d.seen((ADDR, "1:2"), now=0.0)
+    assert d.seen((ADDR, "1:2"), now=0.9)
+    assert not d.seen((ADDR, "1:2"), now=1.1)
+    assert not d.seen((ADDR, "3:4"), now=1.2)
+    assert not d.seen((ADDR, "5:6"), now=1.3)   # evicts "1:2"
+    assert not d.seen((ADDR, "1:2"), now=1.4)
+    assert len(d) == 2
+
+
+def test_zero_window_keeps_repeated_text_tags():
+    d = DedupeWindow(0)
+    assert not any(d.seen((ADDR, "1:2"), now=0.0) for _ in range(3))
+
+
+def test_text_window_drops_retransmits_but_not_repeat_tags():
+    d = DedupeWindow(TEXT_DEDUPE_WINDOW)
+    assert not d.seen((ADDR, "1:2"), now=10.0)
+    assert d.seen((ADDR, "1:2"), now=10.002)          # retransmitted copy
+    assert not d.seen((("10.0.0.6", 4000), "1:2"), now=10.002)
+    assert not d.seen((ADDR, "1:2"), now=10.25)       # the same tag again, a quarter second later
+
+
+def test_clear_forgets_everything():
+    d = DedupeWindow(1.0, capacity=4)
+    for i in range(6):
+        d.seen((ADDR, i), now=float(i))
+    d.clear()
+    assert len(d) == 0 and not d.seen((ADDR, 5), now=5.5)
+    assert list(d._ts) == [5.5, 0.0, 0.0, 0.0]
+
+
+def test_binary_retransmit_dropped_but_new_sequence_kept():
+    records = [(wire.KIND_PAIR, 7, 1, 2, 0), (wire.KIND_PAIR, 7, 1, 2, 0), (wire.KIND_PAIR, 8, 1, 2, 0)]
+    (data,) = wire.encode_all(records)
+    events, rejected, duplicates = _binary_events(wire.decode(data), ADDR, DedupeWindow(1.0))
+    assert events == [(wire.KIND_PAIR, 1, 2), (wire.KIND_PAIR, 1, 2)]
+    assert (rejected, duplicates) == (0, 1)
+    # the same sequence number from another sender is its own event
+    dedupe = DedupeWindow(1.0)
+    _binary_events(wire.decode(data), ADDR, dedupe)
+    events, _, _ = _binary_events(wire.decode(data), ("10.0.0.6", 4000), dedupe)
+    assert len(events) == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_token_bucket_burst_then_refill():
+    buckets = TokenBuckets(rate=10, burst=3)
+    assert [buckets.take("k", 0.0) for _ in range(4)] == [True, True, True, False]
+    assert not buckets.take("k", 0.05)        # half a token back
+    assert buckets.take("k", 0.15)            # a whole one now
+    assert not buckets.take("k", 0.15)
+    assert [buckets.take("k", 10.0) for _ in range(4)] == [True, True, True, False]   # refills to burst, no more
+    assert buckets.take("other", 10.0)        # keys don't share a bucket
+
+
+def test_flood_guard_limits_address_and_equipment_separately():
+    clock = FakeClock()
+    guard = FloodGuard(addr_rate=1, addr_burst=5, equip_rate=1, equip_burst=2, clock=clock)
+    # one vest over its equipment limit; the address still has tokens for the others
+    assert [guard.admit("10.0.0.5", "11:21") for _ in range(3)] == [True, True, False]
+    assert guard.admit("10.0.0.5", "12:21") and guard.admit("10.0.0.5", "13:21")
+    assert not guard.admit("10.0.0.5", "14:21")   # the address's burst of 5 is spent
+    assert guard.admit("10.0.0.6", "15:21")       # another address
+    assert guard.shed == 2
+    assert guard.offenders() == [("equip 11", 1), ("10.0.0.5", 1)]
+    # the text id and the binary id share a bucket
+    clock.t = 100.0
+    assert guard.admit_equip("10.0.0.7", 16) and guard.admit("10.0.0.8", "16:21")
+    assert not guard.admit_equip("10.0.0.9", 16)
+
+
+def test_offenders_age_out():
+    clock = FakeClock()
+    guard = FloodGuard(addr_rate=0, equip_rate=1, equip_burst=1, window=10.0, clock=clock)
+    guard.admit("h", "11:21")
+    assert not guard.admit("h", "11:21")
+    assert guard.offenders() == [("equip 11", 1)]
+    clock.t = 25.0
+    assert guard.offenders() == []
+
+
+def test_disabled_guard_admits_everything():
+    guard = FloodGuard(addr_rate=0, equip_rate=0)
+    assert all(guard.admit("h", "11:21") for _ in range(10000)) and guard.shed == 0
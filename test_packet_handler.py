@@ -0,0 +1,68 @@
+# test_packet_handler.py
+import logging
+
+from packet_handler import handle_packet
+from src.event_log import EventLog
+from src.teams import TEAMS, team_side, warn_unknown_teams
+
+
+class State:
+    def __init__(self, teams):
+        self.players = {pid: {"codename": f"P{pid}", "team": team, "equip": 10 + pid, "score": 0}
+                        for pid, team in enumerate(teams, 1)}
+        self.team_counts = {}
+        self.event_log = EventLog()
+
+    def log_tag(self, shooter, target, friendly=False):
+        self.event_log.log_tag(shooter, target, friendly)
+
+    def log_base(self, shooter, base):
+        self.event_log.log_base(shooter, base)
+
+    def log_out(self, shooter, target):
+        self.event_log.log_out(shooter, target)
+
+
+def scores(state):
+    return [p["score"] for p in state.players.values()]
+
+
+def test_unknown_teams_still_oppose_by_name():
+    red = TEAMS[0].name
+    state = State([red, "Gold", "Silver", "gold "])
+    for msg in ("11:12", "12:13", "14:12"):
+        handle_packet(msg, state)
+    # red tags Gold, Gold tags Silver: opposing; "gold " tags Gold: the same team
+    assert scores(state) == [10, 0, 0, -10]
+
+
+def test_no_team_is_never_opposing():
+    state = State([TEAMS[0].name, ""])
+    handle_packet("11:12", state)
+    assert scores(state) == [-10, -10]
+    assert team_side("", {}) == team_side(None, {}) == -1
+
+
+def test_unknown_team_sides_stay_with_the_caller():
+    sides = {}
+    gold = team_side("Gold", sides)
+    assert gold >= len(TEAMS)
+    assert team_side(" gold", sides) == gold != team_side("Silver", sides)
+    assert team_side(TEAMS[0].name, sides) == 0
+    assert len(sides) == 2
+    # a fresh roster starts its ids over instead of growing a process-wide table
+    assert team_side("Bronze", {}) == len(TEAMS)
+
+
+def test_base_codes_match_as_numbers():
+    red, green = TEAMS[0], TEAMS[1]
+    state = State([red.name])
+    handle_packet(f"11:0{green.base_code}", state)
+    assert scores(state) == [100]
+
+
+def test_unknown_teams_are_logged(caplog):
+    with caplog.at_level(logging.WARNING):
+        unknown = warn_unknown_teams({1: {"team": TEAMS[0].name}, 2: {"team": "Gold"}}, "Test")
+    assert unknown == [2]
+    assert "'Gold'" in caplog.text
@@ -0,0 +1,60 @@
+# test_udp_receiver.py
+import queue
+import socket
+import time
+
+import wire
+from packet_filter import DedupeWindow, FloodGuard
+from udp_receiver import Receiver, _binary_events, _queue_binary
+
+ADDR = ("10.0.0.5", 4000)
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_binary_events_rejects_unknown_kinds_and_honours_the_guard():
+    data = wire.encode([(wire.KIND_PAIR, 1, 11, 21, 0), (7, 2, 11, 21, 0), (wire.KIND_ID, 3, 12, 0, 0)])
+    events, rejected, duplicates = _binary_events(wire.decode(data), ADDR, DedupeWindow(0),
+                                                  admit=lambda host, equip: equip != 12)
+    assert events == [(wire.KIND_PAIR, 11, 21)]
+    assert (rejected, duplicates) == (1, 0)
+
+
+def test_queue_binary_drops_malformed_datagrams():
+    q = queue.Queue()
+    guard = FloodGuard(addr_rate=0, equip_rate=0)
+    assert _queue_binary(q, wire.encode([(wire.KIND_PAIR, 1, 11, 21, 0)])[:-1], ADDR, guard, DedupeWindow(0)) == 0
+    assert q.empty()
+    assert _queue_binary(q, wire.encode([(wire.KIND_PAIR, 1, 11, 21, 0)]), ADDR, guard, DedupeWindow(0)) == 1
+    assert q.get_nowait() == ([(wire.KIND_PAIR, 11, 21)], ADDR)
+
+
+def test_receiver_tells_text_from_binary():
+    port = _free_port()
+    receiver = Receiver("127.0.0.1", port, dedupe_window=0, text_dedupe_window=0,
+                        flood_guard=FloodGuard(addr_rate=0, equip_rate=0))
+    receiver.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            deadline = time.monotonic() + 2.0
+            got = []
+            while not got and time.monotonic() < deadline:   # until the receive thread has bound
+                s.sendto(b"11:21", ("127.0.0.1", port))
+                got = [m for m in [receiver.get_message(timeout=0.1)] if m]
+            s.sendto(wire.encode([(wire.KIND_PAIR, 1, 12, 22, 0), (wire.KIND_ID, 2, 13, 0, 0)]), ("127.0.0.1", port))
+            s.sendto(b"not:a:packet", ("127.0.0.1", port))
+            s.sendto(b"31", ("127.0.0.1", port))
+            deadline = time.monotonic() + 2.0
+            while got[-1][0] != "31" and time.monotonic() < deadline:
+                msg = receiver.get_message(timeout=0.1)
+                if msg is not None:
+                    got.append(msg)
+    finally:
+        receiver.stop()
+    payloads = [m[0] for m in got]
+    assert set(payloads[:-2]) == {"11:21"}   # (the probe may have gone out more than once)
+    assert payloads[-2:] == [[(wire.KIND_PAIR, 12, 22), (wire.KIND_ID, 13, 0)], "31"]
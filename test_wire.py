@@ -0,0 +1,41 @@
+# test_wire.py
+import pytest
+
+import wire
+
+RECORDS = [(wire.KIND_PAIR, 1, 11, 21, 1_000), (wire.KIND_ID, 2, 900001, 0, 2_000),
+           (wire.KIND_PAIR, 3, 4294967295, 53, 2 ** 64 - 1)]
+
+
+def test_round_trip():
+    data = wire.encode(RECORDS)
+    assert wire.is_binary(data)
+    assert len(data) == wire.HEADER.size + len(RECORDS) * wire.RECORD.size
+    decoded = [(kind, seq, a, b, us) for kind, _flags, _res, seq, a, b, us in wire.RECORD.iter_unpack(wire.decode(data))]
+    assert decoded == RECORDS
+
+
+def test_encode_all_splits_and_caps_records_per_datagram():
+    records = [(wire.KIND_PAIR, i, 1, 2, 0) for i in range(wire.MAX_RECORDS * 2 + 5)]
+    datagrams = wire.encode_all(records)
+    assert [len(d) for d in datagrams] == [wire.MAX_DATAGRAM - 2, wire.MAX_DATAGRAM - 2,
+                                           wire.HEADER.size + 5 * wire.RECORD.size]
+    assert all(len(d) <= wire.MAX_DATAGRAM for d in datagrams)
+    assert len(wire.encode_all(records, per_datagram=10)) == 13
+    with pytest.raises(ValueError):
+        wire.encode(records[:wire.MAX_RECORDS + 1])
+
+
+def test_decode_rejects_malformed_datagrams():
+    good = wire.encode(RECORDS[:2])
+    assert wire.decode(b"\x00LT" + good[3:]) is None                      # bad magic
+    assert wire.decode(good[:3] + bytes([wire.VERSION + 1]) + good[4:]) is None
+    assert wire.decode(good[:-1]) is None                                 # short of header + n*24
+    assert wire.decode(good + b"\x00") is None                            # trailing byte
+    assert wire.decode(good[:wire.HEADER.size - 1]) is None               # not even a header
+    assert wire.decode(wire.HEADER.pack(wire.MAGIC, wire.VERSION, 0)) is not None
+
+
+def test_text_is_never_binary():
+    for text in (b"11:21", b"  7 ", b"900001"):
+        assert not wire.is_binary(text)
@@ -1,6 +1,15 @@
 # udp_broadcast.py
 import socket
 import time
+import logging
+
+from app_logging import get_logger, setup_logging, PacketRateLogger
+from metrics import REGISTRY
+
+log = get_logger("net.send")
+_rate = PacketRateLogger(log, "sent to", "destination")
+_m_sent = REGISTRY.counter("photon_udp_sent_total", "Datagrams broadcast to equipment")
+_m_send_errors = REGISTRY.counter("photon_udp_send_errors_total", "Broadcasts that raised")
 
 # Send a single integer representing equipment ID
 def send_equipment_id(equip_id: int, addr: str = "127.0.0.1", port: int = 7500):
@@ -24,13 +33,21 @@ def _send(msg: str, addr: str, port: int):
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        s.sendto(msg.encode(), (addr, port))
-        print(f"Sent '{msg}' to {addr}:{port}")
+        try:
+            s.sendto(msg.encode(), (addr, port))
+        except OSError:
+            _m_send_errors.inc()
+            raise
+        _m_sent.inc()
+        _rate.record((addr, port))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sent '%s' to %s:%d", msg, addr, port)
     finally:
         s.close()
 
 # Quick test if running this file directly
 if __name__ == "__main__":
+    setup_logging()
     send_equipment_id(101, addr="127.0.0.1", port=7501)
     send_hit(12, 34, same_team=True, addr="127.0.0.1", port=7501)
     send_special_code(221, repeat=3, addr="127.0.0.1", port=7501)
\ No newline at end of file
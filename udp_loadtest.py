@@ -0,0 +1,418 @@
+# udp_loadtest.py
+"""
+Load harness for udp_receiver + packet_handler.
+
+  python udp_loadtest.py local --players 30 --rate 5000 --duration 10
+      in-process Receiver + handle_packet on a spare port; measures ingest and scoring alone
+  python udp_loadtest.py local --rate 20000 --workers 4
+      same, with ingest spread over SO_REUSEPORT worker processes
+  python udp_loadtest.py local --rate 50000 --binary 32
+      same traffic in the binary protocol (wire.py), up to 32 events per datagram
+  python udp_loadtest.py local --rate 5000 --flood-guard
+      same, behind the production flood guard (reports what it shed separately)
+  python udp_loadtest.py game --rate 2000 --duration 10
+      blasts a running game on :7501 and times the replies it broadcasts on :7500;
+      drops are read from the game's /metrics (PHOTON_METRICS_PORT) when it answers
+  python udp_loadtest.py record traffic.txt --rate 2000 --duration 30
+  python udp_loadtest.py game --replay traffic.txt
+
+Latency is measured with probe packets: single integers >= PROBE_BASE, which
+the game answers by broadcasting the same number back (see handle_packet).
+
+Local runs leave the flood guard off: its per-address and per-equipment
+limits are sized for real vests, so a harness blasting from one address
+would mostly measure the guard. "throughput" only counts applied packets;
+"shed" and "duplicates" are reported next to it.
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+import wire
+from metrics import METRICS_PORT
+from src.teams import TEAMS
+
+PROBE_BASE = 900000     # probe ids live above any real equipment id
+METRICS_URL = f"http://127.0.0.1:{METRICS_PORT or 9108}/metrics"  # the running game's endpoint (game mode)
+# receive-side counters scraped from the game before and after a game-mode run
+INGEST_COUNTERS = {
+    "received": "photon_packets_received_total",
+    "rejected": "photon_packets_rejected_total",
+    "duplicates": "photon_packets_duplicate_total",
+    "shed": "photon_packets_shed_total",
+}
+
+Schedule = List[Tuple[float, str]]
+
+
+# -----------------------------
+# Traffic generation
+# -----------------------------
+def make_roster(n_players: int, teams=TEAMS) -> dict:
+    """pid -> player dict (same shape as AppState.players), dealt round-robin across the team table."""
+    roster = {}
+    for i in range(n_players):
+        pid = 1000 + i
+        roster[pid] = {
+            "codename": f"P{i:03d}",
+            "team": teams[i % len(teams)].name,
+            "equip": i + 1,
+            "score": 0,
+            "has_base": False,
+        }
+    return roster
+
+
+class TrafficMix:
+    """Relative weights of each packet kind; probes are a fraction of all packets."""
+    def __init__(self, tag=0.80, friendly=0.08, base=0.02, hit=0.10, probe=0.01):
+        total = tag + friendly + base + hit
+        self.tag, self.friendly, self.base = tag / total, friendly / total, base / total
+        self.probe = probe
+
+    def generate(self, roster: dict, rate: float, duration: float, seed: int = 0, teams=TEAMS) -> Schedule:
+        rng = random.Random(seed)
+        members = [[p["equip"] for p in roster.values() if p["team"] == t.name] for t in teams]
+        sides = [i for i, m in enumerate(members) if m]
+        if len(sides) < 2:
+            raise ValueError("roster needs players on at least two teams")
+        n = int(rate * duration)
+        step = 1.0 / rate if rate > 0 else 0.0
+        probe_seq = 0
+        out = []
+        for i in range(n):
+            t = i * step
+            if rng.random() < self.probe:
+                out.append((t, str(PROBE_BASE + probe_seq)))
+                probe_seq += 1
+                continue
+            r = rng.random()
+            me, them = rng.sample(sides, 2)
+            mine, theirs = members[me], members[them]
+            if r < self.tag:
+                out.append((t, f"{rng.choice(mine)}:{rng.choice(theirs)}"))
+            elif r < self.tag + self.friendly:
+                out.append((t, f"{rng.choice(mine)}:{rng.choice(mine)}"))
+            elif r < self.tag + self.friendly + self.base:
+                shooter = rng.choice(mine)
+                out.append((t, f"{shooter}:{teams[them].base_code}"))
+            else:
+                out.append((t, str(rng.choice(theirs))))
+        return out
+
+
+def save_recording(path: str, schedule: Schedule):
+    with open(path, "w") as f:
+        for t, msg in schedule:
+            f.write(f"{t:.6f}\t{msg}\n")
+
+
+def load_recording(path: str) -> Schedule:
+    out = []
+    with open(path) as f:
+        for line in f:
+            t, _, msg = line.rstrip("\n").partition("\t")
+            if msg:
+                out.append((float(t), msg))
+    return out
+
+
+# -----------------------------
+# Sending / receiving
+# -----------------------------
+def _records(msgs: List[Tuple[float, str]], seq0: int):
+    """Schedule entries -> wire records (kind, seq, a, b, device_us)."""
+    out = []
+    for i, (t, msg) in enumerate(msgs):
+        a, sep, b = msg.partition(":")
+        out.append((wire.KIND_PAIR if sep else wire.KIND_ID, seq0 + i, int(a), int(b or 0), int(t * 1e6)))
+    return out
+
+
+def blast(schedule: Schedule, addr: str, port: int, probe_sent: Dict[int, float], speed: float = 1.0,
+          binary: int = 0) -> int:
+    """
+    Send schedule on its own timeline (scaled by speed); returns events sent.
+    binary=N packs up to N consecutive events per binary datagram, each sent
+    when its last event is due.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sent = 0
+    if binary:
+        per = max(1, min(binary, wire.MAX_RECORDS))
+        schedule = [schedule[i:i + per] for i in range(0, len(schedule), per)]
+    start = time.perf_counter()
+    try:
+        for entry in schedule:
+            t = entry[-1][0] if binary else entry[0]
+            due = start + t / speed
+            delay = due - time.perf_counter()
+            if delay > 0.001:
+                time.sleep(delay)
+            msgs = entry if binary else [entry]
+            now = time.perf_counter()
+            for _t, msg in msgs:
+                if msg.isdigit() and int(msg) >= PROBE_BASE:
+                    probe_sent[int(msg)] = now
+            try:
+                if binary:
+                    sock.sendto(wire.encode(_records(msgs, sent)), (addr, port))
+                else:
+                    sock.sendto(msg.encode(), (addr, port))
+                sent += len(msgs)
+            except OSError:
+                pass
+    finally:
+        sock.close()
+    return sent
+
+
+class EchoListener:
+    """Listens where the game broadcasts replies and timestamps echoed probes."""
+    def __init__(self, bind_addr: str = "0.0.0.0", port: int = 7500):
+        self.probe_seen: Dict[int, float] = {}
+        self.replies = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((bind_addr, port))
+        self._sock.settimeout(0.2)
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            try:
+                data, _ = self._sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            now = time.perf_counter()
+            self.replies += 1
+            text = data.decode(errors="ignore").strip()
+            if text.isdigit() and int(text) >= PROBE_BASE:
+                self.probe_seen.setdefault(int(text), now)
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+        self._thread.join(1.0)
+
+
+# -----------------------------
+# Modes
+# -----------------------------
+def scrape_counters(url: str) -> Optional[Dict[str, float]]:
+    """INGEST_COUNTERS from a Prometheus text endpoint (labels summed), or None if it doesn't answer."""
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            text = resp.read().decode()
+    except (OSError, ValueError):
+        return None
+    totals = dict.fromkeys(INGEST_COUNTERS, 0.0)
+    names = {v: k for k, v in INGEST_COUNTERS.items()}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, _sep, value = line.rpartition(" ")
+        key = names.get(name.partition("{")[0])
+        if key is not None:
+            totals[key] += float(value)
+    return totals
+
+
+def run_game(schedule: Schedule, addr: str, port: int, reply_port: int, speed: float, settle: float,
+             binary: int = 0, metrics_url: Optional[str] = METRICS_URL) -> dict:
+    listener = EchoListener(port=reply_port)
+    probe_sent: Dict[int, float] = {}
+    before = scrape_counters(metrics_url) if metrics_url else None
+    t0 = time.perf_counter()
+    sent = blast(schedule, addr, port, probe_sent, speed, binary)
+    send_s = time.perf_counter() - t0
+    time.sleep(settle)
+    listener.stop()
+    after = scrape_counters(metrics_url) if before is not None else None
+    lat = [listener.probe_seen[k] - v for k, v in probe_sent.items() if k in listener.probe_seen]
+    rep = _report("game", sent, send_s, len(probe_sent), lat, replies=listener.replies)
+    # datagrams the game never read (socket buffer overflow), then what its ingest filters dropped;
+    # None when the game's metrics endpoint is off or unreachable
+    delta = {k: int(after[k] - before[k]) for k in INGEST_COUNTERS} if after is not None else None
+    rep["dropped"] = max(0, sent - delta["received"]) if delta else None
+    for key in ("rejected", "duplicates", "shed"):
+        rep[key] = delta[key] if delta else None
+    return rep
+
+
+def run_local(schedule: Schedule, roster: dict, port: int, speed: float, settle: float, workers: int = 0,
+              dedupe_window: Optional[float] = None, flood_guard: bool = False, binary: int = 0) -> dict:
+    from batch_scoring import handle_batch
+    from main import AppState
+    from metrics import REGISTRY
+    from packet_filter import DEDUPE_WINDOW, FloodGuard
+    from packet_handler import handle_packet
+    from udp_receiver import start_receiver
+
+    state = AppState()
+    state.players.update({pid: dict(p) for pid, p in roster.items()})
+    dup_counter = REGISTRY.counter("photon_packets_duplicate_total")
+    dup_before = dup_counter.value
+    # the window applies to whichever protocol is being sent; text defaults to none, since every
+    # simulated vest shares this one source address and real repeat tags would collide
+    if dedupe_window is None:
+        dedupe_window = DEDUPE_WINDOW if binary else 0.0
+    windows = {"dedupe_window": dedupe_window} if binary else {"text_dedupe_window": dedupe_window}
+    guard = FloodGuard() if flood_guard else FloodGuard(addr_rate=0, equip_rate=0)
+    receiver = start_receiver(bind_addr="127.0.0.1", port=port, workers=workers, flood_guard=guard, **windows)
+    time.sleep(0.2 if not workers else 1.5)  # let the receive thread (or worker processes) bind
+
+    probe_sent: Dict[int, float] = {}
+    lat: List[float] = []
+    applied = 0
+    busy = 0.0
+    done = threading.Event()
+
+    def consume():
+        nonlocal applied, busy
+        while not done.is_set():
+            msg = receiver.get_message(timeout=0.1)
+            if msg is None:
+                continue
+            payload = msg[0]
+            t = time.perf_counter()
+            if type(payload) is list:  # decoded (kind, a, b) events: binary datagram or ingest workers
+                handle_batch(payload, state)
+                now = time.perf_counter()
+                busy += now - t
+                applied += len(payload)
+                for kind, a, _b in payload:
+                    if kind == wire.KIND_ID and a >= PROBE_BASE and a in probe_sent:
+                        lat.append(now - probe_sent[a])
+                continue
+            handle_packet(payload, state)
+            now = time.perf_counter()
+            busy += now - t
+            applied += 1
+            if payload.isdigit() and int(payload) >= PROBE_BASE and int(payload) in probe_sent:
+                lat.append(now - probe_sent[int(payload)])
+
+    worker = threading.Thread(target=consume, daemon=True)
+    worker.start()
+    t0 = time.perf_counter()
+    sent = blast(schedule, "127.0.0.1", port, probe_sent, speed, binary)
+    send_s = time.perf_counter() - t0
+    time.sleep(settle)
+    done.set()
+    worker.join(1.0)
+    receiver.stop()
+    duplicates = dup_counter.value - dup_before
+    rep = _report("local", sent, send_s, len(probe_sent), lat, applied=applied)
+    rep["flood_guard"] = flood_guard
+    rep["duplicates"] = duplicates
+    rep["shed"] = guard.shed
+    rep["dropped"] -= duplicates + guard.shed  # lost in the socket or queue, not filtered
+    rep["ingest_workers"] = workers
+    rep["binary_per_datagram"] = binary
+    rep["handler_us_per_packet"] = round(busy / applied * 1e6, 2) if applied else None
+    return rep
+
+
+def _percentile(sorted_vals: List[float], q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, int(round(q / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def _report(mode, sent, send_s, probes, lat, *, applied=None, replies=None) -> dict:
+    lat = sorted(lat)
+    rep = {
+        "mode": mode,
+        "sent": sent,
+        "send_rate": round(sent / send_s, 1) if send_s > 0 else None,
+        "probes_sent": probes,
+        "probes_seen": len(lat),
+        "probe_loss_pct": round(100.0 * (probes - len(lat)) / probes, 2) if probes else None,
+    }
+    if applied is not None:
+        rep["applied"] = applied
+        rep["dropped"] = sent - applied
+        rep["throughput"] = round(applied / send_s, 1) if send_s > 0 else None
+    if replies is not None:
+        rep["replies"] = replies
+    for q in (50, 90, 99):
+        v = _percentile(lat, q)
+        rep[f"latency_p{q}_ms"] = round(v * 1000, 3) if v is not None else None
+    rep["latency_max_ms"] = round(lat[-1] * 1000, 3) if lat else None
+    return rep
+
+
+def _schedule(args) -> Schedule:
+    if getattr(args, "replay", None):
+        return load_recording(args.replay)
+    mix = TrafficMix(tag=args.tag, friendly=args.friendly, base=args.base, hit=args.hit, probe=args.probe)
+    return mix.generate(make_roster(args.players), args.rate, args.duration, seed=args.seed)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="UDP load harness for the laser tag receiver/handler")
+    ap.add_argument("mode", choices=["local", "game", "record"])
+    ap.add_argument("path", nargs="?", help="output file for 'record'")
+    ap.add_argument("--players", type=int, default=30)
+    ap.add_argument("--rate", type=float, default=1000.0, help="packets per second")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds of traffic")
+    ap.add_argument("--tag", type=float, default=0.80)
+    ap.add_argument("--friendly", type=float, default=0.08)
+    ap.add_argument("--base", type=float, default=0.02)
+    ap.add_argument("--hit", type=float, default=0.10, help="weight of single-id 'I was hit' packets")
+    ap.add_argument("--probe", type=float, default=0.01, help="fraction of packets that are latency probes")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--replay", help="send a recorded traffic file instead of generating")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    ap.add_argument("--addr", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7501)
+    ap.add_argument("--reply-port", type=int, default=7500)
+    ap.add_argument("--local-port", type=int, default=7601)
+    ap.add_argument("--dedupe-window", type=float,
+                    help="local mode: seconds for the protocol sent (0 disables; default "
+                         "PHOTON_DEDUPE_WINDOW for binary, 0 for text: all simulated vests share one address)")
+    ap.add_argument("--flood-guard", action="store_true",
+                    help="local mode: apply the production per-address/equip rate limits (off by default)")
+    ap.add_argument("--metrics-url", default=METRICS_URL,
+                    help="game mode: the game's /metrics, scraped for drops ('' to skip)")
+    ap.add_argument("--workers", type=int, default=0, help="local mode: SO_REUSEPORT ingest processes (0 = thread)")
+    ap.add_argument("--binary", type=int, default=0, metavar="N",
+                    help="send the binary protocol, up to N events per datagram (0 = text)")
+    ap.add_argument("--settle", type=float, default=1.0, help="seconds to wait for stragglers")
+    ap.add_argument("--json", help="also write the report to this file")
+    args = ap.parse_args(argv)
+
+    schedule = _schedule(args)
+    if args.mode == "record":
+        if not args.path:
+            ap.error("record needs an output path")
+        save_recording(args.path, schedule)
+        print(f"Recorded {len(schedule)} packets to {args.path}")
+        return
+    if args.mode == "local":
+        rep = run_local(schedule, make_roster(args.players), args.local_port, args.speed, args.settle,
+                        workers=args.workers, dedupe_window=args.dedupe_window,
+                        flood_guard=args.flood_guard, binary=args.binary)
+    else:
+        rep = run_game(schedule, args.addr, args.port, args.reply_port, args.speed, args.settle, args.binary,
+                       metrics_url=args.metrics_url or None)
+
+    print(json.dumps(rep, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rep, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,158 @@
 # udp_receiver.py
+import multiprocessing
+import os
+import selectors
 import socket
+import struct
+import sys
 import threading
 import queue
-from typing import Optional, Tuple
+import time
+import logging
+from typing import Dict, Iterable, Optional, Tuple
 
-BUFFER_SIZE = 1024
+from app_logging import get_logger, setup_logging, PacketRateLogger
+from metrics import REGISTRY
+from packet_filter import DEDUPE_WINDOW, TEXT_DEDUPE_WINDOW, DedupeWindow, FloodGuard
+import wire
+
+log = get_logger("net.recv")
+
+_m_received = REGISTRY.counter("photon_packets_received_total", "Datagrams read from the game socket")
+_m_validated = REGISTRY.counter("photon_packets_validated_total", "Datagrams that passed _validate and were queued")
+_m_rejected = REGISTRY.counter("photon_packets_rejected_total", "Datagrams dropped by _validate")
+_m_duplicate = REGISTRY.counter("photon_packets_duplicate_total", "Repeats of a recent (source, payload) dropped at ingest")
+
+BUFFER_SIZE = wire.MAX_DATAGRAM  # text packets are tiny; binary ones carry up to wire.MAX_RECORDS events
+# SO_REUSEPORT ingest workers (0 = the in-process receive thread)
+INGEST_WORKERS = int(os.getenv("PHOTON_INGEST_WORKERS", "0") or 0)
+WORKER_BATCH = 256  # events per pipe write; a worker also flushes whenever its socket runs dry
+# worker -> owner batch: header + compact events
+# event: kind (0 = "id", 1 = "a:b"), sender ip, sender port, a, b, perf_counter at recv
+BATCH_HEADER = struct.Struct("<III")  # datagrams read, rejected, duplicates
+EVENT = struct.Struct("<B4sHqqd")
+_INT64_MAX = (1 << 63) - 1
+# kernel receive timestamps for tracing (Linux value; Python doesn't export the constant)
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
 
 class Receiver:
-    def __init__(self, bind_addr: str = "0.0.0.0", port: int = 7501):
+    def __init__(self, bind_addr: str = "0.0.0.0", port: int = 7501, trace: bool = False,
+                 dedupe_window: float = DEDUPE_WINDOW, flood_guard: Optional[FloodGuard] = None,
+                 text_dedupe_window: float = TEXT_DEDUPE_WINDOW):
         self.bind_addr = bind_addr
         self.port = port
+        # trace=True queues (msg, addr, (t_recv, kernel_delay)) for packet_trace
+        self.trace = trace
+        # flooding devices and retransmitted copies never reach the queue
+        self.flood_guard = flood_guard or FloodGuard()
+        self.dedupe = DedupeWindow(dedupe_window)            # binary records, keyed with their seq
+        self.text_dedupe = DedupeWindow(text_dedupe_window)  # text datagrams (off by default)
         self._sock = None
         self._queue = queue.Queue()
         self._running = False
+        # per-packet lines only at DEBUG; otherwise one rate summary per interval
+        self._verbose = False
+        self._rate = PacketRateLogger(log)
     
     # Start the receiver in a background thread
     def start(self):
         if self._running:
             return
         self._running = True
+        self._verbose = log.isEnabledFor(logging.DEBUG)
+        REGISTRY.gauge("photon_queue_depth", self._queue.qsize, "Validated packets waiting for the game loop")
         thread = threading.Thread(target=self._loop, daemon=True)
         thread.start()
-        print(f"Receiver started on {self.bind_addr}:{self.port}")
+        log.info("Receiver started on %s:%d", self.bind_addr, self.port)
 
     # Stop the receiver
     def stop(self):
         self._running = False
         if self._sock:
             self._sock.close()
-        print("Receiver stopped")
+        log.info("Receiver stopped")
 
     def _loop(self):
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._sock.bind((self.bind_addr, self.port))
         self._sock.settimeout(0.5)
+        if self.trace:
+            self._trace_loop()
+            return
         while self._running:
             try:
                 data, addr = self._sock.recvfrom(BUFFER_SIZE)
-                msg = data.decode().strip()
-                if self._validate(msg):
+                if data[:3] == wire.MAGIC:
+                    self._put_binary(data, addr)
+                    continue
+                _m_received.inc()
+                msg = data.decode(errors="ignore").strip()
+                if not self._validate(msg):
+                    _m_rejected.inc()
+                elif not self.flood_guard.admit(addr[0], msg):
+                    pass  # shed; FloodGuard counts it
+                elif self.text_dedupe.seen((addr, msg)):
+                    _m_duplicate.inc()
+                else:
                     self._queue.put((msg, addr))
-                    print(f"Received '{msg}' from {addr}")
+                    _m_validated.inc()
+                    self._rate.record(addr[0])
+                    if self._verbose:
+                        log.debug("Received '%s' from %s", msg, addr)
+            except socket.timeout:
+                continue
+            except OSError:
+                break # socket closed
+
+    # Same as _loop, but stamps each packet for packet_trace (kept separate so tracing off costs nothing)
+    def _trace_loop(self):
+        kernel_ts = False
+        if SO_TIMESTAMPNS is not None:
+            try:
+                self._sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+                kernel_ts = True
+            except OSError:
+                pass
+        anc_size = socket.CMSG_SPACE(16)
+        while self._running:
+            try:
+                data, anc, _flags, addr = self._sock.recvmsg(BUFFER_SIZE, anc_size)
+                t_recv = time.perf_counter()
+                kernel_delay = None
+                if kernel_ts:
+                    for level, kind, cdata in anc:
+                        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(cdata) >= 16:
+                            sec, nsec = struct.unpack("qq", cdata[:16])
+                            kernel_delay = max(0.0, time.time() - (sec + nsec / 1e9))
+                if data[:3] == wire.MAGIC:
+                    self._put_binary(data, addr, (t_recv, kernel_delay))
+                    continue
+                _m_received.inc()
+                msg = data.decode(errors="ignore").strip()
+                if not self._validate(msg):
+                    _m_rejected.inc()
+                elif not self.flood_guard.admit(addr[0], msg):
+                    pass  # shed; FloodGuard counts it
+                elif self.text_dedupe.seen((addr, msg)):
+                    _m_duplicate.inc()
+                else:
+                    self._queue.put((msg, addr, (t_recv, kernel_delay)))
+                    _m_validated.inc()
+                    self._rate.record(addr[0])
+                    if self._verbose:
+                        log.debug("Received '%s' from %s", msg, addr)
             except socket.timeout:
                 continue
             except OSError:
                 break # socket closed
 
+    def _put_binary(self, data, addr, stamp=None):
+        n = _queue_binary(self._queue, data, addr, self.flood_guard, self.dedupe, stamp)
+        if n:
+            self._rate.record(addr[0])
+            if self._verbose:
+                log.debug("Received %d binary events from %s", n, addr)
+
     # Return the next message in the queue if available
     def get_message_nowait(self) -> Optional[Tuple[str, Tuple[str,int]]]:
         try:
@@ -53,6 +160,13 @@ class Receiver:
         except queue.Empty:
             return None
 
+    # Block up to `timeout` seconds for the next message (tools/harnesses; the UI polls)
+    def get_message(self, timeout: float = 0.5) -> Optional[Tuple[str, Tuple[str,int]]]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
     # Check that message is int or int:int
     @staticmethod
     def _validate(msg: str) -> bool:
@@ -63,13 +177,360 @@ class Receiver:
             return all(p.isdigit() for p in parts)
         return False
 
-def start_receiver(bind_addr: str = "0.0.0.0", port: int = 7501) -> Receiver:
-    r = Receiver(bind_addr, port)
+class _Channel:
+    """One port's queue inside a MultiReceiver; same read API as Receiver."""
+    def __init__(self, port: int, dedupe_window: float = DEDUPE_WINDOW,
+                 text_dedupe_window: float = TEXT_DEDUPE_WINDOW):
+        self.port = port
+        self._queue = queue.Queue()
+        self.flood_guard = FloodGuard()
+        self.dedupe = DedupeWindow(dedupe_window)
+        self.text_dedupe = DedupeWindow(text_dedupe_window)
+
+    def get_message_nowait(self) -> Optional[Tuple[str, Tuple[str,int]]]:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def get_message(self, timeout: float = 0.5) -> Optional[Tuple[str, Tuple[str,int]]]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+class MultiReceiver:
+    """
+    One thread and one selector over several game sockets (one per arena).
+    Each ready socket is drained until it would block, and every datagram
+    lands in the queue of the port it arrived on, so adding an arena adds a
+    socket, not a thread.
+    """
+    def __init__(self, bind_addr: str = "0.0.0.0", ports: Iterable[int] = (7501,), trace: bool = False,
+                 dedupe_window: float = DEDUPE_WINDOW, text_dedupe_window: float = TEXT_DEDUPE_WINDOW):
+        self.bind_addr = bind_addr
+        self.ports = list(ports)
+        # trace=True queues (msg, addr, (t_recv, None)); no kernel timestamps on this path
+        self.trace = trace
+        # one guard per arena, so a flood in one arena never sheds another's traffic
+        self._channels: Dict[int, _Channel] = {p: _Channel(p, dedupe_window, text_dedupe_window)
+                                                for p in self.ports}
+        self._selector = None
+        self._socks = []
+        self._running = False
+        self._verbose = False
+        self._rate = PacketRateLogger(log)
+
+    def channel(self, port: int) -> _Channel:
+        return self._channels[port]
+
+    def start(self):
+        if self._running:
+            return
+        self._selector = selectors.DefaultSelector()
+        for port in self.ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((self.bind_addr, port))
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ, self._channels[port])
+            self._socks.append(sock)
+        self._running = True
+        self._verbose = log.isEnabledFor(logging.DEBUG)
+        REGISTRY.gauge("photon_queue_depth", lambda: sum(c.qsize() for c in self._channels.values()),
+                       "Validated packets waiting for the game loop")
+        threading.Thread(target=self._loop, daemon=True).start()
+        log.info("Receiver started on %s ports %s", self.bind_addr, ", ".join(map(str, self.ports)))
+
+    def stop(self):
+        self._running = False
+        for sock in self._socks:
+            sock.close()
+        log.info("Receiver stopped")
+
+    def _loop(self):
+        validate = Receiver._validate
+        while self._running:
+            try:
+                ready = self._selector.select(timeout=0.5)
+            except (OSError, ValueError):
+                break  # sockets closed under us
+            for key, _mask in ready:
+                channel = key.data
+                sock, q, guard, dedupe = key.fileobj, channel._queue, channel.flood_guard, channel.dedupe
+                while True:
+                    try:
+                        data, addr = sock.recvfrom(BUFFER_SIZE)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        return
+                    if data[:3] == wire.MAGIC:
+                        stamp = (time.perf_counter(), None) if self.trace else None
+                        if _queue_binary(q, data, addr, guard, dedupe, stamp):
+                            self._rate.record(addr[0])
+                        continue
+                    _m_received.inc()
+                    msg = data.decode(errors="ignore").strip()
+                    if not validate(msg):
+                        _m_rejected.inc()
+                        continue
+                    if not guard.admit(addr[0], msg):
+                        continue
+                    if channel.text_dedupe.seen((addr, msg)):
+                        _m_duplicate.inc()
+                        continue
+                    q.put((msg, addr, (time.perf_counter(), None)) if self.trace else (msg, addr))
+                    _m_validated.inc()
+                    self._rate.record(addr[0])
+                    if self._verbose:
+                        log.debug("Received '%s' from %s on :%d", msg, addr, channel.port)
+        self._selector.close()
+
+
+def _binary_events(view, addr, dedupe: DedupeWindow, admit=None):
+    """
+    Records of a decoded binary datagram -> ([(kind, a, b), ...], rejected, duplicates).
+    Same order of checks as text packets: validate, flood guard (admit(host, equip)), dedupe.
+    Retransmits repeat the device's sequence number, so it's part of the dedupe key.
+    """
+    events, rejected, duplicates = [], 0, 0
+    host = addr[0]
+    for kind, _flags, _reserved, seq, a, b, _device_us in wire.RECORD.iter_unpack(view):
+        if kind > wire.KIND_PAIR:
+            rejected += 1
+        elif admit is not None and not admit(host, a):
+            pass  # shed; FloodGuard counts it
+        elif dedupe.seen((addr, seq, kind, a, b)):
+            duplicates += 1
+        else:
+            events.append((kind, a, b))
+    return events, rejected, duplicates
+
+
+def _queue_binary(q, data: bytes, addr, guard: FloodGuard, dedupe: DedupeWindow, stamp=None) -> int:
+    """Queue one binary datagram's surviving events as a single (events, addr[, stamp]) entry; returns how many."""
+    view = wire.decode(data)
+    if view is None:
+        _m_received.inc()
+        _m_rejected.inc()
+        return 0
+    events, rejected, duplicates = _binary_events(view, addr, dedupe, guard.admit_equip)
+    _m_received.inc(len(view) // wire.RECORD.size)
+    _m_rejected.inc(rejected)
+    _m_duplicate.inc(duplicates)
+    if events:
+        q.put((events, addr, stamp) if stamp is not None else (events, addr))
+        _m_validated.inc(len(events))
+    return len(events)
+
+
+def _parse(data: bytes):
+    """Validate + parse one datagram -> (kind, a, b), or None if it isn't "int" / "int:int"."""
+    parts = data.strip().split(b":")
+    if len(parts) > 2 or not all(p.isdigit() for p in parts):
+        return None
+    a = int(parts[0])
+    b = int(parts[1]) if len(parts) == 2 else 0
+    if a > _INT64_MAX or b > _INT64_MAX:
+        return None
+    return (len(parts) - 1, a, b)
+
+
+def _ingest_worker(bind_addr: str, port: int, conn, stop, dedupe_window: float, text_dedupe_window: float):
+    """Worker process: read from a SO_REUSEPORT socket, parse, ship packed batches to the owner."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((bind_addr, port))
+    sock.settimeout(0.2)
+    # the kernel pins each sender to one worker, so a per-worker window sees all its repeats
+    dedupe, text_dedupe = DedupeWindow(dedupe_window), DedupeWindow(text_dedupe_window)
+    pack, now = EVENT.pack, time.perf_counter
+    events, received, rejected, duplicates = [], 0, 0, 0
+    try:
+        while not stop.is_set():
+            try:
+                data, addr = sock.recvfrom(BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            sock.setblocking(False)
+            # drain whatever is already queued, then ship it as one batch
+            while True:
+                if data[:3] == wire.MAGIC:
+                    view = wire.decode(data)
+                    if view is None:
+                        received += 1
+                        rejected += 1
+                    else:
+                        evs, rej, dup = _binary_events(view, addr, dedupe)
+                        received += len(view) // wire.RECORD.size
+                        rejected += rej
+                        duplicates += dup
+                        ip, t = socket.inet_aton(addr[0]), now()
+                        events.extend(pack(kind, ip, addr[1], a, b, t) for kind, a, b in evs)
+                else:
+                    received += 1
+                    parsed = _parse(data)
+                    if parsed is None:
+                        rejected += 1
+                    elif text_dedupe.seen((addr, parsed)):
+                        duplicates += 1
+                    else:
+                        events.append(pack(parsed[0], socket.inet_aton(addr[0]), addr[1], parsed[1], parsed[2], now()))
+                if len(events) >= WORKER_BATCH:
+                    break
+                try:
+                    data, addr = sock.recvfrom(BUFFER_SIZE)
+                except (BlockingIOError, InterruptedError):
+                    break
+            sock.settimeout(0.2)
+            conn.send_bytes(BATCH_HEADER.pack(received, rejected, duplicates) + b"".join(events))
+            events, received, rejected, duplicates = [], 0, 0, 0
+    except (OSError, EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        sock.close()
+        conn.close()
+
+
+class ProcessReceiver:
+    """
+    Ingest spread over worker processes that all bind the game port with
+    SO_REUSEPORT; the kernel hashes each sender to one worker, so a device's
+    packets stay in order. Workers decode and validate in parallel (text or
+    binary) and send packed event batches over a pipe; one owner thread
+    queues each sender's run of events as one (events, addr) entry, the
+    same shape Receiver uses for binary datagrams.
+    """
+    def __init__(self, bind_addr: str = "0.0.0.0", port: int = 7501, workers: int = 2, trace: bool = False,
+                 dedupe_window: float = DEDUPE_WINDOW, flood_guard: Optional[FloodGuard] = None,
+                 text_dedupe_window: float = TEXT_DEDUPE_WINDOW):
+        self.bind_addr = bind_addr
+        self.port = port
+        self.workers = max(1, workers)
+        self.dedupe_window = dedupe_window
+        self.text_dedupe_window = text_dedupe_window
+        # applied by the owner thread: equipment ids need one view across all workers
+        self.flood_guard = flood_guard or FloodGuard()
+        # trace=True queues (msg, addr, (t_recv, None)) with the worker's receive stamp
+        self.trace = trace
+        self._queue = queue.Queue()
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = None
+        self._procs = []
+        self._conns = []
+        self._running = False
+        self._verbose = False
+        self._rate = PacketRateLogger(log)
+
+    def start(self):
+        if self._running:
+            return
+        self._stop = self._ctx.Event()
+        for _ in range(self.workers):
+            reader, writer = self._ctx.Pipe(duplex=False)
+            proc = self._ctx.Process(target=_ingest_worker, daemon=True,
+                                     args=(self.bind_addr, self.port, writer, self._stop, self.dedupe_window,
+                                           self.text_dedupe_window))
+            proc.start()
+            writer.close()  # the worker holds the only write end
+            self._procs.append(proc)
+            self._conns.append(reader)
+        self._running = True
+        self._verbose = log.isEnabledFor(logging.DEBUG)
+        REGISTRY.gauge("photon_queue_depth", self._queue.qsize, "Validated packets waiting for the game loop")
+        threading.Thread(target=self._loop, daemon=True).start()
+        log.info("Receiver started on %s:%d (%d ingest workers)", self.bind_addr, self.port, self.workers)
+
+    def stop(self):
+        self._running = False
+        if self._stop is not None:
+            self._stop.set()
+        for proc in self._procs:
+            proc.join(1.0)
+            if proc.is_alive():
+                proc.terminate()
+        log.info("Receiver stopped")
+
+    def _loop(self):
+        from multiprocessing.connection import wait
+        unpack, ntoa, admit = EVENT.iter_unpack, socket.inet_ntoa, self.flood_guard.admit_equip
+        hosts = {}  # packed ip -> dotted string, so each sender's address is built once
+        conns = list(self._conns)
+        while self._running and conns:
+            for conn in wait(conns, timeout=0.5):
+                try:
+                    buf = conn.recv_bytes()
+                except (EOFError, OSError):
+                    conns.remove(conn)
+                    continue
+                received, rejected, duplicates = BATCH_HEADER.unpack_from(buf)
+                _m_received.inc(received)
+                _m_rejected.inc(rejected)
+                _m_duplicate.inc(duplicates)
+                view = memoryview(buf)[BATCH_HEADER.size:]
+                # consecutive events from one sender share a queue entry; no strings per event
+                run, run_key, run_addr, run_t = [], None, None, 0.0
+                for kind, ip, sport, a, b, t_recv in unpack(view):
+                    host = hosts.get(ip)
+                    if host is None:
+                        host = hosts[ip] = ntoa(ip)
+                    if not admit(host, a):
+                        continue
+                    if (ip, sport) != run_key:
+                        self._flush_run(run, run_addr, run_t)
+                        run, run_key, run_addr, run_t = [], (ip, sport), (host, sport), t_recv
+                    run.append((kind, a, b))
+                self._flush_run(run, run_addr, run_t)
+
+    def _flush_run(self, events, addr, t_recv):
+        if not events:
+            return
+        self._queue.put((events, addr, (t_recv, None)) if self.trace else (events, addr))
+        _m_validated.inc(len(events))
+        self._rate.record(addr[0])
+        if self._verbose:
+            log.debug("Received %d events from %s", len(events), addr)
+
+    def get_message_nowait(self) -> Optional[Tuple[str, Tuple[str,int]]]:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def get_message(self, timeout: float = 0.5) -> Optional[Tuple[str, Tuple[str,int]]]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def start_multi_receiver(bind_addr: str = "0.0.0.0", ports: Iterable[int] = (7501,),
+                         trace: bool = False) -> MultiReceiver:
+    r = MultiReceiver(bind_addr, ports, trace=trace)
+    r.start()
+    return r
+
+def start_receiver(bind_addr: str = "0.0.0.0", port: int = 7501, trace: bool = False,
+                   workers: int = INGEST_WORKERS, dedupe_window: float = DEDUPE_WINDOW,
+                   flood_guard: Optional[FloodGuard] = None, text_dedupe_window: float = TEXT_DEDUPE_WINDOW):
+    """Receive thread by default; workers > 0 (PHOTON_INGEST_WORKERS) spreads ingest over processes."""
+    if workers > 0 and hasattr(socket, "SO_REUSEPORT"):
+        r = ProcessReceiver(bind_addr, port, workers=workers, trace=trace, dedupe_window=dedupe_window,
+                            flood_guard=flood_guard, text_dedupe_window=text_dedupe_window)
+        r.start()
+        return r
+    r = Receiver(bind_addr, port, trace=trace, dedupe_window=dedupe_window, flood_guard=flood_guard,
+                 text_dedupe_window=text_dedupe_window)
     r.start()
     return r
 
 # Quick test if running this file directly
 if __name__ == "__main__":
+    setup_logging()
     receiver = start_receiver()
     try:
         import time
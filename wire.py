@@ -0,0 +1,66 @@
+# wire.py
+"""
+Binary game protocol, version 1. Optional: the ASCII protocol ("a" / "a:b",
+one event per datagram) stays the default, and the receivers tell the two
+apart by the first byte.
+
+A binary datagram is a 6-byte header followed by `count` 24-byte records,
+all little-endian:
+
+  header  magic b"\\xb7LT" | version u8 | count u16
+  record  kind u8 | flags u8 | reserved u16 | seq u32 | a u32 | b u32 | device_us u64
+
+  kind       0 = hit report (text "a"), 1 = tag or base ("a:b")
+  seq        the device's running sequence number; a retransmit repeats it
+  a, b       equipment ids / base code, as in the text protocol
+  device_us  the device's own clock, microseconds
+
+Text datagrams only contain digits, ':' and whitespace, so a leading 0xB7
+can't be one. Records are read with struct.iter_unpack over a memoryview:
+no per-event strings on the way in.
+"""
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"\xb7LT"
+VERSION = 1
+HEADER = struct.Struct("<3sBH")
+RECORD = struct.Struct("<BBHIIIQ")
+KIND_ID, KIND_PAIR = 0, 1
+MAX_DATAGRAM = 1472  # one Ethernet frame's UDP payload
+MAX_RECORDS = (MAX_DATAGRAM - HEADER.size) // RECORD.size  # 61
+
+Record = Tuple[int, int, int, int, int]  # (kind, seq, a, b, device_us)
+
+
+def is_binary(data: bytes) -> bool:
+    return data[:3] == MAGIC
+
+
+def encode(records: Iterable[Record]) -> bytes:
+    """One datagram holding up to MAX_RECORDS records."""
+    body = [RECORD.pack(kind, 0, 0, seq, a, b, device_us) for kind, seq, a, b, device_us in records]
+    if len(body) > MAX_RECORDS:
+        raise ValueError(f"{len(body)} records won't fit one datagram (max {MAX_RECORDS})")
+    return HEADER.pack(MAGIC, VERSION, len(body)) + b"".join(body)
+
+
+def encode_all(records: Iterable[Record], per_datagram: int = MAX_RECORDS) -> List[bytes]:
+    """Split records over as many datagrams as needed."""
+    per_datagram = max(1, min(per_datagram, MAX_RECORDS))
+    records = list(records)
+    return [encode(records[i:i + per_datagram]) for i in range(0, len(records), per_datagram)]
+
+
+def decode(data: bytes) -> Optional[memoryview]:
+    """
+    The records section of a well-formed v1 datagram, or None (wrong magic,
+    unknown version, or a length that doesn't match the count). Iterate it
+    with RECORD.iter_unpack.
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or len(data) != HEADER.size + count * RECORD.size:
+        return None
+    return memoryview(data)[HEADER.size:]